@@ -36,8 +36,9 @@ import ModalNovaSessao from '../../components/modals/ModalNovaSessao';
 import ModalNovoCheckin from '../../components/modals/ModalNovoCheckin';
 import SessaoDetalhesModal from '../../components/modals/SessaoDetalhesModal';
 
+import { fetchAgendaCompleta, fetchAgendaPagina } from '../../services/agenda';
 import { api } from '../../services/api';
-import { AgendaEvento, AgendaGeralResponse, PacienteResponse, SessaoResponse } from '../../types/api';
+import { AgendaEvento, PacienteResponse, SessaoResponse } from '../../types/api';
 
 export default function AgendaScreen() {
     const router = useRouter();
@@ -49,6 +50,9 @@ export default function AgendaScreen() {
     // Data state
     const [events, setEvents] = useState<AgendaEvento[]>([]);
     const [monthEvents, setMonthEvents] = useState<AgendaEvento[]>([]);
+    const [cursor, setCursor] = useState<string | null>(null); // próxima página (dia/semana)
+    const janelaRef = useRef(''); // janela do `cursor` — descarta página de uma janela antiga
+    const carregandoMaisRef = useRef(false);
     const [loading, setLoading] = useState(true);
     const [refreshing, setRefreshing] = useState(false);
     const [pacientes, setPacientes] = useState<PacienteResponse[]>([]);
@@ -107,27 +111,42 @@ export default function AgendaScreen() {
             const dateStart = format(start, 'yyyy-MM-dd');
             const dateEnd = format(end, 'yyyy-MM-dd');
 
-            const res = await api.get<AgendaGeralResponse>(
-                `/agenda/geral?data_inicio=${dateStart}&data_fim=${dateEnd}`
-            );
-            setEvents(res.data.eventos || []);
-
-            // For month view: also fetch current month data for dot indicators
-            if (forMode !== 'month') {
-                const ms = format(startOfMonth(forDate), 'yyyy-MM-dd');
-                const me = format(endOfMonth(forDate), 'yyyy-MM-dd');
-                const mRes = await api.get<AgendaGeralResponse>(
-                    `/agenda/geral?data_inicio=${ms}&data_fim=${me}`
-                );
-                setMonthEvents(mRes.data.eventos || []);
+            janelaRef.current = `${forMode}:${dateStart}:${dateEnd}`;
+
+            if (forMode === 'month') {
+                // Bolinhas do mês precisam de todos os dias da janela
+                const eventos = await fetchAgendaCompleta(dateStart, dateEnd);
+                setEvents(eventos);
+                setMonthEvents(eventos);
+                setCursor(null);
             } else {
-                setMonthEvents(res.data.eventos || []);
+                // Dia/semana: primeira página; o resto vem ao rolar (loadMoreEvents)
+                const pagina = await fetchAgendaPagina(dateStart, dateEnd);
+                setEvents(pagina.eventos);
+                setCursor(pagina.next_cursor);
             }
         } catch (err) {
             console.error('fetchEvents error:', err);
         }
     }, [getDateRange]);
 
+    const loadMoreEvents = useCallback(async () => {
+        if (!cursor || carregandoMaisRef.current) return;
+        carregandoMaisRef.current = true;
+        const janela = janelaRef.current;
+        try {
+            const { start, end } = getDateRange(mode, selectedDate);
+            const pagina = await fetchAgendaPagina(format(start, 'yyyy-MM-dd'), format(end, 'yyyy-MM-dd'), { cursor });
+            if (janelaRef.current !== janela) return; // usuário mudou de dia/modo no meio
+            setEvents(prev => [...prev, ...pagina.eventos]);
+            setCursor(pagina.next_cursor);
+        } catch (err) {
+            console.error('loadMoreEvents error:', err);
+        } finally {
+            carregandoMaisRef.current = false;
+        }
+    }, [cursor, mode, selectedDate, getDateRange]);
+
     const fetchPacientes = useCallback(async () => {
         try {
             const res = await api.get<PacienteResponse[]>('/pacientes/');
@@ -272,6 +291,7 @@ export default function AgendaScreen() {
                             onSlotPress={handleSlotPress}
                             onEventPress={(e) => { if (e.tipo_evento === 'sessao') handleEventPress(e); else handleEventPress(e); }}
                             onDayPress={(d) => { setSelectedDate(d); setMode('day'); }}
+                            onEndReached={loadMoreEvents}
                         />
                     )}
 
@@ -281,6 +301,7 @@ export default function AgendaScreen() {
                             events={events}
                             onSlotPress={handleSlotPress}
                             onEventPress={handleEventPress}
+                            onEndReached={loadMoreEvents}
                         />
                     )}
                 </>
@@ -1,4 +1,4 @@
-import { format, formatDistanceToNow, isToday } from 'date-fns';
+import { format, formatDistanceToNow, subDays } from 'date-fns';
 import { ptBR } from 'date-fns/locale';
 import { useRouter } from 'expo-router';
 import {
@@ -16,7 +16,7 @@ import {
     UserX,
     XCircle,
 } from 'lucide-react-native';
-import React, { useCallback, useEffect, useState } from 'react';
+import React, { useCallback, useEffect, useRef, useState } from 'react';
 import {
     ActivityIndicator,
     RefreshControl,
@@ -28,9 +28,11 @@ import {
 } from 'react-native';
 import { SafeAreaView } from 'react-native-safe-area-context';
 
+import { fetchAgendaPagina } from '../../services/agenda';
 import { api } from '../../services/api';
 import { useAuthStore } from '../../store/authStore';
-import { AgendaEvento, AgendaGeralResponse, CheckInResponse, PacienteResponse, SessaoResponse, TarefaResponse } from '../../types/api';
+import { AgendaEvento, CheckInResponse, PacienteResponse, SessaoResponse, TarefaResponse } from '../../types/api';
+import { isNearEnd } from '../../utils/scroll';
 
 // ── Tipos locais ──────────────────────────────────────────────────────────────
 
@@ -45,8 +47,30 @@ interface FaturaPendente {
     data_vencimento: string;
 }
 
+// Atividades recentes: um dia por vez, de hoje para trás, página a página
+interface PosicaoRecentes {
+    dias: number;          // dias atrás (0 = hoje)
+    cursor: string | null; // próxima página dentro do dia
+}
+
 // ── Helpers ───────────────────────────────────────────────────────────────────
 
+const DIAS_RECENTES = 7;
+const ATIVIDADES_INICIAIS = 25;
+
+const ordenarRecentes = (eventos: AgendaEvento[]) =>
+    eventos.sort((a, b) => new Date(b.data_hora).getTime() - new Date(a.data_hora).getTime());
+
+/** Próxima página das atividades recentes e a posição seguinte (null = acabaram os 7 dias). */
+const fetchRecentes = async (pos: PosicaoRecentes) => {
+    const dia = format(subDays(new Date(), pos.dias), 'yyyy-MM-dd');
+    const pagina = await fetchAgendaPagina(dia, dia, { cursor: pos.cursor });
+    const proxima: PosicaoRecentes | null = pagina.next_cursor
+        ? { dias: pos.dias, cursor: pagina.next_cursor }
+        : pos.dias + 1 < DIAS_RECENTES ? { dias: pos.dias + 1, cursor: null } : null;
+    return { eventos: pagina.eventos, proxima };
+};
+
 const MESES = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez'];
 
 const getGreeting = () => {
@@ -76,6 +100,8 @@ export default function HomeScreen() {
 
     const [sesToday, setSesToday] = useState<SessaoResponse[]>([]);
     const [atividades, setAtividades] = useState<AgendaEvento[]>([]);
+    const [proximasAtividades, setProximasAtividades] = useState<PosicaoRecentes | null>(null);
+    const carregandoMaisRef = useRef(false);
     const [faturasPendentes, setFaturasPendentes] = useState<FaturaPendente[]>([]);
     const [pacientesPendentes, setPacientesPendentes] = useState<PacienteResponse[]>([]);
     const [totalAtivos, setTotalAtivos] = useState(0);
@@ -83,11 +109,10 @@ export default function HomeScreen() {
     const fetchDashboard = useCallback(async () => {
         try {
             const today = format(new Date(), 'yyyy-MM-dd');
-            const pastWeek = format(new Date(Date.now() - 7 * 86400000), 'yyyy-MM-dd');
 
-            const [pacRes, agendaRes, faturasRes] = await Promise.all([
+            const [pacRes, hoje, faturasRes] = await Promise.all([
                 api.get<PacienteResponse[]>('/pacientes/'),
-                api.get<AgendaGeralResponse>(`/agenda/geral?data_inicio=${pastWeek}&data_fim=${today}`),
+                fetchAgendaPagina(today, today, { tipos: 'sessao' }),
                 api.get<FaturaPendente[]>('/faturas/pendentes'),
             ]);
 
@@ -95,18 +120,20 @@ export default function HomeScreen() {
             const ativos = todos.filter(p => p.status === 'ativo');
             setTotalAtivos(ativos.length);
 
-            // Sessões de hoje
-            const todaySessions = (agendaRes.data.eventos || [])
-                .filter(e => e.tipo_evento === 'sessao' && isToday(new Date(e.data_hora)))
-                .map(e => e.dados_especificos as SessaoResponse)
-                .sort((a, b) => new Date(a.data_hora_inicio).getTime() - new Date(b.data_hora_inicio).getTime());
-            setSesToday(todaySessions);
-
-            // Atividades recentes (últimos 7 dias, todos os tipos)
-            const recentes = [...(agendaRes.data.eventos || [])]
-                .sort((a, b) => new Date(b.data_hora).getTime() - new Date(a.data_hora).getTime())
-                .slice(0, 25);
-            setAtividades(recentes);
+            // Sessões de hoje (já em ordem cronológica)
+            setSesToday(hoje.eventos.map(e => e.dados_especificos as SessaoResponse));
+
+            // Atividades recentes (últimos 7 dias, todos os tipos): só o bastante
+            // para a primeira tela; o resto vem ao rolar (loadMoreAtividades)
+            const recentes: AgendaEvento[] = [];
+            let pos: PosicaoRecentes | null = { dias: 0, cursor: null };
+            while (pos && recentes.length < ATIVIDADES_INICIAIS) {
+                const { eventos, proxima }: { eventos: AgendaEvento[]; proxima: PosicaoRecentes | null } = await fetchRecentes(pos);
+                recentes.push(...eventos);
+                pos = proxima;
+            }
+            setAtividades(ordenarRecentes(recentes));
+            setProximasAtividades(pos);
 
             setFaturasPendentes(faturasRes.data);
         } catch (error) {
@@ -125,6 +152,20 @@ export default function HomeScreen() {
         fetchDashboard().finally(() => setRefreshing(false));
     }, [fetchDashboard]);
 
+    const loadMoreAtividades = useCallback(async () => {
+        if (!proximasAtividades || carregandoMaisRef.current) return;
+        carregandoMaisRef.current = true;
+        try {
+            const { eventos, proxima } = await fetchRecentes(proximasAtividades);
+            setAtividades(prev => ordenarRecentes([...prev, ...eventos]));
+            setProximasAtividades(proxima);
+        } catch (error) {
+            console.error('Atividades fetch error:', error);
+        } finally {
+            carregandoMaisRef.current = false;
+        }
+    }, [proximasAtividades]);
+
     // ── KPI computations ───────────────────────────────────────────────────────
 
     const ticketDia = sesToday
@@ -288,6 +329,8 @@ export default function HomeScreen() {
             <ScrollView
                 contentContainerStyle={styles.content}
                 showsVerticalScrollIndicator={false}
+                scrollEventThrottle={200}
+                onScroll={(e) => { if (isNearEnd(e)) loadMoreAtividades(); }}
                 refreshControl={<RefreshControl refreshing={refreshing} onRefresh={onRefresh} tintColor="#2C3E50" />}
             >
 
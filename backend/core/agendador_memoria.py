@@ -0,0 +1,137 @@
+"""
+core/agendador_memoria.py — Agenda em memória dos próximos disparos
+
+Problema:
+    O worker consultava notificacoes_lembretes a cada tick só para descobrir
+    o que vence agora e quando vence o próximo.
+
+Solução:
+    Um min-heap (disparo, id) com as notificações 'agendada' das próximas
+    NOTIF_HORIZONTE_HORAS, carregado uma vez e mantido pelos sinais de
+    core/sinal_notificacoes (inserts e remoções commitados). O worker retira
+    os vencidos daqui e reivindica só esses ids no banco (lookup por PK).
+
+    - Internamente o disparo é um epoch float (24 bytes vs 48 do datetime):
+      com 1M lembretes no horizonte isso é a maior parte da memória.
+    - Remoção preguiçosa: `_disparos` (id → disparo) é a verdade do heap;
+      entradas removidas ou reagendadas são descartadas ao chegar no topo.
+    - Horizonte: disparos além dele são ignorados e entram na próxima recarga.
+    - Recarga concorrente: sinais recebidos enquanto a consulta de recarga
+      roda ficam num buffer e são reaplicados sobre o snapshot.
+
+O banco continua sendo a fonte da verdade: o claim por id confere o status,
+e a varredura periódica do worker recupera o que a memória perder (crash,
+sinal perdido, lease expirado).
+"""
+
+import heapq
+import threading
+from collections.abc import Iterable
+from datetime import datetime, timezone
+
+
+def _epoch(dt: datetime) -> float:
+    # SQLite devolve naive; naive aqui é sempre UTC
+    return (dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt).timestamp()
+
+
+def _datetime(epoch: float) -> datetime:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc)
+
+
+class AgendaEmMemoria:
+    """Min-heap thread-safe de (disparo, notificacao_id) até um horizonte."""
+
+    def __init__(self) -> None:
+        self._trava = threading.Lock()
+        self._heap: list[tuple[float, int]] = []
+        self._disparos: dict[int, float] = {}
+        self._horizonte: float | None = None
+        self._buffer_recarga: list[tuple[int, float]] | None = None
+
+    def __len__(self) -> int:
+        return len(self._disparos)
+
+    @property
+    def horizonte(self) -> datetime | None:
+        """Limite superior carregado. None = nunca carregada."""
+        return None if self._horizonte is None else _datetime(self._horizonte)
+
+    # ── Recarga ───────────────────────────────────────────────────────────────
+
+    def iniciar_recarga(self) -> None:
+        """Chamar ANTES de consultar o banco: passa a guardar os sinais recebidos."""
+        with self._trava:
+            self._buffer_recarga = []
+
+    def concluir_recarga(
+        self, linhas: Iterable[tuple[int, datetime]], horizonte: datetime
+    ) -> None:
+        """Substitui o conteúdo pelo snapshot + sinais recebidos durante a consulta."""
+        limite = horizonte.timestamp()
+        disparos = {notif_id: _epoch(disparo) for notif_id, disparo in linhas}
+        with self._trava:
+            for notif_id, disparo in self._buffer_recarga or ():
+                if disparo <= limite:
+                    disparos[notif_id] = disparo
+            self._buffer_recarga = None
+            self._disparos = disparos
+            self._heap = [(disparo, notif_id) for notif_id, disparo in disparos.items()]
+            heapq.heapify(self._heap)
+            self._horizonte = limite
+
+    # ── Manutenção por sinal ──────────────────────────────────────────────────
+
+    def adicionar(self, itens: Iterable[tuple[int, datetime]]) -> datetime | None:
+        """
+        Insere (id, disparo) dentro do horizonte.
+        Retorna o disparo mais cedo aceito (para antecipar o tick) ou None.
+        """
+        mais_cedo = None
+        with self._trava:
+            for notif_id, disparo_dt in itens:
+                disparo = _epoch(disparo_dt)
+                if self._buffer_recarga is not None:
+                    self._buffer_recarga.append((notif_id, disparo))
+                if self._horizonte is None or disparo > self._horizonte:
+                    continue
+                self._disparos[notif_id] = disparo
+                heapq.heappush(self._heap, (disparo, notif_id))
+                if mais_cedo is None or disparo < mais_cedo:
+                    mais_cedo = disparo
+        return None if mais_cedo is None else _datetime(mais_cedo)
+
+    def remover(self, ids: Iterable[int]) -> None:
+        """Remove ids (remoção preguiçosa — o heap é limpo ao chegar no topo)."""
+        with self._trava:
+            for notif_id in ids:
+                self._disparos.pop(notif_id, None)
+
+    # ── Consumo pelo worker ───────────────────────────────────────────────────
+
+    def _descartar_obsoletos(self) -> None:
+        while self._heap:
+            disparo, notif_id = self._heap[0]
+            if self._disparos.get(notif_id) == disparo:
+                return
+            heapq.heappop(self._heap)
+
+    def proximo(self) -> datetime | None:
+        """Disparo mais cedo ainda agendado, ou None se a agenda está vazia."""
+        with self._trava:
+            self._descartar_obsoletos()
+            return _datetime(self._heap[0][0]) if self._heap else None
+
+    def retirar_vencidos(self, agora: datetime, limite: int) -> list[int]:
+        """Retira até `limite` ids com disparo <= agora, do mais antigo ao mais novo."""
+        ids: list[int] = []
+        limite_ts = agora.timestamp()
+        with self._trava:
+            while len(ids) < limite:
+                self._descartar_obsoletos()
+                if not self._heap or self._heap[0][0] > limite_ts:
+                    break
+                _, notif_id = heapq.heappop(self._heap)
+                del self._disparos[notif_id]
+                ids.append(notif_id)
+        return ids
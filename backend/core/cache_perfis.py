@@ -0,0 +1,160 @@
+"""
+core/cache_perfis.py — Cache em processo do perfil do Psicólogo
+
+Problema:
+    GET /auth/me (toda reabertura do app), os PATCH de perfil e o worker
+    (aviso_psicologo) liam `psicologos` por id a cada chamada, para um
+    registro que quase nunca muda.
+
+Solução:
+    psicologo_id → PsicologoResponse serializado (dict JSON), com TTL.
+    - Invalidação explícita: toda escrita em psicologo_service chama
+      invalidar() DEPOIS do commit.
+    - Geração por chave: uma leitura que começou antes de uma invalidação
+      não grava o valor antigo por cima (corrida leitura/escrita).
+    - Contadores de acerto/falha/invalidação em estatisticas().
+
+Multi-instância:
+    O armazenamento é um BackendCache (get/set/delete de dicts JSON com
+    TTL). O padrão é BackendMemoria, por processo — com várias instâncias,
+    uma escrita só invalida a instância que a recebeu e as outras servem o
+    valor antigo até o TTL. Para invalidar todas, troque por um backend
+    compartilhado no startup, ex. com Redis (pip install redis):
+
+        class BackendRedis:
+            def __init__(self, url): self._r = redis.Redis.from_url(url)
+            def get(self, chave):
+                bruto = self._r.get(chave)
+                return json.loads(bruto) if bruto else None
+            def set(self, chave, valor, ttl_segundos):
+                self._r.set(chave, json.dumps(valor), ex=int(ttl_segundos))
+            def delete(self, chave): self._r.delete(chave)
+
+        cache_perfis.perfis.usar_backend(BackendRedis(settings.REDIS_URL))
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from typing import Any, Protocol
+
+from backend.core.config import settings
+
+
+class BackendCache(Protocol):
+    """Armazenamento chave → dict JSON com TTL (local ou compartilhado)."""
+
+    def get(self, chave: str) -> dict[str, Any] | None: ...
+
+    def set(self, chave: str, valor: dict[str, Any], ttl_segundos: float) -> None: ...
+
+    def delete(self, chave: str) -> None: ...
+
+
+class BackendMemoria:
+    """LRU thread-safe por processo, limitada a `maximo` entradas."""
+
+    def __init__(self, maximo: int) -> None:
+        self._maximo = maximo
+        self._trava = threading.Lock()
+        self._itens: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+
+    def get(self, chave: str) -> dict[str, Any] | None:
+        with self._trava:
+            item = self._itens.get(chave)
+            if item is None:
+                return None
+            if item[0] <= time.monotonic():
+                del self._itens[chave]
+                return None
+            self._itens.move_to_end(chave)
+            return item[1]
+
+    def set(self, chave: str, valor: dict[str, Any], ttl_segundos: float) -> None:
+        with self._trava:
+            self._itens[chave] = (time.monotonic() + ttl_segundos, valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self._maximo:
+                self._itens.popitem(last=False)
+
+    def delete(self, chave: str) -> None:
+        with self._trava:
+            self._itens.pop(chave, None)
+
+
+class CachePerfis:
+    """Perfis por psicologo_id sobre um BackendCache, com contadores."""
+
+    def __init__(self, backend: BackendCache, *, ttl_segundos: float) -> None:
+        self._backend = backend
+        self._ttl = ttl_segundos
+        self._trava = threading.Lock()
+        self._geracoes: dict[int, int] = {}
+        self.acertos = 0
+        self.falhas = 0
+        self.invalidacoes = 0
+
+    def usar_backend(self, backend: BackendCache) -> None:
+        """Troca o armazenamento (ex: compartilhado). Chamar no startup."""
+        self._backend = backend
+
+    @staticmethod
+    def _chave(psicologo_id: int) -> str:
+        return f"cori:perfil:{psicologo_id}"
+
+    def obter_muitos(
+        self,
+        psicologo_ids: Iterable[int],
+        carregar: Callable[[set[int]], dict[int, dict[str, Any]]],
+    ) -> dict[int, dict[str, Any]]:
+        """
+        Perfis dos ids pedidos: os do cache, mais os ausentes numa única
+        chamada a `carregar` (que os grava no cache). Ids que não existem
+        no banco ficam de fora do resultado e não são cacheados.
+        """
+        encontrados: dict[int, dict[str, Any]] = {}
+        ausentes: set[int] = set()
+        for psicologo_id in set(psicologo_ids):
+            valor = self._backend.get(self._chave(psicologo_id))
+            if valor is None:
+                ausentes.add(psicologo_id)
+            else:
+                encontrados[psicologo_id] = valor
+
+        with self._trava:
+            self.acertos += len(encontrados)
+            self.falhas += len(ausentes)
+            geracoes = {i: self._geracoes.get(i, 0) for i in ausentes}
+
+        if ausentes:
+            carregados = carregar(ausentes)
+            for psicologo_id, valor in carregados.items():
+                # Invalidado durante a leitura → o valor lido pode ser o antigo
+                if self._geracoes.get(psicologo_id, 0) == geracoes[psicologo_id]:
+                    self._backend.set(self._chave(psicologo_id), valor, self._ttl)
+            encontrados.update(carregados)
+        return encontrados
+
+    def invalidar(self, psicologo_id: int) -> None:
+        with self._trava:
+            self._geracoes[psicologo_id] = self._geracoes.get(psicologo_id, 0) + 1
+            self.invalidacoes += 1
+        self._backend.delete(self._chave(psicologo_id))
+
+    def estatisticas(self) -> dict[str, int | float]:
+        with self._trava:
+            total = self.acertos + self.falhas
+            return {
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "invalidacoes": self.invalidacoes,
+                "taxa_acerto": round(self.acertos / total, 4) if total else 0.0,
+            }
+
+
+# Instância do processo — API e worker compartilham
+perfis = CachePerfis(
+    BackendMemoria(settings.PERFIL_CACHE_MAXIMO),
+    ttl_segundos=settings.PERFIL_CACHE_TTL_SEGUNDOS,
+)
@@ -1,6 +1,7 @@
 from pathlib import Path
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Literal
 
 # Dev fallback — SQLite absoluto (nunca usado em produção)
 _BACKEND_DIR = Path(__file__).resolve().parent.parent
@@ -22,14 +23,57 @@ class Settings(BaseSettings):
     DB_POOL_SIZE: int = 5
     DB_MAX_OVERFLOW: int = 10
     DB_POOL_TIMEOUT: int = 30
+    DB_ASYNC_POOL_SIZE: int = 10  # engine async (asyncpg) das rotas de leitura quentes
+
+    # Réplicas de leitura — JSON: ["postgresql://...", ...]. Vazio = só o primário
+    DATABASE_REPLICA_URLS: list[str] = []
+    REPLICA_ATRASO_MAXIMO_SEGUNDOS: float = 5.0     # acima disso a réplica sai do rodízio
+    REPLICA_VERIFICACAO_SEGUNDOS: int = 15          # intervalo da medição de atraso (worker)
+    LEITURA_PRIMARIO_APOS_ESCRITA_SEGUNDOS: float = 10.0  # read-your-writes por psicólogo
+
+    # SQLite (fallback self-hosted) — ver core/database "perfil de produção"
+    SQLITE_PERFIL: Literal["producao", "basico"] = "producao"
+    SQLITE_LEITORES: int = 8           # conexões do pool de leitura
+    SQLITE_MMAP_MB: int = 256
+    SQLITE_CACHE_MB: int = 64          # por conexão
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+
+    # Instrumentação de SQL por request/job (Server-Timing + logs + alertas)
+    SQL_INSTRUMENTACAO: bool = True
+    SQL_ALERTA_CONSULTAS: int = 25      # statements por request
+    SQL_ALERTA_MS: float = 250.0        # tempo total no banco por request
+    SQL_ALERTA_REPETICOES: int = 10     # mesmo statement N vezes → suspeita de N+1
+
+    # GET /metrics (Prometheus). Token vazio = aberto; preenchido = exige Bearer
+    METRICAS_HABILITADAS: bool = True
+    METRICAS_TOKEN: str = ""
 
     # JWT — OBRIGATÓRIO sobrescrever em produção
     SECRET_KEY: str = "CHANGE_ME_IN_PRODUCTION_USE_OPENSSL_RAND_HEX_32"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 dias
+    AUTH_CACHE_TOKENS: int = 4096  # JWTs já verificados mantidos em memória (LRU)
+    PERFIL_CACHE_TTL_SEGUNDOS: int = 300  # perfil do psicólogo em cache (invalidado nas escritas)
+    PERFIL_CACHE_MAXIMO: int = 10_000
 
     # Google OAuth
     GOOGLE_CLIENT_ID: str = ""
+    GOOGLE_CERTS_TIMEOUT_SEGUNDOS: float = 5.0
+    GOOGLE_CERTS_TTL_PADRAO_SEGUNDOS: int = 3600  # se a resposta vier sem max-age/Expires
+
+    # Push Notifications (worker)
+    # Vazio = envio simulado (log). Expo: https://exp.host/--/api/v2/push/send
+    PUSH_PROVIDER_URL: str = ""
+    PUSH_LOTE_TAMANHO: int = 100        # Expo aceita até 100 mensagens por request
+    PUSH_MAX_CONCORRENCIA: int = 4      # lotes enviados em paralelo
+    PUSH_TIMEOUT_SEGUNDOS: float = 10.0
+    NOTIF_LIMITE_POR_TICK: int = 500
+    NOTIF_LEASE_SEGUNDOS: int = 300     # claim expira e é retomado por outro worker
+    NOTIF_SONO_MAXIMO_SEGUNDOS: int = 900  # varredura de segurança no banco (worker é event-driven)
+    NOTIF_HORIZONTE_HORAS: int = 6      # disparos mantidos na agenda em memória do worker
+    SERIES_MATERIALIZAR_HORAS: int = 48  # ocorrências de séries gravadas com antecedência (lembrete 24h)
+    FATURAS_VERIFICACAO_HORAS: int = 6   # conferência dos totais das faturas abertas (delta vs SUM)
+    FATURAS_ATRASO_LOTE: int = 500       # faturas por transação na varredura pendente → atrasada
 
     # CORS — em produção: lista de domínios explícitos
     CORS_ORIGINS: list[str] = ["*"]
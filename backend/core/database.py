@@ -1,21 +1,116 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+import itertools
+import logging
+import threading
+import time
+from collections.abc import AsyncIterator, Callable
+from contextvars import ContextVar
+from sqlalchemy import Engine, create_engine, event, make_url, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 from backend.core.config import settings
+from backend.core.instrumentacao_sql import instrumentar
+from backend.core.metricas import AsyncPoolInstrumentado, PoolInstrumentado
+
+logger = logging.getLogger(__name__)
 
 _is_sqlite = settings.DATABASE_URL.startswith("sqlite")
 
+
+# ─── SQLite: perfil de produção ──────────────────────────────────────────────
+# Instalações self-hosted rodam no fallback SQLite, com API e worker
+# (thread do APScheduler) escrevendo no mesmo arquivo. Com SQLITE_PERFIL
+# "producao" (padrão), num banco em arquivo:
+#   - PRAGMAs em toda conexão nova: WAL (leitores não bloqueiam o escritor
+#     e vice-versa), synchronous=NORMAL (seguro em WAL; fsync só no
+#     checkpoint), mmap, cache de páginas e busy_timeout.
+#   - Um único escritor: o engine principal tem UMA conexão (pool_size=1),
+#     que funciona como trava de escrita do processo — quem pega a conexão
+#     escreve, os demais esperam na fila do pool (DB_POOL_TIMEOUT), em vez de
+#     disputar o arquivo. As transações de escrita (SessionLocal / get_db,
+#     execution option `escrita`) abrem com BEGIN IMMEDIATE: a trava de
+#     escrita do arquivo é pega no início, esperando até busy_timeout
+#     (outro processo: script, 2º uvicorn worker), e nunca no meio de uma
+#     transação que já leu — upgrade que o SQLite recusa sem esperar.
+#     Conexões sem a opção (engine.connect() em scripts) usam BEGIN comum.
+#   - Leitores: pool separado (SQLITE_LEITORES conexões, query_only) usado
+#     por get_db_leitura / get_async_db_leitura quando não há réplicas.
+#     Rota que só lê NUNCA usa get_db: prenderia a conexão do escritor
+#     (e a trava do arquivo) e enfileiraria todas as escritas e o worker.
+# "basico" = comportamento antigo (só check_same_thread), para comparação
+# em scripts/benchmark_sqlite.py.
+def _sqlite_em_arquivo(url: str) -> bool:
+    return url.startswith("sqlite") and make_url(url).database not in (None, "", ":memory:")
+
+
+def _perfil_sqlite(url: str) -> bool:
+    return settings.SQLITE_PERFIL == "producao" and _sqlite_em_arquivo(url)
+
+
+def _aplicar_pragmas(engine: Engine, *, somente_leitura: bool) -> None:
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_conexao, _registro) -> None:
+        cursor = dbapi_conexao.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA mmap_size={settings.SQLITE_MMAP_MB * 2**20}")
+        cursor.execute(f"PRAGMA cache_size=-{settings.SQLITE_CACHE_MB * 1024}")  # negativo = KiB
+        cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+        if somente_leitura:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+
+def _begin_immediate(engine: Engine) -> None:
+    # Receita do SQLAlchemy p/ pysqlite: desliga o BEGIN implícito do driver
+    # e emite o nosso — IMMEDIATE (já com a trava de escrita) só para as
+    # transações marcadas como escrita
+    @event.listens_for(engine, "connect")
+    def _sem_begin_do_driver(dbapi_conexao, _registro) -> None:
+        dbapi_conexao.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin(conexao) -> None:
+        escrita = conexao.get_execution_options().get("escrita", False)
+        conexao.exec_driver_sql("BEGIN IMMEDIATE" if escrita else "BEGIN")
+
+
 # ─── Engine ──────────────────────────────────────────────────────────────────
 # SQLite: single-thread check desabilitado (necessário com FastAPI)
 # Postgres: connection pool configurado via settings
-if _is_sqlite:
-    engine = create_engine(
-        settings.DATABASE_URL,
-        connect_args={"check_same_thread": False},
-        echo=settings.DEBUG,
-    )
-else:
-    engine = create_engine(
-        settings.DATABASE_URL,
+# Pools com tamanho configurado usam PoolInstrumentado → /metrics, label `pool`
+def _criar_engine(url: str, *, leitura: bool = False, nome: str = "primario") -> Engine:
+    """Engine de `url`, já instrumentado. leitura=True: pool de leitores (réplica / leitores SQLite)."""
+    novo_engine = _montar_engine(url, leitura=leitura)
+    instrumentar(novo_engine)
+    novo_engine.pool.nome_metricas = nome
+    return novo_engine
+
+
+def _montar_engine(url: str, *, leitura: bool) -> Engine:
+    if url.startswith("sqlite"):
+        if not _perfil_sqlite(url):
+            return create_engine(
+                url,
+                connect_args={"check_same_thread": False},
+                echo=settings.DEBUG,
+            )
+        sqlite_engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False},
+            poolclass=PoolInstrumentado,
+            pool_size=settings.SQLITE_LEITORES if leitura else 1,
+            max_overflow=0,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            echo=settings.DEBUG,
+        )
+        _aplicar_pragmas(sqlite_engine, somente_leitura=leitura)
+        if not leitura:
+            _begin_immediate(sqlite_engine)
+        return sqlite_engine
+    return create_engine(
+        url,
+        poolclass=PoolInstrumentado,
         pool_size=settings.DB_POOL_SIZE,
         max_overflow=settings.DB_MAX_OVERFLOW,
         pool_timeout=settings.DB_POOL_TIMEOUT,
@@ -23,7 +118,20 @@ else:
         echo=settings.DEBUG,
     )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+engine = _criar_engine(settings.DATABASE_URL)
+
+# Pool de leitores do SQLite (perfil produção) — None no Postgres
+_engine_leitura_sqlite = (
+    _criar_engine(settings.DATABASE_URL, leitura=True, nome="leitura")
+    if _perfil_sqlite(settings.DATABASE_URL) else None
+)
+
+# Sessões de escrita: `escrita` → BEGIN IMMEDIATE no SQLite (sem efeito no Postgres).
+# Leitura pura → SessionLeitura / get_db_leitura.
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=engine.execution_options(escrita=True),
+)
 
 
 class Base(DeclarativeBase):
@@ -32,12 +140,269 @@ class Base(DeclarativeBase):
 
 def get_db():
     """
-    Dependency Injection do SQLAlchemy.
+    Dependency Injection do SQLAlchemy — rotas que ESCREVEM.
     Garante que cada request receba uma session isolada
     e que ela seja fechada ao final, mesmo em caso de erro.
+    Rotas só-leitura: get_db_leitura (no SQLite, get_db é o escritor único).
     """
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+# ─── Engine Assíncrono (rotas de leitura quentes) ────────────────────────────
+# Mesmo banco, driver async: asyncpg no Postgres, aiosqlite no SQLite.
+# Rotas `async def` com get_async_db esperam o banco no event loop em vez de
+# prender uma thread do threadpool do Starlette por request.
+# Pool próprio (DB_ASYNC_POOL_SIZE) — conta junto com o do engine síncrono
+# no limite de conexões do Postgres.
+# Criado sob demanda: scripts e o worker (só síncronos) não precisam dos drivers.
+_async_engine: AsyncEngine | None = None
+_AsyncSessionLocal: async_sessionmaker[AsyncSession] | None = None
+
+
+def _url_async(url: str) -> str:
+    """postgresql[+psycopg2]:// → postgresql+asyncpg://, sqlite:// → sqlite+aiosqlite://"""
+    esquema, sep, resto = url.partition("://")
+    driver = {"postgresql": "postgresql+asyncpg", "postgres": "postgresql+asyncpg",
+              "sqlite": "sqlite+aiosqlite"}.get(esquema.split("+")[0], esquema)
+    return f"{driver}{sep}{resto}"
+
+
+def _criar_async_engine(url: str, *, nome: str = "async") -> AsyncEngine:
+    if url.startswith("sqlite"):
+        async_engine = create_async_engine(
+            _url_async(url),
+            # pool padrão do aiosqlite em arquivo (5 conexões), agora medido
+            **({"poolclass": AsyncPoolInstrumentado} if _sqlite_em_arquivo(url) else {}),
+            echo=settings.DEBUG,
+        )
+        if _perfil_sqlite(url):
+            # Só leitura (query_only), como o pool de leitores: a trava de escrita
+            # fica com o escritor único (get_db, BEGIN IMMEDIATE)
+            _aplicar_pragmas(async_engine.sync_engine, somente_leitura=True)
+    else:
+        async_engine = create_async_engine(
+            _url_async(url),
+            poolclass=AsyncPoolInstrumentado,
+            pool_size=settings.DB_ASYNC_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_pre_ping=True,
+            echo=settings.DEBUG,
+        )
+    instrumentar(async_engine.sync_engine)
+    async_engine.pool.nome_metricas = nome
+    return async_engine
+
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = _criar_async_engine(settings.DATABASE_URL)
+    return _async_engine
+
+
+def AsyncSessionLocal(bind: AsyncEngine | None = None) -> AsyncSession:
+    """Nova AsyncSession (mesmas opções do SessionLocal síncrono). Padrão: primário."""
+    global _AsyncSessionLocal
+    if _AsyncSessionLocal is None:
+        _AsyncSessionLocal = async_sessionmaker(
+            get_async_engine(), autoflush=False, expire_on_commit=False,
+        )
+    return _AsyncSessionLocal(bind=bind) if bind is not None else _AsyncSessionLocal()
+
+
+async def fechar_async_engine() -> None:
+    """Fecha as conexões dos pools async — primário e réplicas (shutdown do lifespan)."""
+    global _async_engine, _AsyncSessionLocal
+    for replica in replicas.replicas:
+        await replica.fechar_async()
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine, _AsyncSessionLocal = None, None
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """
+    AsyncSession no primário — usar em rotas `async def`. No SQLite (perfil
+    produção) a conexão é query_only: rotas que escrevem usam get_db.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# ─── Réplicas de Leitura ─────────────────────────────────────────────────────
+# DATABASE_REPLICA_URLS vazio (padrão) → tudo no primário, nada muda.
+# Com réplicas, as rotas só-leitura (agenda, timeline, listagens, resumo)
+# usam get_db_leitura / get_async_db_leitura: round-robin entre as réplicas
+# saudáveis. Escritas e as demais rotas continuam em get_db (primário).
+#
+# Saúde: verificar() (job do worker) mede o atraso de replicação de cada
+# réplica; acima de REPLICA_ATRASO_MAXIMO_SEGUNDOS, ou se não responder, ela
+# sai do rodízio até a próxima medição boa. Nenhuma réplica saudável → primário.
+#
+# Read-your-writes: o middleware de consistência (main.py) registra o
+# psicólogo a cada escrita bem-sucedida e, por LEITURA_PRIMARIO_APOS_ESCRITA_SEGUNDOS
+# (> atraso máximo), as leituras dele vão ao primário — ex: a agenda logo
+# depois de criar_sessoes já mostra as sessões novas. O registro é por
+# processo: com várias instâncias, só a que recebeu a escrita o conhece.
+
+# True no request → get_*_leitura usam o primário (setado pelo middleware)
+forcar_primario: ContextVar[bool] = ContextVar("forcar_primario", default=False)
+
+
+def _medir_atraso(conexao) -> float:
+    """Segundos de atraso de replicação (0 = em dia). SQLite não replica → 0."""
+    if conexao.dialect.name != "postgresql":
+        conexao.execute(text("SELECT 1"))
+        return 0.0
+    return float(conexao.execute(text(
+        "SELECT CASE"
+        " WHEN NOT pg_is_in_recovery() THEN 0"
+        " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+        " ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+        " END"
+    )).scalar_one())
+
+
+class Replica:
+    """Uma réplica: engines sync/async criados sob demanda + último estado medido."""
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.ativa = False  # entra no rodízio só depois da 1ª medição boa
+        self.atraso_segundos: float | None = None
+        self._engine: Engine | None = None
+        self._async_engine: AsyncEngine | None = None
+
+    @property
+    def engine(self) -> Engine:
+        if self._engine is None:
+            self._engine = _criar_engine(self.url, leitura=True, nome=f"replica {self.nome}")
+        return self._engine
+
+    @property
+    def async_engine(self) -> AsyncEngine:
+        if self._async_engine is None:
+            self._async_engine = _criar_async_engine(self.url, nome=f"replica-async {self.nome}")
+        return self._async_engine
+
+    @property
+    def nome(self) -> str:
+        """URL sem senha — para log e /health."""
+        return make_url(self.url).render_as_string(hide_password=True)
+
+    async def fechar_async(self) -> None:
+        if self._async_engine is not None:
+            await self._async_engine.dispose()
+            self._async_engine = None
+
+
+class PoolReplicas:
+    """Rodízio entre réplicas saudáveis + registro de escritas recentes."""
+
+    def __init__(
+        self,
+        urls: list[str],
+        *,
+        atraso_maximo_segundos: float,
+        janela_escrita_segundos: float,
+        medir_atraso: Callable = _medir_atraso,
+    ) -> None:
+        self.replicas = [Replica(url) for url in urls]
+        self._atraso_maximo = atraso_maximo_segundos
+        self._janela_escrita = janela_escrita_segundos
+        self._medir_atraso = medir_atraso
+        self._rodizio = itertools.count()
+        self._trava = threading.Lock()
+        self._escritas: dict[int, float] = {}  # psicologo_id → monotonic da última escrita
+
+    def escolher(self) -> Replica | None:
+        """Próxima réplica saudável, ou None (= primário)."""
+        if forcar_primario.get():
+            return None
+        ativas = [r for r in self.replicas if r.ativa]
+        if not ativas:
+            return None
+        return ativas[next(self._rodizio) % len(ativas)]
+
+    def verificar(self) -> None:
+        """Mede o atraso de cada réplica e atualiza o rodízio. Nunca lança."""
+        for replica in self.replicas:
+            try:
+                with replica.engine.connect() as conexao:
+                    atraso = self._medir_atraso(conexao)
+            except SQLAlchemyError as e:
+                atraso, motivo = None, f"sem resposta ({e.__class__.__name__})"
+            else:
+                motivo = f"atraso de {atraso:.1f}s"
+
+            ativa = atraso is not None and atraso <= self._atraso_maximo
+            if ativa != replica.ativa:
+                if ativa:
+                    logger.info("Réplica %s de volta ao rodízio (%s).", replica.nome, motivo)
+                else:
+                    logger.warning("Réplica %s fora do rodízio: %s.", replica.nome, motivo)
+            replica.ativa, replica.atraso_segundos = ativa, atraso
+
+    def registrar_escrita(self, psicologo_id: int) -> None:
+        agora = time.monotonic()
+        with self._trava:
+            self._escritas[psicologo_id] = agora
+            # Limpeza preguiçosa: o dict só guarda escritas dentro da janela
+            if len(self._escritas) > 1024:
+                limite = agora - self._janela_escrita
+                self._escritas = {k: t for k, t in self._escritas.items() if t > limite}
+
+    def escreveu_recentemente(self, psicologo_id: int) -> bool:
+        ultima = self._escritas.get(psicologo_id)
+        return ultima is not None and time.monotonic() - ultima < self._janela_escrita
+
+    def estado(self) -> list[dict]:
+        return [
+            {"replica": r.nome, "ativa": r.ativa, "atraso_segundos": r.atraso_segundos}
+            for r in self.replicas
+        ]
+
+
+# Instância do processo — rotas, middleware e worker compartilham
+replicas = PoolReplicas(
+    settings.DATABASE_REPLICA_URLS,
+    atraso_maximo_segundos=settings.REPLICA_ATRASO_MAXIMO_SEGUNDOS,
+    janela_escrita_segundos=settings.LEITURA_PRIMARIO_APOS_ESCRITA_SEGUNDOS,
+)
+
+
+def SessionLeitura() -> Session:
+    """
+    Session numa réplica saudável (round-robin) ou, sem nenhuma, no primário
+    — no SQLite, pelo pool de leitores (mesmo arquivo, sem atraso).
+    """
+    replica = replicas.escolher()
+    if replica is not None:
+        return SessionLocal(bind=replica.engine)
+    return SessionLocal(bind=_engine_leitura_sqlite) if _engine_leitura_sqlite else SessionLocal()
+
+
+def AsyncSessionLeitura() -> AsyncSession:
+    """Versão AsyncSession de SessionLeitura."""
+    replica = replicas.escolher()
+    return AsyncSessionLocal(bind=replica.async_engine if replica else None)
+
+
+def get_db_leitura():
+    """get_db para rotas só-leitura: pode cair numa réplica (ver Réplicas de Leitura)."""
+    db = SessionLeitura()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db_leitura() -> AsyncIterator[AsyncSession]:
+    """get_async_db para rotas só-leitura: pode cair numa réplica."""
+    async with AsyncSessionLeitura() as db:
+        yield db
@@ -8,22 +8,43 @@ Dependência: google-auth (já no requirements.txt)
 
 Uso em produção:
     pip install google-auth requests
-    
+
     No .env:
         GOOGLE_CLIENT_ID=seu_client_id.apps.googleusercontent.com
+
+Cache dos certificados:
+    As chaves públicas do Google (kid → certificado PEM) ficam em memória
+    pelo max-age do Cache-Control da resposta. A assinatura é verificada
+    localmente — com o cache quente, o login não faz nenhuma chamada de rede.
+    Na reta final da validade a renovação roda numa thread em segundo plano
+    (o login continua usando as chaves atuais); só um cache frio ou vencido
+    bloqueia o login no fetch. A busca usa um requests.Session do módulo
+    (pool keep-alive, thread-safe para GET).
+
+    Testes offline: certificados.injetar({kid: pem}) e nenhuma rede é usada.
 """
 
 import logging
+import threading
+import time
+from collections.abc import Callable
 from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
 
 import requests
-from google.auth.transport import requests as google_requests
-from google.oauth2 import id_token
+from google.auth import exceptions as google_exceptions
+from google.auth import jwt
 
 from backend.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+_CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+_EMISSORES = ("accounts.google.com", "https://accounts.google.com")
+
+# Sessão HTTP compartilhada — criada sob demanda no primeiro fetch
+_http_session: requests.Session | None = None
+
 
 @dataclass
 class GoogleUserInfo:
@@ -39,6 +60,142 @@ class GoogleAuthError(Exception):
     pass
 
 
+# ─── Certificados ─────────────────────────────────────────────────────────────
+
+def _get_http_session() -> requests.Session:
+    global _http_session
+    if _http_session is None:
+        _http_session = requests.Session()
+    return _http_session
+
+
+def _validade_segundos(resposta: requests.Response) -> float:
+    """Segundos de validade da resposta: max-age - Age, ou Expires - Date."""
+    cache_control = resposta.headers.get("Cache-Control", "")
+    for diretiva in cache_control.split(","):
+        nome, _, valor = diretiva.strip().partition("=")
+        if nome.lower() == "max-age" and valor.isdigit():
+            idade = resposta.headers.get("Age", "0")
+            return max(0.0, int(valor) - (int(idade) if idade.isdigit() else 0))
+
+    try:
+        expira = parsedate_to_datetime(resposta.headers["Expires"])
+        data = parsedate_to_datetime(resposta.headers["Date"])
+        return max(0.0, (expira - data).total_seconds())
+    except (KeyError, TypeError, ValueError):
+        return settings.GOOGLE_CERTS_TTL_PADRAO_SEGUNDOS
+
+
+def _buscar_certificados() -> tuple[dict[str, str], float]:
+    """GET dos certificados do Google → (kid → PEM, validade em segundos)."""
+    resposta = _get_http_session().get(_CERTS_URL, timeout=settings.GOOGLE_CERTS_TIMEOUT_SEGUNDOS)
+    resposta.raise_for_status()
+    return resposta.json(), _validade_segundos(resposta)
+
+
+class CacheCertificados:
+    """
+    kid → certificado PEM com expiração. obter() só bloqueia quando o cache
+    está frio ou vencido; perto do vencimento devolve as chaves atuais e
+    dispara UMA renovação em segundo plano.
+    """
+
+    def __init__(
+        self,
+        buscar: Callable[[], tuple[dict[str, str], float]] = _buscar_certificados,
+        *,
+        antecedencia_renovacao: float = 300.0,
+        intervalo_minimo_busca: float = 30.0,
+    ):
+        self._buscar = buscar
+        self._antecedencia = antecedencia_renovacao
+        self._intervalo_minimo = intervalo_minimo_busca
+        self._certificados: dict[str, str] = {}
+        self._expira_em = 0.0
+        self._ultima_busca = float("-inf")
+        self._lock = threading.Lock()
+        # Separado de _lock: o login só tenta pegá-lo sem esperar
+        self._renovacao = threading.Lock()
+
+    def injetar(self, certificados: dict[str, str], validade_segundos: float = float("inf")) -> None:
+        """Troca as chaves sem rede (testes offline / chaves locais)."""
+        with self._lock:
+            self._certificados = dict(certificados)
+            self._expira_em = time.monotonic() + validade_segundos
+            self._ultima_busca = time.monotonic()
+
+    def obter(self, kid: str | None = None) -> dict[str, str]:
+        """
+        Certificados atuais. Com `kid` desconhecido (rotação de chaves do
+        Google antes do max-age) força uma busca — no máximo uma a cada
+        intervalo_minimo_busca, para um kid inventado não virar rajada de fetch.
+        """
+        agora = time.monotonic()
+        certificados, expira_em = self._certificados, self._expira_em
+
+        kid_desconhecido = (
+            kid is not None and kid not in certificados
+            and agora - self._ultima_busca >= self._intervalo_minimo
+        )
+        if certificados:
+            if agora < expira_em and not kid_desconhecido:
+                if expira_em - agora <= self._antecedencia:
+                    self._renovar_em_segundo_plano()
+                return certificados
+            if agora - self._ultima_busca < self._intervalo_minimo:
+                # Vencido mas acabou de tentar (Google fora?) — não martela a rede
+                return certificados
+
+        with self._lock:
+            # Outra thread pode ter buscado enquanto esperávamos o lock
+            validos = time.monotonic() < self._expira_em and (kid is None or kid in self._certificados)
+            if self._ultima_busca > agora or (self._certificados and validos):
+                return self._certificados
+            return self._atualizar()
+
+    def _atualizar(self) -> dict[str, str]:
+        """Busca e grava as chaves. Chamar com self._lock adquirido."""
+        self._ultima_busca = time.monotonic()
+        try:
+            certificados, validade = self._buscar()
+        except (requests.RequestException, ValueError) as e:
+            if not self._certificados:
+                raise GoogleAuthError(f"Não foi possível obter os certificados do Google: {e}") from e
+            # Melhor aceitar chaves vencidas por alguns segundos que derrubar o login
+            logger.warning("Falha ao renovar certificados do Google (usando os atuais): %s", e)
+            return self._certificados
+        self._certificados = certificados
+        self._expira_em = self._ultima_busca + validade
+        logger.info("Certificados do Google atualizados: %d chaves, válidos por %.0fs.", len(certificados), validade)
+        return certificados
+
+    def _renovar_em_segundo_plano(self) -> None:
+        if not self._renovacao.acquire(blocking=False):
+            return  # já há uma renovação em andamento
+
+        def _renovar() -> None:
+            try:
+                with self._lock:
+                    self._atualizar()
+            except GoogleAuthError as e:
+                logger.warning("Renovação em segundo plano falhou: %s", e)
+            finally:
+                self._renovacao.release()
+
+        threading.Thread(target=_renovar, name="google-certs", daemon=True).start()
+
+    def aquecer(self) -> None:
+        """Busca as chaves em segundo plano (startup) para o 1º login não esperar."""
+        if not self._certificados:
+            self._renovar_em_segundo_plano()
+
+
+# Instância do processo — todas as verificações compartilham o cache
+certificados = CacheCertificados()
+
+
+# ─── Verificação ──────────────────────────────────────────────────────────────
+
 def verificar_google_token(id_token_str: str) -> GoogleUserInfo:
     """
     Verifica um Google ID Token e retorna os dados do usuário.
@@ -65,18 +222,20 @@ def verificar_google_token(id_token_str: str) -> GoogleUserInfo:
         )
 
     try:
-        # google-auth verifica:
+        # google-auth verifica, com as chaves públicas do cache:
         # 1. Assinatura criptográfica com as chaves públicas do Google
         # 2. Campo 'aud' bate com nosso CLIENT_ID (evita token de outro app)
         # 3. Token não expirado ('exp')
-        # 4. Token foi emitido pelo Google ('iss')
-        request = google_requests.Request()
-        payload = id_token.verify_oauth2_token(
+        # Em seguida conferimos que foi emitido pelo Google ('iss')
+        kid = jwt.decode_header(id_token_str).get("kid")
+        payload = jwt.decode(
             id_token_str,
-            request,
-            settings.GOOGLE_CLIENT_ID,
+            certs=certificados.obter(kid),
+            audience=settings.GOOGLE_CLIENT_ID,
         )
-    except ValueError as e:
+        if payload.get("iss") not in _EMISSORES:
+            raise ValueError(f"Emissor inválido: {payload.get('iss')!r}.")
+    except (ValueError, google_exceptions.GoogleAuthError) as e:
         logger.warning("Falha na verificação do token Google: %s", e)
         raise GoogleAuthError(f"Token Google inválido: {e}") from e
 
@@ -0,0 +1,171 @@
+"""
+core/instrumentacao_sql.py — Contagem e tempo de SQL por request / job
+
+Problema:
+    N+1 (uma query por item de uma lista) só aparecia quando já doía em
+    produção — /faturas/pendentes, o despacho do worker, contagens de
+    total_sessoes.
+
+Solução:
+    Hooks before/after_cursor_execute em todo engine de core/database
+    (primário, leitores, réplicas e os async) somam, no EstatisticasSQL do
+    contexto atual (ContextVar): número de statements, tempo total no banco
+    e quantas vezes cada statement se repetiu (fingerprint = SQL com
+    parâmetros, espaços e listas IN normalizados).
+
+    - Request: middleware em main.py → header `Server-Timing: db;dur=…` (visível
+      no DevTools / Axios), log estruturado por rota e WARNING acima de
+      SQL_ALERTA_CONSULTAS / SQL_ALERTA_MS, ou quando um mesmo statement
+      repete SQL_ALERTA_REPETICOES vezes (suspeita de N+1).
+    - Worker: cada tick roda dentro de medir_sql() com os mesmos alertas.
+    - Fora de um medir_sql() os hooks não fazem nada além de um ContextVar.get().
+
+    Streaming (NDJSON): o header sai antes do corpo — as queries feitas
+    durante o stream não entram no Server-Timing.
+
+Orçamento de statements (testes / scripts):
+
+    with orcamento_sql(3):
+        client.get("/faturas/pendentes", headers=auth)   # AssertionError se > 3
+
+    Nos testes é a fixture `orcamento` (backend/tests/conftest.py):
+
+        def test_pendentes(client, auth, orcamento):
+            with orcamento(1):
+                client.get("/faturas/pendentes", headers=auth)
+"""
+
+import logging
+import re
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any
+
+from sqlalchemy import Engine, event
+
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Placeholders dos drivers: ? (sqlite), %(nome)s / %s (psycopg2), $1 (asyncpg)
+_PARAMETRO = r"(?:\?|%\(\w+\)s|%s|\$\d+)"
+_LISTA_PARAMETROS = re.compile(rf"\(\s*{_PARAMETRO}(?:\s*,\s*{_PARAMETRO})+\s*\)")
+_ESPACOS = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """SQL normalizado: `IN (?, ?, ?)` e `IN (?, ?)` viram o mesmo statement."""
+    return _LISTA_PARAMETROS.sub("(…)", _ESPACOS.sub(" ", statement).strip())
+
+
+@dataclass
+class EstatisticasSQL:
+    """Acumulado de um request/job. Aninhado (orcamento_sql) soma no pai também."""
+    consultas: int = 0
+    tempo_ms: float = 0.0
+    repeticoes: Counter = field(default_factory=Counter)
+    pai: "EstatisticasSQL | None" = None
+
+    def registrar(self, statement: str, duracao_ms: float) -> None:
+        chave = fingerprint(statement)
+        estatisticas: EstatisticasSQL | None = self
+        while estatisticas is not None:
+            estatisticas.consultas += 1
+            estatisticas.tempo_ms += duracao_ms
+            estatisticas.repeticoes[chave] += 1
+            estatisticas = estatisticas.pai
+
+    def mais_repetida(self) -> tuple[str, int] | None:
+        """(fingerprint, vezes) do statement mais repetido, se houver algum."""
+        return self.repeticoes.most_common(1)[0] if self.repeticoes else None
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.tempo_ms:.1f};desc="{self.consultas} SQL"'
+
+    def alertas(self) -> list[str]:
+        motivos = []
+        if self.consultas > settings.SQL_ALERTA_CONSULTAS:
+            motivos.append(f"{self.consultas} statements")
+        if self.tempo_ms > settings.SQL_ALERTA_MS:
+            motivos.append(f"{self.tempo_ms:.0f}ms no banco")
+        repetida = self.mais_repetida()
+        if repetida and repetida[1] >= settings.SQL_ALERTA_REPETICOES:
+            motivos.append(f"statement repetido {repetida[1]}x (N+1?)")
+        return motivos
+
+
+_atual: ContextVar[EstatisticasSQL | None] = ContextVar("estatisticas_sql", default=None)
+
+
+# ─── Hooks no Engine ──────────────────────────────────────────────────────────
+
+def instrumentar(engine: Engine) -> None:
+    """Registra os hooks de cursor. Engines async: passar `.sync_engine`."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _antes(conexao, cursor, statement, parametros, contexto, executemany) -> None:
+        if _atual.get() is not None:
+            conexao.info.setdefault("inicio_sql", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _depois(conexao, cursor, statement, parametros, contexto, executemany) -> None:
+        estatisticas = _atual.get()
+        if estatisticas is not None and conexao.info.get("inicio_sql"):
+            inicio = conexao.info["inicio_sql"].pop()
+            estatisticas.registrar(statement, (time.perf_counter() - inicio) * 1000)
+
+
+# ─── Medição ──────────────────────────────────────────────────────────────────
+
+@contextmanager
+def medir_sql() -> Iterator[EstatisticasSQL]:
+    """Mede todo SQL executado neste contexto (e nas threads/tasks que ele criar)."""
+    estatisticas = EstatisticasSQL(pai=_atual.get())
+    marca = _atual.set(estatisticas)
+    try:
+        yield estatisticas
+    finally:
+        _atual.reset(marca)
+
+
+@contextmanager
+def orcamento_sql(maximo_consultas: int) -> Iterator[EstatisticasSQL]:
+    """medir_sql() que lança AssertionError se o bloco passar de `maximo_consultas`."""
+    with medir_sql() as estatisticas:
+        yield estatisticas
+    if estatisticas.consultas > maximo_consultas:
+        repetida = estatisticas.mais_repetida()
+        raise AssertionError(
+            f"Orçamento de SQL estourado: {estatisticas.consultas} statements "
+            f"(máximo {maximo_consultas}). Mais repetido ({repetida[1]}x): {repetida[0][:300]}"
+        )
+
+
+def registrar_sql(rotulo: str, estatisticas: EstatisticasSQL, **contexto: Any) -> None:
+    """Log estruturado do acumulado (`extra={"sql": …}`); WARNING se passou de algum limite."""
+    dados = {
+        "rotulo": rotulo,
+        "consultas": estatisticas.consultas,
+        "tempo_ms": round(estatisticas.tempo_ms, 1),
+        **contexto,
+    }
+    motivos = estatisticas.alertas()
+    if not motivos:
+        logger.info(
+            "SQL %s: %d statement(s) em %.1fms",
+            rotulo, estatisticas.consultas, estatisticas.tempo_ms, extra={"sql": dados},
+        )
+        return
+
+    repetida = estatisticas.mais_repetida()
+    dados["mais_repetida"] = {"sql": repetida[0][:500], "vezes": repetida[1]}
+    logger.warning(
+        "SQL %s acima do limite (%s). Mais repetido (%dx): %s",
+        rotulo, ", ".join(motivos), repetida[1], repetida[0][:300], extra={"sql": dados},
+    )
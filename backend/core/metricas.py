@@ -0,0 +1,276 @@
+"""
+core/metricas.py — Métricas no formato de exposição do Prometheus (GET /metrics)
+
+Problema:
+    O health check dizia `"worker": "running"` sem olhar nada, e não havia
+    como ver latência por rota, fila do pool de conexões ou o atraso do
+    worker de notificações sem ler log.
+
+Solução:
+    Três tipos mínimos, sem dependência externa (formato texto 0.0.4):
+      - Contador   — só sobe (`_total`).
+      - Histograma — buckets cumulativos + `_sum` / `_count`.
+      - Medidor    — valor atual (gauge); preenchido na coleta.
+
+    Caminho quente sem trava: cada thread escreve no seu próprio dict
+    (threading.local) — observe()/inc() são um getattr, um bisect e somas
+    num dict que nenhuma outra thread altera. A trava só é pega ao criar
+    a fatia de uma thread nova (uma vez por thread) e na coleta, que soma
+    as fatias. No event loop (middleware HTTP) é sempre a mesma fatia.
+
+    Coletores (`ao_coletar`) rodam a cada GET /metrics e atualizam os
+    Medidores que dependem de estado externo — pools de conexão, backlog de
+    notificações no banco. Um coletor que falha é logado e pulado; a
+    exposição nunca quebra por causa dele.
+
+Instrumentado aqui:
+    - HTTP: latência por rota (template, não a URL) e requests por status.
+    - Pools SQLAlchemy (PoolInstrumentado): conexões em uso, overflow,
+      tempo de checkout (espera na fila + conexão nova + pre-ping), timeouts.
+    - Worker: ver core/worker_notificacoes (tick, backlog, envio, falhas).
+
+Multi-processo: cada processo uvicorn expõe os próprios números — o
+Prometheus raspa cada instância (label `instance`) e soma na consulta.
+"""
+
+import logging
+import math
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from collections.abc import Callable, Iterator
+from weakref import WeakSet
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+# Segundos: de 5ms (rota que só lê o cache) a 10s (timeline de anos, sem stream)
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registro: list["_Metrica"] = []
+_coletores: list[Callable[[], None]] = []
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _rotulos(nomes: tuple[str, ...], valores: tuple[str, ...], extra: str = "") -> str:
+    pares = [f'{nome}="{_escapar(str(valor))}"' for nome, valor in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _numero(valor: float) -> str:
+    if math.isinf(valor):
+        return "+Inf" if valor > 0 else "-Inf"
+    return repr(float(valor))
+
+
+# ─── Tipos ────────────────────────────────────────────────────────────────────
+
+class _Metrica:
+    tipo = ""
+
+    def __init__(self, nome: str, ajuda: str, rotulos: tuple[str, ...] = ()) -> None:
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = rotulos
+        self._local = threading.local()
+        self._fatias: list[dict] = []
+        self._trava = threading.Lock()
+        _registro.append(self)
+
+    def _fatia(self) -> dict:
+        """Dict desta thread — só ela escreve nele."""
+        fatia = getattr(self._local, "fatia", None)
+        if fatia is None:
+            fatia = self._local.fatia = {}
+            with self._trava:
+                self._fatias.append(fatia)
+        return fatia
+
+    def _copias(self) -> list[dict]:
+        with self._trava:
+            fatias = list(self._fatias)
+        return [fatia.copy() for fatia in fatias]  # dict.copy() é atômico sob o GIL
+
+    def _linhas(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def exportar(self) -> Iterator[str]:
+        yield f"# HELP {self.nome} {self.ajuda}"
+        yield f"# TYPE {self.nome} {self.tipo}"
+        yield from self._linhas()
+
+
+class Contador(_Metrica):
+    """Só sobe. inc(*valores_dos_rotulos, valor=1)."""
+    tipo = "counter"
+
+    def inc(self, *rotulos: str, valor: float = 1.0) -> None:
+        fatia = self._fatia()
+        fatia[rotulos] = fatia.get(rotulos, 0.0) + valor
+
+    def _linhas(self) -> Iterator[str]:
+        total: dict[tuple, float] = defaultdict(float)
+        for fatia in self._copias():
+            for chave, valor in fatia.items():
+                total[chave] += valor
+        for chave in sorted(total):
+            yield f"{self.nome}{_rotulos(self.rotulos, chave)} {_numero(total[chave])}"
+
+
+class Histograma(_Metrica):
+    """Distribuição em buckets. observe(valor, *valores_dos_rotulos)."""
+    tipo = "histogram"
+
+    def __init__(
+        self, nome: str, ajuda: str, rotulos: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = BUCKETS_LATENCIA,
+    ) -> None:
+        super().__init__(nome, ajuda, rotulos)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, valor: float, *rotulos: str) -> None:
+        fatia = self._fatia()
+        contagens = fatia.get(rotulos)
+        if contagens is None:
+            # um contador por bucket (não cumulativo) + o +Inf + a soma
+            contagens = fatia[rotulos] = [0.0] * (len(self.buckets) + 2)
+        contagens[bisect_left(self.buckets, valor)] += 1
+        contagens[-1] += valor
+
+    def _linhas(self) -> Iterator[str]:
+        total: dict[tuple, list[float]] = {}
+        for fatia in self._copias():
+            for chave, contagens in fatia.items():
+                acumulado = total.setdefault(chave, [0.0] * len(contagens))
+                for i, valor in enumerate(list(contagens)):
+                    acumulado[i] += valor
+        for chave in sorted(total):
+            contagens = total[chave]
+            cumulativo = 0.0
+            for limite, contagem in zip((*self.buckets, math.inf), contagens):
+                cumulativo += contagem
+                rotulos = _rotulos(self.rotulos, chave, f'le="{_numero(limite)}"')
+                yield f"{self.nome}_bucket{rotulos} {_numero(cumulativo)}"
+            rotulos = _rotulos(self.rotulos, chave)
+            yield f"{self.nome}_sum{rotulos} {_numero(contagens[-1])}"
+            yield f"{self.nome}_count{rotulos} {_numero(cumulativo)}"
+
+
+class Medidor(_Metrica):
+    """Valor atual (gauge). set(valor, *valores_dos_rotulos) — em geral num coletor."""
+    tipo = "gauge"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: tuple[str, ...] = ()) -> None:
+        super().__init__(nome, ajuda, rotulos)
+        self._valores: dict[tuple, float] = {}
+
+    def set(self, valor: float, *rotulos: str) -> None:
+        self._valores[rotulos] = valor
+
+    def _linhas(self) -> Iterator[str]:
+        valores = self._valores.copy()
+        for chave in sorted(valores):
+            yield f"{self.nome}{_rotulos(self.rotulos, chave)} {_numero(valores[chave])}"
+
+
+def ao_coletar(coletor: Callable[[], None]) -> Callable[[], None]:
+    """Registra uma função chamada a cada exportação (pode ser usado como decorator)."""
+    _coletores.append(coletor)
+    return coletor
+
+
+def exportar() -> str:
+    """Todas as métricas do processo no formato texto do Prometheus."""
+    for coletor in list(_coletores):
+        try:
+            coletor()
+        except Exception as e:
+            logger.warning("Métricas: coletor %s falhou — %s", coletor.__name__, e)
+    linhas = [linha for metrica in _registro for linha in metrica.exportar()]
+    return "\n".join(linhas) + "\n"
+
+
+# ─── HTTP ─────────────────────────────────────────────────────────────────────
+
+HTTP_DURACAO = Histograma(
+    "cori_http_requisicao_duracao_segundos",
+    "Latência das requisições HTTP, por método e rota (template).",
+    ("metodo", "rota"),
+)
+HTTP_REQUISICOES = Contador(
+    "cori_http_requisicoes_total",
+    "Requisições HTTP atendidas, por método, rota e status.",
+    ("metodo", "rota", "status"),
+)
+
+
+# ─── Pools de Conexão ─────────────────────────────────────────────────────────
+# poolclass dos engines de core/database. `nome_metricas` vira o label `pool`.
+
+POOL_CHECKOUT = Histograma(
+    "cori_db_pool_checkout_segundos",
+    "Tempo para obter uma conexão do pool (fila + conexão nova + pre-ping).",
+    ("pool",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+POOL_TIMEOUTS = Contador(
+    "cori_db_pool_timeouts_total",
+    "Checkouts que estouraram DB_POOL_TIMEOUT esperando conexão.",
+    ("pool",),
+)
+POOL_EM_USO = Medidor("cori_db_pool_conexoes_em_uso", "Conexões emprestadas (checked out).", ("pool",))
+POOL_OCIOSAS = Medidor("cori_db_pool_conexoes_ociosas", "Conexões abertas paradas no pool.", ("pool",))
+POOL_OVERFLOW = Medidor("cori_db_pool_overflow", "Conexões abertas além de pool_size.", ("pool",))
+POOL_TAMANHO = Medidor("cori_db_pool_tamanho", "pool_size configurado.", ("pool",))
+
+_pools: WeakSet = WeakSet()
+
+
+class _Instrumentacao:
+    nome_metricas = "primario"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        _pools.add(self)
+
+    def connect(self):
+        inicio = time.perf_counter()
+        try:
+            conexao = super().connect()
+        except PoolTimeoutError:
+            POOL_TIMEOUTS.inc(self.nome_metricas)
+            raise
+        POOL_CHECKOUT.observe(time.perf_counter() - inicio, self.nome_metricas)
+        return conexao
+
+    def recreate(self):
+        # engine.dispose() troca o pool por um novo — o nome vai junto
+        novo = super().recreate()
+        novo.nome_metricas = self.nome_metricas
+        return novo
+
+
+class PoolInstrumentado(_Instrumentacao, QueuePool):
+    """QueuePool com tempo de checkout, timeouts e ocupação em /metrics."""
+
+
+class AsyncPoolInstrumentado(_Instrumentacao, AsyncAdaptedQueuePool):
+    """Mesmo que PoolInstrumentado, para engines async (asyncpg / aiosqlite)."""
+
+
+@ao_coletar
+def _coletar_pools() -> None:
+    for pool in list(_pools):
+        nome = pool.nome_metricas
+        POOL_EM_USO.set(pool.checkedout(), nome)
+        POOL_OCIOSAS.set(pool.checkedin(), nome)
+        POOL_OVERFLOW.set(max(pool.overflow(), 0), nome)  # negativo = ainda nem abriu pool_size
+        POOL_TAMANHO.set(pool.size(), nome)
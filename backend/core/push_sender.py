@@ -3,9 +3,16 @@ core/push_sender.py — Adapter de envio de Push Notifications
 
 Design Pattern: Adapter / Strategy
     - Interface única: send_push(token, title, body, data)
+    - Interface em lote: send_push_batch([MensagemPush, ...]) — usada pelo worker
     - Implementação atual: simulada (log) para MVP
     - Próxima iteração: trocar _send_expo ou _send_fcm sem mudar os callers
 
+Envio em lote (Expo Push API):
+    Com settings.PUSH_PROVIDER_URL preenchido, send_push_batch faz UM POST com
+    até PUSH_LOTE_TAMANHO mensagens e lê um ticket por mensagem, na mesma ordem.
+    O httpx.Client é um singleton do módulo (pool de conexões keep-alive) e é
+    thread-safe — o worker chama send_push_batch a partir de várias threads.
+
 Para produção com Expo Push:
     pip install pyexponent-push-client
     from exponent_server_sdk import PushClient, PushMessage
@@ -17,10 +24,27 @@ Para produção com Firebase FCM:
 """
 
 import logging
+from dataclasses import dataclass
 from typing import Any
 
+import httpx
+
+from backend.core.config import settings
+
 logger = logging.getLogger(__name__)
 
+# Cliente HTTP compartilhado — criado sob demanda no primeiro envio real
+_http_client: httpx.Client | None = None
+
+
+@dataclass
+class MensagemPush:
+    """Uma push notification pronta para envio (formato neutro de provider)."""
+    token: str
+    title: str
+    body: str
+    data: dict[str, Any] | None = None
+
 
 class PushSendError(Exception):
     """Lança quando o envio de push falha definitivamente."""
@@ -61,6 +85,82 @@ def send_push(
     return True
 
 
+def _token_valido(token: str | None) -> bool:
+    return bool(token) and len(token.strip()) >= 5
+
+
+def _get_http_client() -> httpx.Client:
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.Client(
+            timeout=settings.PUSH_TIMEOUT_SEGUNDOS,
+            limits=httpx.Limits(max_keepalive_connections=settings.PUSH_MAX_CONCORRENCIA),
+        )
+    return _http_client
+
+
+def send_push_batch(mensagens: list[MensagemPush]) -> list[bool]:
+    """
+    Envia um lote de push notifications numa única chamada ao provider.
+
+    Returns:
+        Lista de bool alinhada com `mensagens`: True se aceita pelo provider,
+        False se o token é inválido ou o provider rejeitou a mensagem.
+
+    Raises:
+        PushSendError: em falha de rede ou resposta inesperada (o lote inteiro falha).
+    """
+    if len(mensagens) > settings.PUSH_LOTE_TAMANHO:
+        raise ValueError(
+            f"Lote com {len(mensagens)} mensagens excede PUSH_LOTE_TAMANHO "
+            f"({settings.PUSH_LOTE_TAMANHO})."
+        )
+
+    resultados = [False] * len(mensagens)
+    validas = [i for i, m in enumerate(mensagens) if _token_valido(m.token)]
+    if len(validas) < len(mensagens):
+        logger.warning("Push ignorado: %d token(s) inválido(s) ou vazio(s) no lote.",
+                       len(mensagens) - len(validas))
+    if not validas:
+        return resultados
+
+    # ── MVP: simulação de envio (sem provider configurado) ───────────────────
+    if not settings.PUSH_PROVIDER_URL:
+        for i in validas:
+            m = mensagens[i]
+            logger.info(
+                "📲 PUSH ENVIADO | token=%s | title=%r | body=%r | data=%s",
+                m.token[:12] + "…", m.title, m.body, m.data or {},
+            )
+            resultados[i] = True
+        return resultados
+
+    payload = [
+        {"to": mensagens[i].token, "title": mensagens[i].title,
+         "body": mensagens[i].body, "data": mensagens[i].data or {}}
+        for i in validas
+    ]
+    try:
+        resposta = _get_http_client().post(settings.PUSH_PROVIDER_URL, json=payload)
+        resposta.raise_for_status()
+        tickets = resposta.json()["data"]
+    except (httpx.HTTPError, ValueError, KeyError) as e:
+        raise PushSendError(f"Falha no envio do lote ({len(payload)} mensagens): {e}") from e
+
+    if len(tickets) != len(validas):
+        raise PushSendError(
+            f"Provider devolveu {len(tickets)} tickets para {len(validas)} mensagens."
+        )
+
+    for i, ticket in zip(validas, tickets):
+        if ticket.get("status") == "ok":
+            resultados[i] = True
+        else:
+            logger.warning("Push rejeitado pelo provider | token=%s | %s",
+                           mensagens[i].token[:12] + "…", ticket.get("message"))
+    return resultados
+
+
 def send_push_to_psicologo(
     psicologo_token: str | None,
     title: str,
@@ -0,0 +1,128 @@
+"""
+core/rrule.py — Subconjunto de RRULE (RFC 5545) para séries de sessões
+
+Suportado:
+    FREQ=DAILY|WEEKLY    INTERVAL=n    COUNT=n | UNTIL=AAAAMMDD[THHMMSSZ]
+    BYDAY=MO,TU,...      (apenas com FREQ=WEEKLY)
+
+    Ex: "FREQ=WEEKLY;BYDAY=MO,TH"        → toda segunda e quinta
+        "FREQ=WEEKLY;INTERVAL=2;COUNT=10" → quinzenal, 10 sessões
+
+A expansão é preguiçosa e salta direto para a janela pedida (sem iterar
+desde o DTSTART), então o custo depende só do tamanho da janela — exceto
+com COUNT, em que o índice da ocorrência é calculado aritmeticamente.
+
+Tudo em UTC: consultório no Brasil não tem horário de verão desde 2019.
+"""
+
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+_DIAS_SEMANA = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+_FREQUENCIAS = ("DAILY", "WEEKLY")
+CONTAGEM_MAXIMA = 1000
+
+
+@dataclass(frozen=True)
+class RegraRecorrencia:
+    frequencia: str
+    intervalo: int = 1
+    contagem: int | None = None
+    ate: datetime | None = None
+    dias_semana: tuple[int, ...] = ()
+
+
+def _utc(dt: datetime) -> datetime:
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt
+
+
+def _parse_until(valor: str) -> datetime:
+    for formato in ("%Y%m%dT%H%M%SZ", "%Y%m%d"):
+        try:
+            dt = datetime.strptime(valor, formato).replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+        # UNTIL só com data vale até o fim do dia
+        return dt if "T" in valor else dt + timedelta(days=1, microseconds=-1)
+    raise ValueError(f"UNTIL inválido: '{valor}'.")
+
+
+def parse(texto: str) -> RegraRecorrencia:
+    """Converte o texto RRULE em RegraRecorrencia. Lança ValueError se inválido."""
+    partes: dict[str, str] = {}
+    for parte in texto.strip().upper().removeprefix("RRULE:").split(";"):
+        if not parte:
+            continue
+        chave, sep, valor = parte.partition("=")
+        if not sep or not valor:
+            raise ValueError(f"Parte de RRULE inválida: '{parte}'.")
+        partes[chave.upper()] = valor.upper()
+
+    frequencia = partes.pop("FREQ", None)
+    if frequencia not in _FREQUENCIAS:
+        raise ValueError(f"FREQ deve ser uma de {', '.join(_FREQUENCIAS)}.")
+
+    try:
+        intervalo = int(partes.pop("INTERVAL", "1"))
+        contagem = int(partes["COUNT"]) if "COUNT" in partes else None
+    except ValueError as e:
+        raise ValueError("INTERVAL e COUNT devem ser inteiros.") from e
+    partes.pop("COUNT", None)
+    if not 1 <= intervalo <= 52:
+        raise ValueError("INTERVAL deve estar entre 1 e 52.")
+    if contagem is not None and not 1 <= contagem <= CONTAGEM_MAXIMA:
+        raise ValueError(f"COUNT deve estar entre 1 e {CONTAGEM_MAXIMA}.")
+
+    ate = _parse_until(partes.pop("UNTIL")) if "UNTIL" in partes else None
+    if contagem is not None and ate is not None:
+        raise ValueError("COUNT e UNTIL não podem ser usados juntos.")
+
+    dias_semana: tuple[int, ...] = ()
+    if "BYDAY" in partes:
+        if frequencia != "WEEKLY":
+            raise ValueError("BYDAY só é suportado com FREQ=WEEKLY.")
+        try:
+            dias_semana = tuple(sorted({_DIAS_SEMANA[d] for d in partes.pop("BYDAY").split(",")}))
+        except KeyError as e:
+            raise ValueError(f"Dia inválido em BYDAY: {e.args[0]}.") from e
+
+    if partes:
+        raise ValueError(f"Partes de RRULE não suportadas: {', '.join(sorted(partes))}.")
+
+    return RegraRecorrencia(frequencia, intervalo, contagem, ate, dias_semana)
+
+
+def ocorrencias(
+    regra: RegraRecorrencia, dtstart: datetime, inicio: datetime, fim: datetime
+) -> Iterator[datetime]:
+    """Ocorrências em [inicio, fim] (inclusive), em ordem crescente, todas em UTC."""
+    dtstart, inicio, fim = _utc(dtstart), _utc(inicio), _utc(fim)
+
+    if regra.frequencia == "DAILY":
+        periodo = timedelta(days=regra.intervalo)
+        base = dtstart
+        deslocamentos = [timedelta(0)]
+    else:
+        periodo = timedelta(weeks=regra.intervalo)
+        base = dtstart - timedelta(days=dtstart.weekday())  # segunda da semana do DTSTART
+        dias = regra.dias_semana or (dtstart.weekday(),)
+        deslocamentos = [timedelta(days=d) for d in dias]
+
+    # Ocorrências do 1º período anteriores ao DTSTART não contam (RFC 5545)
+    puladas = sum(1 for d in deslocamentos if base + d < dtstart)
+
+    # Salta direto para o período que contém `inicio`: deslocamentos < 1 período
+    k = max(0, (inicio - base) // periodo)
+    while base + k * periodo <= fim:
+        for j, deslocamento in enumerate(deslocamentos):
+            dt = base + k * periodo + deslocamento
+            if dt < dtstart:
+                continue
+            if regra.contagem is not None and k * len(deslocamentos) + j - puladas >= regra.contagem:
+                return
+            if (regra.ate is not None and dt > regra.ate) or dt > fim:
+                return
+            if dt >= inicio:
+                yield dt
+        k += 1
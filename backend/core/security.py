@@ -1,13 +1,19 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
 
 from backend.core.config import settings
-from backend.core.database import get_db
+from backend.core.database import SessionLocal
+
+logger = logging.getLogger(__name__)
 
 # O tokenUrl aponta para o endpoint de login — mesmo sendo Google OAuth,
 # mantemos o padrão do FastAPI para documentação automática no Swagger.
@@ -47,41 +53,96 @@ def decode_token(token: str) -> dict[str, Any]:
         raise credentials_exception
 
 
-def get_current_psicologo_id(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> int:
+# ─── Cache de Tokens Decodificados ────────────────────────────────────────────
+# sha256(token) → (psicologo_id, exp). LRU limitada a AUTH_CACHE_TOKENS; cada
+# entrada vale até o exp do próprio token. Um hit dispensa a verificação HMAC.
+_cache_tokens: OrderedDict[bytes, tuple[int, float]] = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def psicologo_id_do_token(token: str) -> int:
+    """
+    ID do Psicólogo de um JWT válido — só CPU, sem banco.
+    Lança HTTPException 401 se o token for inválido ou expirado.
+    """
+    chave = hashlib.sha256(token.encode()).digest()
+    with _cache_lock:
+        em_cache = _cache_tokens.get(chave)
+        if em_cache is not None:
+            if em_cache[1] > time.time():
+                _cache_tokens.move_to_end(chave)
+                return em_cache[0]
+            del _cache_tokens[chave]
+
+    payload = decode_token(token)
+    try:
+        psicologo_id = int(payload.get("sub"))
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token com formato de ID inválido.",
+        )
+
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        with _cache_lock:
+            _cache_tokens[chave] = (psicologo_id, float(exp))
+            _cache_tokens.move_to_end(chave)
+            while len(_cache_tokens) > settings.AUTH_CACHE_TOKENS:
+                _cache_tokens.popitem(last=False)
+    return psicologo_id
+
+
+async def get_current_psicologo_id(token: str = Depends(oauth2_scheme)) -> int:
     """
     Dependency que extrai o ID do Psicólogo do JWT.
     Nunca confia no corpo da requisição — SEMPRE extrai do token.
     Use como: psicologo_id: int = Depends(get_current_psicologo_id)
+
+    Não abre sessão de banco: handlers que não consultam o banco não
+    ocupam conexão do pool só para autenticar. `async def` (só CPU, com o
+    LRU quente) para rodar no event loop — sem passar pelo threadpool.
     """
-    if token == "mock_dev_token_123":
-        # Seeder Automático para Bypass de Dev
-        from backend.models.psicologo import Psicologo
-        import logging
-        logger = logging.getLogger(__name__)
-
-        mock_psi = db.query(Psicologo).filter(Psicologo.id == 999).first()
-        if not mock_psi:
+    return psicologo_id_do_token(token)
+
+
+# ─── Bypass de Dev (apenas DEBUG) ─────────────────────────────────────────────
+DEV_TOKEN = "mock_dev_token_123"
+DEV_PSICOLOGO_ID = 999
+_psicologo_dev_garantido = False
+
+
+def _garantir_psicologo_dev() -> None:
+    """Seeder automático do Psicólogo Fantasma (ID=999) — uma vez por processo."""
+    global _psicologo_dev_garantido
+    if _psicologo_dev_garantido:
+        return
+
+    from backend.models.psicologo import Psicologo
+
+    db = SessionLocal()
+    try:
+        if db.get(Psicologo, DEV_PSICOLOGO_ID) is None:
             logger.info("🛠️ Dev Bypass Ativado — Criando Psicólogo Fantasma (ID=999) no DB...")
-            mock_psi = Psicologo(
-                id=999,
+            db.add(Psicologo(
+                id=DEV_PSICOLOGO_ID,
                 google_id="dev_bypass_mock_id",
                 email="dev@teste.com",
                 nome_exibicao="Dr. Mock",
-                slug_link_publico="dr-mock"
-            )
-            db.add(mock_psi)
+                slug_link_publico="dr-mock",
+            ))
             db.commit()
-        return 999
+    finally:
+        db.close()
+    _psicologo_dev_garantido = True
 
-    payload = decode_token(token)
-    psicologo_id = payload.get("sub")
-    try:
-        return int(psicologo_id)
-    except (TypeError, ValueError):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token com formato de ID inválido.",
-        )
+
+def get_current_psicologo_id_dev(token: str = Depends(oauth2_scheme)) -> int:
+    """
+    get_current_psicologo_id + aceita DEV_TOKEN como o Psicólogo 999.
+    Registrada em main.py via dependency_overrides SOMENTE com DEBUG=true.
+    """
+    if token == DEV_TOKEN:
+        _garantir_psicologo_dev()
+        return DEV_PSICOLOGO_ID
+    return psicologo_id_do_token(token)
@@ -0,0 +1,187 @@
+"""
+core/sinal_notificacoes.py — Sinal de "notificações mudaram" para o worker
+
+Problema:
+    O worker mantém em memória os próximos disparos (core/agendador_memoria)
+    e dorme até o mais cedo. Notificações criadas ou removidas depois precisam
+    chegar até ele — senão esperaria a varredura de segurança inteira.
+
+Como funciona:
+    1. after_flush (qualquer Session): coleta (id, disparo) das
+       NotificacaoLembrete novas e os ids das removidas em session.info.
+       No Postgres emite também pg_notify() na MESMA transação — o NOTIFY só
+       é entregue se o commit acontecer.
+    2. after_commit: entrega aos ouvintes locais (o worker registra o seu)
+       as novas e as removidas. after_rollback descarta o que foi coletado.
+    3. Multi-instância (Postgres): uma thread daemon faz LISTEN no canal e
+       repassa o que chega das outras instâncias aos ouvintes locais.
+
+Inserts/deletes em massa via Core (fora do unit of work) chamam
+registrar_disparos() / registrar_remocoes().
+"""
+
+import json
+import logging
+import select
+import threading
+from collections.abc import Callable
+from datetime import datetime
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from backend.core.database import engine
+from backend.models.notificacao import NotificacaoLembrete
+
+logger = logging.getLogger(__name__)
+
+CANAL_POSTGRES = "cori_notificacoes"
+# Payload do NOTIFY é limitado a 8000 bytes — lotes grandes viram vários NOTIFY
+_ITENS_POR_PAYLOAD = 150
+
+_CHAVE_NOVAS = "notificacoes_novas"
+_CHAVE_REMOVIDAS = "notificacoes_removidas"
+
+# ouvinte(novas=[(id, disparo), ...], removidas=[id, ...])
+Ouvinte = Callable[[list[tuple[int, datetime]], list[int]], None]
+_ouvintes: list[Ouvinte] = []
+_parar_escuta = threading.Event()
+_thread_escuta: threading.Thread | None = None
+
+
+def registrar_ouvinte(ouvinte: Ouvinte) -> None:
+    """Registra um callback chamado com as notificações novas e removidas de cada commit."""
+    if ouvinte not in _ouvintes:
+        _ouvintes.append(ouvinte)
+
+
+def _avisar_ouvintes(novas: list[tuple[int, datetime]], removidas: list[int]) -> None:
+    for ouvinte in _ouvintes:
+        try:
+            ouvinte(novas, removidas)
+        except Exception:
+            logger.exception("Sinal: ouvinte falhou (%d nova(s), %d removida(s))",
+                             len(novas), len(removidas))
+
+
+def registrar_disparos(db: Session, novas: list[tuple[int, datetime]]) -> None:
+    """
+    Marca notificações (id, disparo) inseridas fora do unit of work (insert
+    Core em massa). Deve ser chamado antes do commit da mesma sessão.
+    """
+    if not novas:
+        return
+    db.info.setdefault(_CHAVE_NOVAS, []).extend(novas)
+    _notificar_postgres(db, novas=novas, removidas=[])
+
+
+def registrar_remocoes(db: Session, ids: list[int]) -> None:
+    """Marca notificações removidas fora do unit of work. Antes do commit."""
+    if not ids:
+        return
+    db.info.setdefault(_CHAVE_REMOVIDAS, []).extend(ids)
+    _notificar_postgres(db, novas=[], removidas=ids)
+
+
+def _notificar_postgres(
+    db: Session, *, novas: list[tuple[int, datetime]], removidas: list[int]
+) -> None:
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    payloads = [
+        {"n": [[i, d.isoformat()] for i, d in novas[k:k + _ITENS_POR_PAYLOAD]]}
+        for k in range(0, len(novas), _ITENS_POR_PAYLOAD)
+    ] + [
+        {"r": removidas[k:k + _ITENS_POR_PAYLOAD]}
+        for k in range(0, len(removidas), _ITENS_POR_PAYLOAD)
+    ]
+    for payload in payloads:
+        db.execute(
+            text("SELECT pg_notify(:canal, :payload)"),
+            {"canal": CANAL_POSTGRES, "payload": json.dumps(payload)},
+        )
+
+
+def _decodificar_payload(bruto: str) -> tuple[list[tuple[int, datetime]], list[int]]:
+    dados = json.loads(bruto)
+    novas = [(int(i), datetime.fromisoformat(d)) for i, d in dados.get("n", [])]
+    removidas = [int(i) for i in dados.get("r", [])]
+    return novas, removidas
+
+
+# ─── Hooks de Session ─────────────────────────────────────────────────────────
+
+@event.listens_for(Session, "after_flush")
+def _coletar_mudancas(session: Session, flush_context) -> None:
+    novas = [
+        (obj.id, obj.data_programada_disparo)
+        for obj in session.new
+        if isinstance(obj, NotificacaoLembrete)
+    ]
+    removidas = [
+        obj.id for obj in session.deleted if isinstance(obj, NotificacaoLembrete)
+    ]
+    registrar_disparos(session, novas)
+    registrar_remocoes(session, removidas)
+
+
+@event.listens_for(Session, "after_commit")
+def _publicar_mudancas(session: Session) -> None:
+    novas = session.info.pop(_CHAVE_NOVAS, None) or []
+    removidas = session.info.pop(_CHAVE_REMOVIDAS, None) or []
+    if novas or removidas:
+        _avisar_ouvintes(novas, removidas)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_mudancas(session: Session) -> None:
+    session.info.pop(_CHAVE_NOVAS, None)
+    session.info.pop(_CHAVE_REMOVIDAS, None)
+
+
+# ─── LISTEN (Postgres, multi-instância) ───────────────────────────────────────
+
+def _loop_escuta() -> None:
+    """Mantém uma conexão dedicada (fora do pool) em LISTEN, reconectando se cair."""
+    while not _parar_escuta.is_set():
+        conexao = None
+        try:
+            cargs, cparams = engine.dialect.create_connect_args(engine.url)
+            conexao = engine.dialect.connect(*cargs, **cparams)
+            conexao.autocommit = True
+            conexao.cursor().execute(f"LISTEN {CANAL_POSTGRES}")
+            logger.info("Sinal: escutando canal Postgres '%s'.", CANAL_POSTGRES)
+
+            while not _parar_escuta.is_set():
+                prontos, _, _ = select.select([conexao], [], [], 5.0)
+                if not prontos:
+                    continue
+                conexao.poll()
+                while conexao.notifies:
+                    aviso = conexao.notifies.pop(0)
+                    try:
+                        _avisar_ouvintes(*_decodificar_payload(aviso.payload))
+                    except (ValueError, TypeError, AttributeError):
+                        logger.warning("Sinal: payload inválido %r", aviso.payload)
+        except Exception as e:
+            logger.warning("Sinal: conexão LISTEN perdida (%s) — reconectando.", e)
+            _parar_escuta.wait(5.0)
+        finally:
+            if conexao is not None:
+                conexao.close()
+
+
+def iniciar_escuta() -> None:
+    """Inicia a thread de LISTEN. No-op fora do Postgres."""
+    global _thread_escuta
+    if engine.dialect.name != "postgresql" or _thread_escuta is not None:
+        return
+    _parar_escuta.clear()
+    _thread_escuta = threading.Thread(target=_loop_escuta, name="sinal-listen", daemon=True)
+    _thread_escuta.start()
+
+
+def parar_escuta() -> None:
+    global _thread_escuta
+    _parar_escuta.set()
+    _thread_escuta = None
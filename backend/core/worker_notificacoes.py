@@ -6,12 +6,51 @@ Arquitetura:
     vs BackgroundTasks do FastAPI (por-request, morre com o request) →
     APScheduler é a escolha correta para um cron genuíno em MVP.
 
-    Para escalar a produção (múltiplas instâncias):
-    → Trocar BackgroundScheduler por APScheduler com JobStoreRedis + lock distribuído
-    → Ou migrar para Celery Beat + Redis Broker
+    Múltiplas instâncias (vários uvicorn workers / réplicas Railway):
+    → Cada instância roda o seu scheduler; o claim atômico em
+      notificacao_service.reivindicar_pendentes (FOR UPDATE SKIP LOCKED +
+      status 'processando' com lease) garante que nenhuma notificação é
+      enviada duas vezes. Lease expirado = instância caiu; outra retoma.
 
 Ciclo de vida:
-    FastAPI lifespan() → iniciar_worker() → job a cada 60 s → parar_worker()
+    FastAPI lifespan() → iniciar_worker() → ticks sob demanda → parar_worker()
+    Jobs auxiliares:
+      - _materializar_series() (horário) grava as ocorrências de séries
+        recorrentes das próximas SERIES_MATERIALIZAR_HORAS (lembrete 24h).
+      - _verificar_faturas() (a cada FATURAS_VERIFICACAO_HORAS) confere os
+        totais das faturas abertas, mantidos por delta, contra um SUM.
+      - _marcar_faturas_atrasadas() (horário) passa pendente → atrasada as
+        faturas vencidas, em lotes, e agenda a cobrança de cada uma.
+
+Agenda em memória (sem varrer a tabela no caminho quente):
+    As notificações 'agendada' das próximas NOTIF_HORIZONTE_HORAS ficam num
+    heap em memória (core/agendador_memoria), mantido pelos sinais de
+    core/sinal_notificacoes (in-process + LISTEN/NOTIFY no Postgres). O job
+    é reagendado para o segundo exato do próximo disparo; cada tick retira os
+    vencidos do heap e reivindica só esses ids (lookup por PK).
+
+    O banco continua sendo a fonte da verdade: a cada `intervalo_segundos`
+    uma varredura de segurança (reivindicar_pendentes) recupera o que a memória
+    não viu — disparos vencidos durante um restart, leases expirados, sinais
+    perdidos. O heap é recarregado quando metade do horizonte já passou.
+
+Envio em lote:
+    Cada tick monta as mensagens, agrupa em lotes de PUSH_LOTE_TAMANHO (100 no
+    Expo) e envia os lotes concorrentemente num ThreadPoolExecutor limitado a
+    PUSH_MAX_CONCORRENCIA. O status é gravado com um UPDATE por lote.
+
+Prefetch (sem N+1):
+    Antes de montar as mensagens, _carregar_contexto() busca todos os pacientes,
+    sessões e psicólogos referenciados pelo lote em no máximo 3 queries IN.
+    _montar_mensagem() resolve tudo a partir desses mapas em memória, então o
+    número de statements por tick não cresce com o número de notificações.
+
+Observabilidade:
+    Métricas em GET /metrics (core/metricas): duração do tick, backlog de
+    vencidas no banco e o atraso da mais antiga (medidos na coleta, fora do
+    worker — continuam certos com o worker travado), duração de cada lote
+    de push e resultado por TipoNotificacao. estado_worker() alimenta o
+    health check: scheduler rodando, último tick, último erro.
 
 Segurança da Session:
     O worker cria sua própria SessionLocal() por execução de job.
@@ -19,16 +58,25 @@ Segurança da Session:
 """
 
 import logging
-from datetime import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 from apscheduler.schedulers.background import BackgroundScheduler
 
-from backend.core.database import SessionLocal
-from backend.core.push_sender import send_push, send_push_to_psicologo, PushSendError
-from backend.models.notificacao import TipoNotificacao
+from backend.core import sinal_notificacoes
+from backend.core.agendador_memoria import AgendaEmMemoria
+from backend.core.config import settings
+from backend.core.database import SessionLeitura, SessionLocal, replicas
+from backend.core.instrumentacao_sql import medir_sql, registrar_sql
+from backend.core.metricas import Contador, Histograma, Medidor, ao_coletar
+from backend.core.push_sender import MensagemPush, PushSendError, send_push_batch
+from backend.models.notificacao import NotificacaoLembrete, TipoNotificacao
 from backend.models.sessao import Sessao
 from backend.models.paciente import Paciente
-from backend.models.psicologo import Psicologo
-from backend.services import notificacao_service
+from backend.schemas.psicologo import PsicologoResponse
+from backend.services import fatura_service, notificacao_service, psicologo_service, serie_service
 
 logger = logging.getLogger(__name__)
 
@@ -38,59 +86,323 @@ _scheduler = BackgroundScheduler(
     timezone="UTC",
 )
 
+_ID_JOB = "worker_notificacoes"
+_ID_JOB_SERIES = "materializar_series"
+_ID_JOB_FATURAS = "verificar_faturas"
+_ID_JOB_ATRASO = "marcar_faturas_atrasadas"
+_ID_JOB_REPLICAS = "verificar_replicas"
+_intervalo_maximo = timedelta(seconds=60)
+_horizonte = timedelta(hours=settings.NOTIF_HORIZONTE_HORAS)
+
+# Próximos disparos em memória + instante da próxima varredura de segurança
+_agenda = AgendaEmMemoria()
+_proxima_varredura: datetime | None = None  # None → varre no primeiro tick
+
+# Coordenação tick ↔ sinal de nova notificação (ver acordar_worker)
+_trava_agenda = threading.Lock()
+_tick_em_execucao = threading.Event()
+
+# Pool limitado para I/O de push: só faz HTTP, nunca toca na Session
+_executor_push = ThreadPoolExecutor(
+    max_workers=settings.PUSH_MAX_CONCORRENCIA,
+    thread_name_prefix="push",
+)
+
+# Estado para o health check (estado_worker) — escrito só pela thread do tick
+_iniciado_em: datetime | None = None
+_ultimo_tick: datetime | None = None  # fim do último tick, com ou sem erro
+_ultimo_tick_duracao: float | None = None
+_ultimo_erro: str | None = None
+
+
+# ─── Métricas ─────────────────────────────────────────────────────────────────
+
+_TICK_DURACAO = Histograma(
+    "cori_worker_tick_duracao_segundos", "Duração de cada tick do worker de notificações.",
+)
+_TICK_ERROS = Contador(
+    "cori_worker_tick_erros_total", "Ticks do worker encerrados por exceção.",
+)
+_PUSH_DURACAO = Histograma(
+    "cori_push_lote_duracao_segundos", "Latência de envio de um lote de push ao provider.",
+)
+_NOTIFICACOES = Contador(
+    "cori_notificacoes_processadas_total",
+    "Notificações processadas pelo worker, por tipo e resultado (enviada, sem_destino, falhou).",
+    ("tipo", "resultado"),
+)
+_VENCIDAS = Medidor(
+    "cori_notificacoes_vencidas", "Notificações com disparo vencido ainda não enviadas (banco).",
+)
+_ATRASO_MAIS_ANTIGA = Medidor(
+    "cori_notificacoes_atraso_mais_antiga_segundos",
+    "Agora − data_programada_disparo da vencida mais antiga (0 = nenhuma).",
+)
+_WORKER_RODANDO = Medidor("cori_worker_rodando", "1 se o scheduler deste processo está rodando.")
+_ULTIMO_TICK = Medidor(
+    "cori_worker_ultimo_tick_timestamp_segundos", "Unix time do fim do último tick (0 = nenhum).",
+)
+_AGENDA_MEMORIA = Medidor("cori_worker_agenda_memoria", "Disparos no heap em memória.")
+
+
+@ao_coletar
+def _coletar_metricas() -> None:
+    """Na coleta de /metrics: estado do scheduler + backlog lido do banco."""
+    _WORKER_RODANDO.set(1 if _scheduler.running else 0)
+    _ULTIMO_TICK.set(_ultimo_tick.timestamp() if _ultimo_tick else 0)
+    _AGENDA_MEMORIA.set(len(_agenda))
+
+    agora = datetime.now(timezone.utc)
+    db = SessionLeitura()  # fora do escritor único do SQLite
+    try:
+        vencidas, mais_antiga = notificacao_service.resumo_vencidas(db, agora=agora)
+    finally:
+        db.close()
+    _VENCIDAS.set(vencidas)
+    _ATRASO_MAIS_ANTIGA.set((agora - mais_antiga).total_seconds() if mais_antiga else 0)
+
+
+def _contar(tipos: dict[int, str], ids: list[int], resultado: str) -> None:
+    for notif_id in ids:
+        _NOTIFICACOES.inc(tipos[notif_id], resultado)
+
+
+def _enviar_lote(mensagens: list[MensagemPush]) -> list[bool]:
+    """send_push_batch cronometrado (roda nas threads de push). Um bool por mensagem."""
+    inicio = time.perf_counter()
+    try:
+        return send_push_batch(mensagens)
+    finally:
+        _PUSH_DURACAO.observe(time.perf_counter() - inicio)
+
+
+def _tick() -> None:
+    """Job do scheduler: processa e reagenda para o próximo disparo em memória."""
+    global _ultimo_tick, _ultimo_tick_duracao, _ultimo_erro
+    _tick_em_execucao.set()
+    inicio = time.perf_counter()
+    try:
+        with medir_sql() as estatisticas:
+            _processar_notificacoes()
+        if estatisticas.consultas:
+            registrar_sql("worker:notificacoes", estatisticas)
+        _ultimo_erro = None
+    except Exception as e:
+        _TICK_ERROS.inc()
+        _ultimo_erro = f"{e.__class__.__name__}: {e}"
+        raise  # o APScheduler loga o traceback
+    finally:
+        _ultimo_tick_duracao = time.perf_counter() - inicio
+        _ultimo_tick = datetime.now(timezone.utc)
+        _TICK_DURACAO.observe(_ultimo_tick_duracao)
+        _agendar_proximo_tick()
+
+
+def _agendar_proximo_tick() -> None:
+    """
+    Próximo tick = o mais cedo entre o próximo disparo da agenda, a recarga do
+    horizonte e a varredura de segurança. Nenhuma query: tudo vem da memória.
+
+    Calculado sob _trava_agenda: um sinal que chega durante o tick já está no
+    heap quando lemos `proximo()`, ou espera a trava e reagenda ele mesmo.
+    """
+    with _trava_agenda:
+        agora = datetime.now(timezone.utc)
+        candidatos = [_proxima_varredura, _agenda.proximo()]
+        if _agenda.horizonte is not None:
+            candidatos.append(_agenda.horizonte - _horizonte / 2)
+        alvo = min((c for c in candidatos if c is not None), default=agora + _intervalo_maximo)
+        alvo = max(alvo, agora)
+
+        _tick_em_execucao.clear()
+        if _scheduler.running:
+            _scheduler.modify_job(_ID_JOB, next_run_time=alvo)
+
+
+def acordar_worker(novas: list[tuple[int, datetime]], removidas: list[int]) -> None:
+    """
+    Ouvinte de core/sinal_notificacoes: atualiza a agenda em memória e, se
+    entrou um disparo antes do próximo tick, antecipa o tick para ele (ou
+    agora, se já venceu). Durante um tick só atualiza o heap — o próprio tick
+    reagenda ao terminar.
+    """
+    _agenda.remover(removidas)
+    disparo = _agenda.adicionar(novas)
+    if disparo is None:
+        return
+    with _trava_agenda:
+        if _tick_em_execucao.is_set() or not _scheduler.running:
+            return
+        job = _scheduler.get_job(_ID_JOB)
+        if job is None:
+            return
+        alvo = max(disparo, datetime.now(timezone.utc))
+        if job.next_run_time is None or alvo < job.next_run_time:
+            job.modify(next_run_time=alvo)
+
+
+def _recarregar_agenda(db, agora: datetime) -> None:
+    """Recarrega o heap com as 'agendada' até agora + horizonte (1 range scan)."""
+    _agenda.iniciar_recarga()
+    horizonte = agora + _horizonte
+    linhas = notificacao_service.listar_agendadas_ate(db, ate=horizonte)
+    _agenda.concluir_recarga(linhas, horizonte)
+    logger.info("Worker: agenda em memória recarregada (%d disparo(s) até %s).",
+                len(_agenda), horizonte.isoformat())
+
 
 def _processar_notificacoes() -> None:
     """
-    Job executado a cada 60 segundos.
-    Busca notificações pendentes, resolve o destinatário e token,
-    chama send_push() e atualiza o status no banco.
+    Executado a cada tick.
+    Reivindica os vencidos da agenda em memória (e, quando chega a hora, os da
+    varredura de segurança), monta as mensagens, envia em lotes do tamanho do
+    provider (PUSH_LOTE_TAMANHO) concorrentemente no pool de push e grava o
+    status de cada lote com um único UPDATE.
 
-    Isolamento de Session: cada execução abre e fecha sua própria sessão.
+    Isolamento de Session: cada execução abre e fecha sua própria sessão,
+    usada apenas nesta thread — as threads de push só recebem MensagemPush.
     """
+    global _proxima_varredura
+
     db = SessionLocal()
     try:
-        pendentes = notificacao_service.buscar_pendentes(db, limite=50)
+        agora = datetime.now(timezone.utc)
+        if _agenda.horizonte is None or agora >= _agenda.horizonte - _horizonte / 2:
+            _recarregar_agenda(db, agora)
+
+        limite = settings.NOTIF_LIMITE_POR_TICK
+        pendentes = notificacao_service.reivindicar_por_ids(
+            db,
+            ids=_agenda.retirar_vencidos(agora, limite),
+            lease_segundos=settings.NOTIF_LEASE_SEGUNDOS,
+        )
+
+        if _proxima_varredura is None or agora >= _proxima_varredura:
+            pendentes += notificacao_service.reivindicar_pendentes(
+                db,
+                limite=limite,
+                lease_segundos=settings.NOTIF_LEASE_SEGUNDOS,
+            )
+            _proxima_varredura = agora + _intervalo_maximo
 
         if not pendentes:
             return
 
         logger.info("Worker: %d notificação(ões) para processar.", len(pendentes))
 
+        contexto = _carregar_contexto(db, pendentes)
+        tipos = {n.id: n.tipo.value for n in pendentes}
+
+        envios: list[tuple[int, MensagemPush]] = []
+        sem_destino: list[int] = []
+        falhas_montagem: list[int] = []
+
         for notif in pendentes:
             try:
-                enviado = _despachar(db, notif)
-                if enviado:
-                    notificacao_service.marcar_enviada(db, notif)
-                else:
-                    # Token ausente não é falha técnica — marca como enviada para não reprocessar
-                    notificacao_service.marcar_enviada(db, notif)
+                mensagem = _montar_mensagem(contexto, notif)
+            except Exception as e:
+                logger.exception("Worker: erro inesperado na notif id=%d — %s", notif.id, e)
+                falhas_montagem.append(notif.id)
+                continue
+            if mensagem is None:
+                # Destinatário/token ausente não é falha técnica — marca como enviada
+                sem_destino.append(notif.id)
+            else:
+                envios.append((notif.id, mensagem))
 
-            except PushSendError as e:
-                logger.error("Worker: falha ao enviar notif id=%d — %s", notif.id, e)
-                notificacao_service.marcar_falhou(db, notif)
+        notificacao_service.atualizar_status_lote(
+            db, enviadas=sem_destino, falhas=falhas_montagem
+        )
+        _contar(tipos, sem_destino, "sem_destino")
+        _contar(tipos, falhas_montagem, "falhou")
+
+        tamanho = settings.PUSH_LOTE_TAMANHO
+        lotes = [envios[i:i + tamanho] for i in range(0, len(envios), tamanho)]
+        futuros = {
+            _executor_push.submit(_enviar_lote, [m for _, m in lote]): lote
+            for lote in lotes
+        }
 
+        for futuro in as_completed(futuros):
+            ids = [notif_id for notif_id, _ in futuros[futuro]]
+            try:
+                resultados = futuro.result()
+                # Ticket de erro / token recusado pelo provider = falhou, não entregue
+                enviadas = [i for i, ok in zip(ids, resultados) if ok]
+                falhas = [i for i, ok in zip(ids, resultados) if not ok]
+                notificacao_service.atualizar_status_lote(db, enviadas=enviadas, falhas=falhas)
+                _contar(tipos, enviadas, "enviada")
+                _contar(tipos, falhas, "falhou")
+            except PushSendError as e:
+                logger.error("Worker: falha ao enviar lote de %d notif(s) — %s", len(ids), e)
+                notificacao_service.atualizar_status_lote(db, enviadas=[], falhas=ids)
+                _contar(tipos, ids, "falhou")
             except Exception as e:
-                logger.exception("Worker: erro inesperado na notif id=%d — %s", notif.id, e)
-                notificacao_service.marcar_falhou(db, notif)
+                logger.exception("Worker: erro inesperado no lote de %d notif(s) — %s", len(ids), e)
+                notificacao_service.atualizar_status_lote(db, enviadas=[], falhas=ids)
+                _contar(tipos, ids, "falhou")
 
     finally:
         db.close()
 
 
-def _despachar(db, notif) -> bool:
+@dataclass
+class _ContextoDespacho:
+    """Mapas id → entidade pré-carregados para um lote de notificações."""
+    pacientes: dict[int, Paciente]
+    sessoes: dict[int, Sessao]
+    psicologos: dict[int, PsicologoResponse]
+
+
+# Tipos cujo referencia_id aponta para sessoes.id
+_TIPOS_COM_SESSAO = (TipoNotificacao.lembrete_sessao, TipoNotificacao.aviso_psicologo)
+
+
+def _carregar_contexto(db, pendentes: list[NotificacaoLembrete]) -> _ContextoDespacho:
+    """Carrega em lote (≤ 3 queries IN) tudo o que _montar_mensagem precisa."""
+    paciente_ids = {n.paciente_id for n in pendentes}
+    sessao_ids = {
+        n.referencia_id for n in pendentes
+        if n.tipo in _TIPOS_COM_SESSAO and n.referencia_id is not None
+    }
+
+    pacientes = {
+        p.id: p for p in db.query(Paciente).filter(Paciente.id.in_(paciente_ids))
+    }
+    sessoes = {
+        s.id: s for s in db.query(Sessao).filter(Sessao.id.in_(sessao_ids))
+    } if sessao_ids else {}
+
+    # Só o aviso_psicologo notifica o psicólogo — os outros tipos não precisam dele.
+    # Perfis vêm do cache (PATCH /auth/me invalida ao trocar o push token)
+    psicologo_ids = {
+        pacientes[n.paciente_id].psicologo_id for n in pendentes
+        if n.tipo == TipoNotificacao.aviso_psicologo and n.paciente_id in pacientes
+    }
+    psicologos = psicologo_service.obter_perfis(
+        db, psicologo_ids=psicologo_ids
+    ) if psicologo_ids else {}
+
+    return _ContextoDespacho(pacientes=pacientes, sessoes=sessoes, psicologos=psicologos)
+
+
+def _montar_mensagem(
+    contexto: _ContextoDespacho, notif: NotificacaoLembrete
+) -> MensagemPush | None:
     """
-    Resolve o token de destino e o conteúdo da notificação com base no tipo.
-    Retorna True se tentou enviar, False se pulou por falta de token.
+    Resolve o token de destino e o conteúdo da notificação com base no tipo,
+    apenas a partir do contexto pré-carregado (nenhuma query aqui).
+    Retorna None se não há destinatário (o envio é pulado).
     """
-    paciente: Paciente | None = db.query(Paciente).filter(Paciente.id == notif.paciente_id).first()
+    paciente = contexto.pacientes.get(notif.paciente_id)
     if not paciente:
-        return False
+        return None
 
     # ── Lembrete de Sessão → notifica PACIENTE ────────────────────────────────
     if notif.tipo == TipoNotificacao.lembrete_sessao:
-        sessao: Sessao | None = db.query(Sessao).filter(Sessao.id == notif.referencia_id).first()
+        sessao = contexto.sessoes.get(notif.referencia_id)
         hora = sessao.data_hora_inicio.strftime("%d/%m %H:%M") if sessao else "em breve"
-        return send_push(
+        return MensagemPush(
             token=paciente.dispositivo_push_token or "",
             title="🗓️ Lembrete de Sessão",
             body=f"Sua sessão é amanhã às {hora}. Confirme sua presença!",
@@ -99,7 +411,7 @@ def _despachar(db, notif) -> bool:
 
     # ── Lembrete de Tarefa → notifica PACIENTE ────────────────────────────────
     elif notif.tipo == TipoNotificacao.lembrete_tarefa:
-        return send_push(
+        return MensagemPush(
             token=paciente.dispositivo_push_token or "",
             title="📋 Tarefa Pendente",
             body="Você tem uma tarefa vencendo em 12 horas. Não esqueça!",
@@ -108,16 +420,15 @@ def _despachar(db, notif) -> bool:
 
     # ── Aviso ao Psicólogo → notifica PSICÓLOGO ──────────────────────────────
     elif notif.tipo == TipoNotificacao.aviso_psicologo:
-        psicologo: Psicologo | None = db.query(Psicologo).filter(
-            Psicologo.id == paciente.psicologo_id
-        ).first()
-        if not psicologo:
-            return False
+        psicologo = contexto.psicologos.get(paciente.psicologo_id)
+        if not psicologo or not psicologo.dispositivo_push_token:
+            logger.debug("Psicólogo sem push token — notificação omitida.")
+            return None
 
-        sessao: Sessao | None = db.query(Sessao).filter(Sessao.id == notif.referencia_id).first()
+        sessao = contexto.sessoes.get(notif.referencia_id)
         hora = sessao.data_hora_inicio.strftime("%d/%m %H:%M") if sessao else "?"
-        return send_push_to_psicologo(
-            psicologo_token=psicologo.dispositivo_push_token,
+        return MensagemPush(
+            token=psicologo.dispositivo_push_token,
             title="✅ Sessão Confirmada",
             body=f"{paciente.nome_completo} confirmou a sessão de {hora}.",
             data={"tipo": "aviso_psicologo", "sessao_id": notif.referencia_id,
@@ -126,33 +437,156 @@ def _despachar(db, notif) -> bool:
 
     # ── Cobrança → notifica PACIENTE (placeholder) ────────────────────────────
     elif notif.tipo == TipoNotificacao.cobranca:
-        return send_push(
+        return MensagemPush(
             token=paciente.dispositivo_push_token or "",
             title="💳 Fatura Disponível",
             body="Sua fatura do mês está disponível. Verifique no app.",
             data={"tipo": "cobranca", "fatura_id": notif.referencia_id},
         )
 
-    return False
+    return None
+
+
+# ─── Séries Recorrentes ───────────────────────────────────────────────────────
+
+def _materializar_series() -> None:
+    """
+    Job horário: grava as ocorrências de séries das próximas
+    SERIES_MATERIALIZAR_HORAS para que ganhem o lembrete 24h e o token do
+    link de confirmação. O resto das séries continua só virtual.
+    """
+    db = SessionLocal()
+    try:
+        ate = datetime.now(timezone.utc) + timedelta(hours=settings.SERIES_MATERIALIZAR_HORAS)
+        criadas = serie_service.materializar_proximas(db, ate=ate)
+        if criadas:
+            logger.info("Worker: %d ocorrência(s) de séries materializada(s).", criadas)
+    except Exception as e:
+        logger.exception("Worker: falha ao materializar séries — %s", e)
+    finally:
+        db.close()
+
+
+# ─── Consistência das Faturas ─────────────────────────────────────────────────
+
+def _verificar_faturas() -> None:
+    """Job periódico: confere (e corrige) os totais das faturas abertas."""
+    db = SessionLocal()
+    try:
+        divergencias = fatura_service.verificar_consistencia_faturas(db)
+        if divergencias:
+            logger.warning("Worker: %d fatura(s) com total divergente corrigida(s).", len(divergencias))
+    except Exception as e:
+        logger.exception("Worker: falha ao verificar faturas — %s", e)
+    finally:
+        db.close()
+
+
+def _marcar_faturas_atrasadas() -> None:
+    """Job horário: pendente → atrasada para faturas vencidas (+ cobrança)."""
+    db = SessionLocal()
+    try:
+        total = fatura_service.marcar_faturas_atrasadas(db, lote=settings.FATURAS_ATRASO_LOTE)
+        if total:
+            logger.info("Worker: %d fatura(s) marcada(s) como atrasada(s).", total)
+    except Exception as e:
+        logger.exception("Worker: falha ao marcar faturas atrasadas — %s", e)
+    finally:
+        db.close()
 
 
 # ─── API Pública do Worker ────────────────────────────────────────────────────
 
 def iniciar_worker(intervalo_segundos: int = 60) -> None:
-    """Inicia o scheduler com o job de notificações. Chamado no lifespan do FastAPI."""
+    """
+    Inicia o scheduler com o job de notificações. Chamado no lifespan do FastAPI.
+    `intervalo_segundos` é o intervalo da varredura de segurança no banco;
+    fora dela o worker acorda pelo próximo disparo em memória ou por sinal.
+    """
+    global _intervalo_maximo, _proxima_varredura, _iniciado_em
+    _intervalo_maximo = timedelta(seconds=intervalo_segundos)
+    _iniciado_em = datetime.now(timezone.utc)
+    _proxima_varredura = None  # primeiro tick recupera o que venceu com o app fora do ar
+
+    sinal_notificacoes.registrar_ouvinte(acordar_worker)
     _scheduler.add_job(
-        _processar_notificacoes,
+        _tick,
         trigger="interval",
         seconds=intervalo_segundos,
-        id="worker_notificacoes",
+        id=_ID_JOB,
         replace_existing=True,
+        next_run_time=datetime.now(timezone.utc),  # primeiro tick já no startup
+        misfire_grace_time=None,
     )
+    _scheduler.add_job(
+        _materializar_series,
+        trigger="interval",
+        hours=1,
+        id=_ID_JOB_SERIES,
+        replace_existing=True,
+        next_run_time=datetime.now(timezone.utc),
+    )
+    _scheduler.add_job(
+        _verificar_faturas,
+        trigger="interval",
+        hours=settings.FATURAS_VERIFICACAO_HORAS,
+        id=_ID_JOB_FATURAS,
+        replace_existing=True,
+    )
+    _scheduler.add_job(
+        _marcar_faturas_atrasadas,
+        trigger="interval",
+        hours=1,
+        id=_ID_JOB_ATRASO,
+        replace_existing=True,
+        next_run_time=datetime.now(timezone.utc),
+    )
+    if replicas.replicas:
+        # Réplicas só entram no rodízio depois da 1ª medição — já no startup
+        _scheduler.add_job(
+            replicas.verificar,
+            trigger="interval",
+            seconds=settings.REPLICA_VERIFICACAO_SEGUNDOS,
+            id=_ID_JOB_REPLICAS,
+            replace_existing=True,
+            next_run_time=datetime.now(timezone.utc),
+        )
     _scheduler.start()
-    logger.info("🚀 Worker de notificações iniciado (intervalo=%ds).", intervalo_segundos)
+    sinal_notificacoes.iniciar_escuta()
+    logger.info("🚀 Worker de notificações iniciado (varredura de segurança=%ds).", intervalo_segundos)
 
 
 def parar_worker() -> None:
     """Para o scheduler graciosamente. Chamado no lifespan do FastAPI."""
     if _scheduler.running:
+        sinal_notificacoes.parar_escuta()
         _scheduler.shutdown(wait=False)
+        _executor_push.shutdown(wait=False)
         logger.info("🛑 Worker de notificações encerrado.")
+
+
+def estado_worker() -> dict:
+    """
+    Estado real do scheduler para o health check (GET /). Saudável = rodando,
+    com o job de notificações agendado, o último tick sem erro e terminado há
+    menos de 2× o intervalo da varredura de segurança — o tick acontece pelo
+    menos uma vez por intervalo, então mais que isso é worker travado.
+    """
+    agora = datetime.now(timezone.utc)
+    job = _scheduler.get_job(_ID_JOB) if _scheduler.running else None
+    referencia = _ultimo_tick or _iniciado_em
+    em_dia = referencia is not None and agora - referencia <= 2 * _intervalo_maximo
+    return {
+        "saudavel": job is not None and em_dia and _ultimo_erro is None,
+        "rodando": _scheduler.running,
+        "ultimo_tick": _ultimo_tick.isoformat() if _ultimo_tick else None,
+        "ultimo_tick_duracao_ms": (
+            round(_ultimo_tick_duracao * 1000, 1) if _ultimo_tick_duracao is not None else None
+        ),
+        "ultimo_erro": _ultimo_erro,
+        "agenda_em_memoria": len(_agenda),
+        "proximas_execucoes": {
+            j.id: j.next_run_time.isoformat() if j.next_run_time else None
+            for j in (_scheduler.get_jobs() if _scheduler.running else [])
+        },
+    }
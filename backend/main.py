@@ -2,33 +2,52 @@
 main.py — Ponto de entrada da API Cori
 
 Ciclo de vida (lifespan):
-    startup  → iniciar_worker()  (APScheduler em thread daemon)
+    startup  → iniciar_worker()  (APScheduler em thread daemon, event-driven)
+               certificados do Google aquecidos em segundo plano
     shutdown → parar_worker()    (shutdown gracioso)
+               pool do engine async fechado
 
 Routers registrados por domínio:
     /auth       — Autenticação Google OAuth
     /pacientes  — CRUD de pacientes (multi-tenant)
     /sessoes    — Agenda + check-in + confirmação de paciente
+    /series     — Séries recorrentes (RRULE, expandidas sob demanda)
     /faturas    — Motor financeiro / fecho de mês
     /anotacoes  — Prontuário clínico
     /tarefas    — Para casa terapêutico
     /checkins   — Rastreio de humor diário
     /agenda     — Super Agenda / Timeline unificada
+
+Observabilidade:
+    /           — health check com o estado real do worker
+    /metrics    — métricas Prometheus (HTTP, pools, worker — core/metricas)
 """
 
+import secrets
+import time
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
+from backend.core.cache_perfis import perfis
 from backend.core.config import settings
-from backend.core.worker_notificacoes import iniciar_worker, parar_worker
+from backend.core.database import fechar_async_engine, forcar_primario, replicas
+from backend.core.google_auth import certificados as certificados_google
+from backend.core.instrumentacao_sql import medir_sql, registrar_sql
+from backend.core.metricas import HTTP_DURACAO, HTTP_REQUISICOES, exportar
+from backend.core.security import (
+    DEV_PSICOLOGO_ID, DEV_TOKEN, get_current_psicologo_id, get_current_psicologo_id_dev,
+    psicologo_id_do_token,
+)
+from backend.core.worker_notificacoes import estado_worker, iniciar_worker, parar_worker
 
 # Importa todos os models (registra no SQLAlchemy — Alembic é o dono do schema)
 import backend.models  # noqa: F401
 
 from backend.routes import (
     auth, pacientes, sessoes, faturas, anotacoes,
-    tarefas, checkins, agenda,
+    tarefas, checkins, agenda, series,
 )
 
 
@@ -40,9 +59,12 @@ async def lifespan(app: FastAPI):
     O código antes do `yield` executa no startup;
     o código após o `yield` executa no shutdown.
     """
-    iniciar_worker(intervalo_segundos=60)
+    iniciar_worker(intervalo_segundos=settings.NOTIF_SONO_MAXIMO_SEGUNDOS)
+    if settings.GOOGLE_CLIENT_ID:
+        certificados_google.aquecer()  # 1º login já encontra as chaves em cache
     yield
     parar_worker()
+    await fechar_async_engine()
 
 
 # ─── Aplicação ────────────────────────────────────────────────────────────────
@@ -66,12 +88,95 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # cursor de GET /faturas/pendentes · tempo de SQL do request
+    expose_headers=["X-Proximo-Cursor", "Server-Timing"],
 )
 
+# ─── Bypass de Dev ────────────────────────────────────────────────────────────
+# Token fixo mock_dev_token_123 → Psicólogo 999. Nunca registrado em produção.
+if settings.DEBUG:
+    app.dependency_overrides[get_current_psicologo_id] = get_current_psicologo_id_dev
+
+# ─── Consistência de Leitura (réplicas) ───────────────────────────────────────
+# Só registrado com DATABASE_REPLICA_URLS: depois de uma escrita bem-sucedida,
+# as leituras do mesmo psicólogo vão ao primário por
+# LEITURA_PRIMARIO_APOS_ESCRITA_SEGUNDOS (ver core/database — Réplicas de Leitura).
+_METODOS_LEITURA = {"GET", "HEAD", "OPTIONS"}
+
+
+def _psicologo_do_request(request: Request) -> int | None:
+    esquema, _, token = request.headers.get("Authorization", "").partition(" ")
+    if esquema.lower() != "bearer" or not token:
+        return None
+    if settings.DEBUG and token == DEV_TOKEN:
+        return DEV_PSICOLOGO_ID
+    try:
+        return psicologo_id_do_token(token)
+    except HTTPException:
+        return None  # a rota responde o 401
+
+
+async def consistencia_leitura(request: Request, call_next):
+    psicologo_id = _psicologo_do_request(request)
+    marca = forcar_primario.set(
+        psicologo_id is not None and replicas.escreveu_recentemente(psicologo_id)
+    )
+    try:
+        resposta = await call_next(request)
+    finally:
+        forcar_primario.reset(marca)
+    if (
+        psicologo_id is not None
+        and request.method not in _METODOS_LEITURA
+        and resposta.status_code < 400
+    ):
+        replicas.registrar_escrita(psicologo_id)
+    return resposta
+
+
+if replicas.replicas:
+    app.middleware("http")(consistencia_leitura)
+
+# ─── Instrumentação de SQL ────────────────────────────────────────────────────
+# Statements e tempo no banco por request → Server-Timing + log por rota,
+# WARNING acima dos limites SQL_ALERTA_* (ver core/instrumentacao_sql).
+if settings.SQL_INSTRUMENTACAO:
+    @app.middleware("http")
+    async def instrumentacao_sql(request: Request, call_next):
+        with medir_sql() as estatisticas:
+            resposta = await call_next(request)
+        rota = request.scope.get("route")
+        registrar_sql(
+            f"{request.method} {getattr(rota, 'path', request.url.path)}",
+            estatisticas,
+            status=resposta.status_code,
+        )
+        resposta.headers["Server-Timing"] = estatisticas.server_timing()
+        return resposta
+
+# ─── Métricas HTTP ────────────────────────────────────────────────────────────
+# Registrado por último → middleware mais externo: mede o request inteiro.
+# Label `rota` = template (/agenda/{paciente_id}/timeline), nunca a URL
+# crua — cardinalidade fixa. 404 sem rota casada → "desconhecida".
+if settings.METRICAS_HABILITADAS:
+    @app.middleware("http")
+    async def metricas_http(request: Request, call_next):
+        inicio = time.perf_counter()
+        status_code = 500
+        try:
+            resposta = await call_next(request)
+            status_code = resposta.status_code
+            return resposta
+        finally:
+            rota = getattr(request.scope.get("route"), "path", "desconhecida")
+            HTTP_DURACAO.observe(time.perf_counter() - inicio, request.method, rota)
+            HTTP_REQUISICOES.inc(request.method, rota, str(status_code))
+
 # ─── Routers ──────────────────────────────────────────────────────────────────
 app.include_router(auth.router)
 app.include_router(pacientes.router)
 app.include_router(sessoes.router)
+app.include_router(series.router)
 app.include_router(faturas.router)
 app.include_router(anotacoes.router)
 app.include_router(tarefas.router)
@@ -79,11 +184,41 @@ app.include_router(checkins.router)
 app.include_router(agenda.router)
 
 
-@app.get("/", tags=["Health"], summary="Health Check")
+@app.get(
+    "/",
+    tags=["Health"],
+    summary="Health Check",
+    description=(
+        "`status` = `degraded` quando o worker de notificações não está saudável "
+        "(scheduler parado, tick atrasado ou com erro) — a API continua atendendo (200)."
+    ),
+)
 def health_check() -> dict:
+    worker = estado_worker()
     return {
-        "status": "healthy",
+        "status": "healthy" if worker["saudavel"] else "degraded",
         "app": settings.APP_NAME,
         "version": settings.APP_VERSION,
-        "worker": "running",
+        "worker": worker,
+        "cache_perfis": perfis.estatisticas(),
+        "replicas": replicas.estado(),
     }
+
+
+if settings.METRICAS_HABILITADAS:
+    @app.get(
+        "/metrics",
+        tags=["Health"],
+        summary="Métricas (Prometheus)",
+        response_class=PlainTextResponse,
+        description=(
+            "Formato texto do Prometheus: latência HTTP por rota, pools de conexão "
+            "e worker de notificações. Com `METRICAS_TOKEN`, exige `Authorization: Bearer <token>`."
+        ),
+    )
+    def metricas(request: Request) -> PlainTextResponse:
+        if settings.METRICAS_TOKEN and not secrets.compare_digest(
+            request.headers.get("Authorization", ""), f"Bearer {settings.METRICAS_TOKEN}"
+        ):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token de métricas inválido.")
+        return PlainTextResponse(exportar(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,43 @@
+"""notificacao_claim_lease
+
+Revision ID: a3c91e7d5b20
+Revises: 841dcfb57e3b
+Create Date: 2026-10-18 10:12:41.503118
+
+Claim atômico de notificações pelo worker (multi-instância):
+- statusnotificacao: novo valor 'processando'
+- notificacoes_lembretes.lease_expira_em — prazo do claim; expirado = reprocessável
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c91e7d5b20'
+down_revision: Union[str, Sequence[str], None] = '841dcfb57e3b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Postgres: ADD VALUE não pode rodar dentro de transação (PG < 12)
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute("ALTER TYPE statusnotificacao ADD VALUE IF NOT EXISTS 'processando'")
+
+    with op.batch_alter_table('notificacoes_lembretes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('lease_expira_em', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Claims em andamento voltam para a fila; o valor do enum permanece no
+    # Postgres (não há DROP VALUE), mas deixa de ser usado.
+    op.execute(
+        "UPDATE notificacoes_lembretes SET status = 'agendada' WHERE status = 'processando'"
+    )
+    with op.batch_alter_table('notificacoes_lembretes', schema=None) as batch_op:
+        batch_op.drop_column('lease_expira_em')
@@ -0,0 +1,34 @@
+"""serie_vigente_desde
+
+Revision ID: a9e4c2b7d513
+Revises: f2c6a9d3b817
+Create Date: 2026-10-18 18:02:41.507316
+
+series_sessoes.vigente_desde — instante a partir do qual regra/DTSTART
+atuais valem. Gravado ao remarcar a série; a expansão virtual não gera
+ocorrências anteriores a ele (nada de sessões previstas "fantasmas" no
+passado no horário novo). Null = vale desde o DTSTART.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9e4c2b7d513'
+down_revision: Union[str, Sequence[str], None] = 'f2c6a9d3b817'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('series_sessoes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('vigente_desde', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('series_sessoes', schema=None) as batch_op:
+        batch_op.drop_column('vigente_desde')
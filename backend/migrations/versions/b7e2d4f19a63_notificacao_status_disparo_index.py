@@ -0,0 +1,33 @@
+"""notificacao_status_disparo_index
+
+Revision ID: b7e2d4f19a63
+Revises: a3c91e7d5b20
+Create Date: 2026-10-18 11:03:27.918244
+
+Índice (status, data_programada_disparo) em notificacoes_lembretes:
+- claim do worker: status='agendada' AND disparo <= now ORDER BY disparo
+- próximo disparo: MIN(disparo) WHERE status='agendada' — lê só a ponta do índice
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2d4f19a63'
+down_revision: Union[str, Sequence[str], None] = 'a3c91e7d5b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_notificacoes_status_disparo',
+        'notificacoes_lembretes',
+        ['status', 'data_programada_disparo'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notificacoes_status_disparo', table_name='notificacoes_lembretes')
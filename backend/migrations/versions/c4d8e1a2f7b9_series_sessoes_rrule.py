@@ -0,0 +1,66 @@
+"""series_sessoes_rrule
+
+Revision ID: c4d8e1a2f7b9
+Revises: b7e2d4f19a63
+Create Date: 2026-10-18 14:26:05.331870
+
+Séries de sessões recorrentes (RRULE) expandidas sob demanda:
+- series_sessoes — regra + DTSTART + duração; uma linha por série
+- sessoes.serie_id / sessoes.ocorrencia_serie — ocorrência materializada
+  (única por série + horário original)
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d8e1a2f7b9'
+down_revision: Union[str, Sequence[str], None] = 'b7e2d4f19a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('series_sessoes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('paciente_id', sa.Integer(), nullable=False),
+    sa.Column('regra', sa.String(length=255), nullable=False),
+    sa.Column('data_hora_inicio', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('duracao_minutos', sa.Integer(), nullable=False),
+    sa.Column('valor_cobrado', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('encerrada_em', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('data_criacao', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.ForeignKeyConstraint(['paciente_id'], ['pacientes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('series_sessoes', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_series_sessoes_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_series_sessoes_paciente_id'), ['paciente_id'], unique=False)
+
+    with op.batch_alter_table('sessoes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('serie_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('ocorrencia_serie', sa.DateTime(timezone=True), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_sessoes_serie_id', 'series_sessoes', ['serie_id'], ['id'], ondelete='SET NULL'
+        )
+        batch_op.create_index(batch_op.f('ix_sessoes_serie_id'), ['serie_id'], unique=False)
+        batch_op.create_unique_constraint('uq_sessoes_serie_ocorrencia', ['serie_id', 'ocorrencia_serie'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('sessoes', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_sessoes_serie_ocorrencia', type_='unique')
+        batch_op.drop_index(batch_op.f('ix_sessoes_serie_id'))
+        batch_op.drop_constraint('fk_sessoes_serie_id', type_='foreignkey')
+        batch_op.drop_column('ocorrencia_serie')
+        batch_op.drop_column('serie_id')
+
+    with op.batch_alter_table('series_sessoes', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_series_sessoes_paciente_id'))
+        batch_op.drop_index(batch_op.f('ix_series_sessoes_id'))
+
+    op.drop_table('series_sessoes')
@@ -0,0 +1,41 @@
+"""fatura_total_sessoes
+
+Revision ID: d5a3f8c61e04
+Revises: c4d8e1a2f7b9
+Create Date: 2026-10-18 15:20:07.114902
+
+faturas.total_sessoes — contador desnormalizado das sessões vinculadas,
+mantido por quem vincula/desvincula sessões. Substitui o COUNT por fatura
+nas respostas de /faturas. Backfill com um único UPDATE correlacionado.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a3f8c61e04'
+down_revision: Union[str, Sequence[str], None] = 'c4d8e1a2f7b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('faturas', schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column('total_sessoes', sa.Integer(), nullable=False, server_default='0')
+        )
+
+    op.execute(
+        "UPDATE faturas SET total_sessoes = ("
+        "  SELECT COUNT(*) FROM sessoes WHERE sessoes.fatura_id = faturas.id"
+        ") WHERE EXISTS (SELECT 1 FROM sessoes WHERE sessoes.fatura_id = faturas.id)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('faturas', schema=None) as batch_op:
+        batch_op.drop_column('total_sessoes')
@@ -0,0 +1,33 @@
+"""faturas_estado_vencimento_index
+
+Revision ID: e8b1c7d42a90
+Revises: d5a3f8c61e04
+Create Date: 2026-10-18 16:42:55.301877
+
+Índice (estado, data_vencimento) em faturas para a varredura de atraso do
+worker: estado='pendente' AND data_vencimento < hoje — range scan só nas
+pendentes vencidas, sem ler as pagas.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b1c7d42a90'
+down_revision: Union[str, Sequence[str], None] = 'd5a3f8c61e04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_faturas_estado_vencimento',
+        'faturas',
+        ['estado', 'data_vencimento'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_faturas_estado_vencimento', table_name='faturas')
@@ -0,0 +1,76 @@
+"""resumo_faturamento_mensal
+
+Revision ID: f2c6a9d3b817
+Revises: e8b1c7d42a90
+Create Date: 2026-10-18 17:58:31.482106
+
+resumo_faturamento_mensal — rollup (psicologo_id, ano, mes) de faturado,
+recebido, em aberto e contagens, lido por GET /faturas/resumo e mantido
+por delta em fatura_service/sessao_service. Backfill com dois INSERT ...
+SELECT agregados (faturas pelo mês de referência, sessões cobráveis pelo
+mês UTC de data_hora_inicio).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c6a9d3b817'
+down_revision: Union[str, Sequence[str], None] = 'e8b1c7d42a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('resumo_faturamento_mensal',
+    sa.Column('psicologo_id', sa.Integer(), nullable=False),
+    sa.Column('ano', sa.Integer(), nullable=False),
+    sa.Column('mes', sa.Integer(), nullable=False),
+    sa.Column('valor_faturado', sa.Numeric(precision=12, scale=2), server_default='0', nullable=False),
+    sa.Column('valor_recebido', sa.Numeric(precision=12, scale=2), server_default='0', nullable=False),
+    sa.Column('valor_em_aberto', sa.Numeric(precision=12, scale=2), server_default='0', nullable=False),
+    sa.Column('total_faturas', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('sessoes_faturadas', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('sessoes_cobraveis', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('data_atualizacao', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.ForeignKeyConstraint(['psicologo_id'], ['psicologos.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('psicologo_id', 'ano', 'mes')
+    )
+
+    op.execute(
+        "INSERT INTO resumo_faturamento_mensal ("
+        "  psicologo_id, ano, mes, valor_faturado, valor_recebido, valor_em_aberto,"
+        "  total_faturas, sessoes_faturadas"
+        ") SELECT p.psicologo_id, f.ano_referencia, f.mes_referencia,"
+        "  SUM(f.valor_total),"
+        "  SUM(CASE WHEN f.estado = 'paga' THEN f.valor_total ELSE 0 END),"
+        "  SUM(CASE WHEN f.estado IN ('pendente', 'atrasada') THEN f.valor_total ELSE 0 END),"
+        "  COUNT(*), SUM(f.total_sessoes)"
+        " FROM faturas f JOIN pacientes p ON p.id = f.paciente_id"
+        " WHERE f.estado != 'cancelada'"
+        " GROUP BY p.psicologo_id, f.ano_referencia, f.mes_referencia"
+    )
+
+    if op.get_bind().dialect.name == "postgresql":
+        ano = "EXTRACT(YEAR FROM s.data_hora_inicio AT TIME ZONE 'UTC')::int"
+        mes = "EXTRACT(MONTH FROM s.data_hora_inicio AT TIME ZONE 'UTC')::int"
+    else:
+        ano = "CAST(strftime('%Y', s.data_hora_inicio) AS INTEGER)"
+        mes = "CAST(strftime('%m', s.data_hora_inicio) AS INTEGER)"
+    op.execute(
+        "INSERT INTO resumo_faturamento_mensal (psicologo_id, ano, mes, sessoes_cobraveis)"
+        f" SELECT p.psicologo_id, {ano}, {mes}, COUNT(*)"
+        " FROM sessoes s JOIN pacientes p ON p.id = s.paciente_id"
+        " WHERE s.estado IN ('realizada', 'falta_cobrada')"
+        f" GROUP BY p.psicologo_id, {ano}, {mes}"
+        " ON CONFLICT (psicologo_id, ano, mes)"
+        " DO UPDATE SET sessoes_cobraveis = excluded.sessoes_cobraveis"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('resumo_faturamento_mensal')
@@ -1,8 +1,10 @@
 from backend.models import psicologo         # noqa: F401
 from backend.models import paciente          # noqa: F401
 from backend.models import fatura            # noqa: F401
+from backend.models import serie_sessao      # noqa: F401
 from backend.models import sessao            # noqa: F401
 from backend.models import anotacao_clinica  # noqa: F401
 from backend.models import tarefa_paciente   # noqa: F401
 from backend.models import checkin_diario    # noqa: F401
 from backend.models import notificacao       # noqa: F401
+from backend.models import resumo_faturamento  # noqa: F401
@@ -2,7 +2,7 @@ import enum
 from datetime import datetime
 from decimal import Decimal
 from sqlalchemy import (
-    Date, DateTime, Enum, ForeignKey, Integer, Numeric, func
+    Date, DateTime, Enum, ForeignKey, Index, Integer, Numeric, func
 )
 from sqlalchemy.orm import Mapped, mapped_column
 from backend.core.database import Base
@@ -17,6 +17,10 @@ class EstadoFatura(str, enum.Enum):
 
 class Fatura(Base):
     __tablename__ = "faturas"
+    __table_args__ = (
+        # Varredura de atraso: estado='pendente' AND data_vencimento < hoje
+        Index("ix_faturas_estado_vencimento", "estado", "data_vencimento"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
 
@@ -31,6 +35,11 @@ class Fatura(Base):
 
     # Calculado no momento da geração; recalculado ao PATCH /pagar se necessário
     valor_total: Mapped[float] = mapped_column(Numeric(10, 2), nullable=False, default=0)
+    # Sessões vinculadas — mantido junto com valor_total por quem vincula/desvincula
+    # sessões (fatura_service.gerar_*, delta atômico em sessao_service.atualizar_estado)
+    total_sessoes: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
 
     estado: Mapped[EstadoFatura] = mapped_column(
         Enum(EstadoFatura), nullable=False, default=EstadoFatura.pendente
@@ -1,6 +1,6 @@
 import enum
 from datetime import datetime
-from sqlalchemy import DateTime, Enum, ForeignKey, Integer, func
+from sqlalchemy import DateTime, Enum, ForeignKey, Index, Integer, func
 from sqlalchemy.orm import Mapped, mapped_column
 from backend.core.database import Base
 
@@ -14,6 +14,7 @@ class TipoNotificacao(str, enum.Enum):
 
 class StatusNotificacao(str, enum.Enum):
     agendada = "agendada"
+    processando = "processando"   # Reivindicada por um worker (ver lease_expira_em)
     enviada = "enviada"
     falhou = "falhou"
 
@@ -25,6 +26,11 @@ class NotificacaoLembrete(Base):
     """
     __tablename__ = "notificacoes_lembretes"
 
+    # Claim do worker e carga da agenda em memória: status = X AND disparo <= Y
+    __table_args__ = (
+        Index("ix_notificacoes_status_disparo", "status", "data_programada_disparo"),
+    )
+
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
 
     paciente_id: Mapped[int] = mapped_column(
@@ -43,6 +49,12 @@ class NotificacaoLembrete(Base):
         Enum(StatusNotificacao), nullable=False, default=StatusNotificacao.agendada,
     )
 
+    # Prazo do claim de um worker. Passou e ainda 'processando' → worker morreu
+    # no meio do envio; a notificação volta a ser elegível para outro claim.
+    lease_expira_em: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True,
+    )
+
     # ID genérico: aponta para sessoes.id ou tarefas_paciente.id dependendo do tipo
     referencia_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
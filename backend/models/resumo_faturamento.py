@@ -0,0 +1,53 @@
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import DateTime, ForeignKey, Integer, Numeric, func
+from sqlalchemy.orm import Mapped, mapped_column
+from backend.core.database import Base
+
+
+class ResumoFaturamentoMensal(Base):
+    """
+    Rollup mensal do faturamento de cada psicólogo — GET /faturas/resumo lê
+    uma linha por mês em vez de agregar faturas e sessões a cada abertura.
+
+    Mantido por delta (services/resumo_service.acumular) na mesma transação
+    de cada mudança de fatura ou sessão; reconstruível a qualquer momento
+    com scripts/reconstruir_resumo_faturamento.py.
+
+    Valores e sessoes_faturadas usam o mês de referência da fatura;
+    sessoes_cobraveis usa o mês (UTC) de data_hora_inicio da sessão.
+    Faturas canceladas não entram.
+    """
+    __tablename__ = "resumo_faturamento_mensal"
+
+    psicologo_id: Mapped[int] = mapped_column(
+        ForeignKey("psicologos.id", ondelete="CASCADE"), primary_key=True,
+    )
+    ano: Mapped[int] = mapped_column(Integer, primary_key=True)
+    mes: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    # Faturado = recebido (pagas) + em aberto (pendentes/atrasadas)
+    valor_faturado: Mapped[Decimal] = mapped_column(
+        Numeric(12, 2), nullable=False, default=0, server_default="0"
+    )
+    valor_recebido: Mapped[Decimal] = mapped_column(
+        Numeric(12, 2), nullable=False, default=0, server_default="0"
+    )
+    valor_em_aberto: Mapped[Decimal] = mapped_column(
+        Numeric(12, 2), nullable=False, default=0, server_default="0"
+    )
+
+    total_faturas: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    sessoes_faturadas: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    # Sessões realizadas/falta_cobrada no mês, faturadas ou não
+    sessoes_cobraveis: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
+    data_atualizacao: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<ResumoFaturamentoMensal psicologo_id={self.psicologo_id} "
+            f"{self.mes}/{self.ano} faturado={self.valor_faturado}>"
+        )
@@ -0,0 +1,48 @@
+from datetime import datetime
+from sqlalchemy import DateTime, ForeignKey, Integer, Numeric, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+from backend.core.database import Base
+
+
+class SerieSessao(Base):
+    """
+    Série de sessões recorrentes descrita por uma RRULE (subconjunto da RFC 5545,
+    ver core/rrule.py) a partir de data_hora_inicio (DTSTART).
+
+    As ocorrências NÃO são gravadas de antemão: agenda e timeline as expandem
+    na janela consultada. Uma linha em `sessoes` (serie_id + ocorrencia_serie)
+    só nasce quando a ocorrência é tocada — check-in, cancelamento, fatura ou
+    o lembrete 24h. Remarcar a série inteira é um UPDATE nesta linha
+    (que grava vigente_desde).
+    """
+    __tablename__ = "series_sessoes"
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+
+    paciente_id: Mapped[int] = mapped_column(
+        ForeignKey("pacientes.id", ondelete="CASCADE"), nullable=False, index=True,
+    )
+
+    # Ex: "FREQ=WEEKLY;BYDAY=MO" — validada por core/rrule.parse
+    regra: Mapped[str] = mapped_column(String(255), nullable=False)
+
+    # DTSTART: horário da primeira ocorrência (as demais repetem o horário)
+    data_hora_inicio: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    duracao_minutos: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    # Null → herda paciente.valor_sessao quando a ocorrência é materializada
+    valor_cobrado: Mapped[float | None] = mapped_column(Numeric(10, 2), nullable=True)
+
+    # Remarcação: regra/DTSTART atuais só valem a partir deste instante — a
+    # expansão não gera ocorrências anteriores a ele. Null = desde o DTSTART
+    vigente_desde: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    # Série encerrada: nenhuma ocorrência a partir deste instante
+    encerrada_em: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    data_criacao: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<SerieSessao id={self.id} paciente_id={self.paciente_id} regra={self.regra}>"
@@ -2,7 +2,7 @@ import enum
 import uuid
 from datetime import datetime
 from sqlalchemy import (
-    DateTime, Enum, ForeignKey, Numeric, String, func
+    DateTime, Enum, ForeignKey, Numeric, String, UniqueConstraint, func
 )
 from sqlalchemy.orm import Mapped, mapped_column
 from backend.core.database import Base
@@ -25,6 +25,11 @@ class EstadoSessao(str, enum.Enum):
 class Sessao(Base):
     __tablename__ = "sessoes"
 
+    # Uma ocorrência de série vira no máximo uma sessão
+    __table_args__ = (
+        UniqueConstraint("serie_id", "ocorrencia_serie", name="uq_sessoes_serie_ocorrencia"),
+    )
+
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
 
     paciente_id: Mapped[int] = mapped_column(
@@ -55,6 +60,17 @@ class Sessao(Base):
         index=True,
     )
 
+    # Ocorrência materializada de uma SerieSessao. ocorrencia_serie é o horário
+    # ORIGINAL da ocorrência (RECURRENCE-ID) — data_hora_inicio pode ser remarcada.
+    serie_id: Mapped[int | None] = mapped_column(
+        ForeignKey("series_sessoes.id", ondelete="SET NULL"),
+        nullable=True,
+        index=True,
+    )
+    ocorrencia_serie: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
     # LPúblico: token UUID para o paciente confirmar via link (WhatsApp/Email)
     # Gerado automaticamente na criação, nunca exposto em rotas internas que não sejam
     # explicitamente o link de confirmação.
@@ -1,13 +1,15 @@
 from datetime import date
-from typing import Any
+from typing import Any, Literal
 from pydantic import BaseModel
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from backend.core.database import get_db
+from backend.core.database import AsyncSessionLocal, get_async_db_leitura, get_db
 from backend.core.security import get_current_psicologo_id
-from backend.services.timeline_service import gerar_timeline
-from backend.services.agenda_service import gerar_agenda_geral
+from backend.services.timeline_service import gerar_timeline, gerar_timeline_ndjson
+from backend.services.agenda_service import gerar_agenda_geral, LIMITE_PADRAO, LIMITE_MAXIMO
 from backend.services import notificacao_service
 from backend.models.sessao import Sessao, EstadoSessao
 from backend.models.paciente import Paciente
@@ -37,7 +39,7 @@ class ConfirmarPublicoResponse(BaseModel):
         "Não requer app instalado, conta nem autenticação.\n\n"
         "1. `sessao.estado` → `'confirmada'`\n"
         "2. Cria `NotificacaoLembrete(tipo='aviso_psicologo')` com disparo imediato\n"
-        "3. Worker notifica o psicólogo em até 60s"
+        "3. Worker notifica o psicólogo imediatamente (acordado pelo commit)"
     ),
 )
 def confirmar_sessao_publico(
@@ -90,24 +92,34 @@ def confirmar_sessao_publico(
     description=(
         "**'Bom dia, Dra. Ana.'** Visão consolidada de todos os pacientes num intervalo. "
         "Cada evento inclui `paciente` (id, nome, foto) para renderização direta. "
-        "Filtrar por tipo via `tipos` (CSV): `sessao,tarefa,checkin`. Default: todos."
+        "Filtrar por tipo via `tipos` (CSV): `sessao,sessao_prevista,tarefa,checkin`. Default: todos.\n\n"
+        "`sessao_prevista` = ocorrência de série recorrente ainda não gravada; para "
+        "check-in/cancelamento, materialize via `POST /series/{serie_id}/ocorrencias`.\n\n"
+        "**Paginação por cursor:** a resposta traz no máximo `limite` eventos (padrão "
+        f"{LIMITE_PADRAO}) e `next_cursor`; reenviar em `cursor` (com os mesmos filtros) "
+        "para buscar a página seguinte. `null` = fim da janela — antes disso a lista "
+        "está truncada."
     ),
 )
-def agenda_geral(
+async def agenda_geral(
     data_inicio: date = Query(..., description="Data de início — YYYY-MM-DD"),
     data_fim: date = Query(..., description="Data de fim — YYYY-MM-DD (inclusive)"),
-    tipos: str | None = Query(None, description="CSV: 'sessao,tarefa,checkin'"),
-    db: Session = Depends(get_db),
+    tipos: str | None = Query(None, description="CSV: 'sessao,sessao_prevista,tarefa,checkin'"),
+    cursor: str | None = Query(None, description="`next_cursor` da página anterior"),
+    limite: int = Query(LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO, description="Eventos por página"),
+    db: AsyncSession = Depends(get_async_db_leitura),
     psicologo_id: int = Depends(get_current_psicologo_id),
 ) -> Any:
     tipos_list = [t.strip() for t in tipos.split(",")] if tipos else None
     try:
-        return gerar_agenda_geral(
+        return await gerar_agenda_geral(
             db,
             psicologo_id=psicologo_id,
             data_inicio=data_inicio,
             data_fim=data_fim,
             tipos=tipos_list,
+            cursor=cursor,
+            limite=limite,
         )
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
@@ -121,18 +133,32 @@ def agenda_geral(
     description=(
         "Agrega Sessões, Tarefas e Check-ins num intervalo `data_inicio`/`data_fim`. "
         "Suporta janelas que cruzam meses (ex: 28/10 → 03/11). "
-        "Lista retornada ordenada cronologicamente — **zero lógica de ordenação no cliente.**"
+        "Lista retornada ordenada cronologicamente — **zero lógica de ordenação no cliente.**\n\n"
+        "`formato=ndjson` devolve um stream `application/x-ndjson` (um evento por linha), "
+        "ideal para janelas de vários anos: o app renderiza antes do fim da resposta."
     ),
 )
-def get_timeline(
+async def get_timeline(
     paciente_id: int,
     data_inicio: date = Query(..., description="Data de início — YYYY-MM-DD"),
     data_fim: date = Query(..., description="Data de fim — YYYY-MM-DD (inclusive)"),
-    db: Session = Depends(get_db),
+    formato: Literal["json", "ndjson"] = Query("json", description="'ndjson' = streaming"),
+    db: AsyncSession = Depends(get_async_db_leitura),
     psicologo_id: int = Depends(get_current_psicologo_id),
 ) -> Any:
     try:
-        return gerar_timeline(
+        if formato == "ndjson":
+            linhas = await gerar_timeline_ndjson(
+                db,
+                # Stream na mesma réplica (ou primário) da validação
+                fabrica_sessao=lambda: AsyncSessionLocal(bind=db.bind),
+                psicologo_id=psicologo_id,
+                paciente_id=paciente_id,
+                data_inicio=data_inicio,
+                data_fim=data_fim,
+            )
+            return StreamingResponse(linhas, media_type="application/x-ndjson")
+        return await gerar_timeline(
             db,
             psicologo_id=psicologo_id,
             paciente_id=paciente_id,
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from backend.core.database import get_db
+from backend.core.database import get_db, get_db_leitura
 from backend.core.security import get_current_psicologo_id
 from backend.schemas.anotacao_clinica import AnotacaoCreate, AnotacaoResponse
 from backend.services import anotacao_service
@@ -41,7 +41,7 @@ def criar_anotacao(
 )
 def listar_anotacoes_paciente(
     paciente_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_leitura),
     psicologo_id: int = Depends(get_current_psicologo_id),
 ) -> list[AnotacaoResponse]:
     anotacoes = anotacao_service.listar_anotacoes_paciente(
@@ -57,7 +57,7 @@ def listar_anotacoes_paciente(
 )
 def buscar_por_sessao(
     sessao_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_leitura),
     psicologo_id: int = Depends(get_current_psicologo_id),
 ) -> AnotacaoResponse:
     anotacao = anotacao_service.buscar_anotacao_por_sessao(
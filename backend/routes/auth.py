@@ -5,10 +5,9 @@ from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from backend.core.config import settings
-from backend.core.database import get_db
+from backend.core.database import get_db, get_db_leitura
 from backend.core.google_auth import GoogleAuthError, GoogleUserInfo, verificar_google_token
 from backend.core.security import create_access_token, get_current_psicologo_id
-from backend.models.psicologo import Psicologo
 from backend.schemas.psicologo import PsicologoResponse, PsicologoMeUpdate, PsicologoOnboardingUpdate
 from backend.services import psicologo_service
 
@@ -85,14 +84,14 @@ def login_google(
     ),
 )
 def get_me(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_leitura),
     psicologo_id: int = Depends(get_current_psicologo_id),
 ) -> PsicologoResponse:
-    psicologo: Psicologo | None = db.query(Psicologo).filter(Psicologo.id == psicologo_id).first()
-    if not psicologo:
+    perfil = psicologo_service.obter_perfil(db, psicologo_id=psicologo_id)
+    if not perfil:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="Psicólogo não encontrado.")
-    return PsicologoResponse.model_validate(psicologo)
+    return perfil
 
 
 @router.patch(
@@ -109,17 +108,12 @@ def update_me(
     db: Session = Depends(get_db),
     psicologo_id: int = Depends(get_current_psicologo_id),
 ) -> PsicologoResponse:
-    psicologo: Psicologo | None = db.query(Psicologo).filter(Psicologo.id == psicologo_id).first()
+    psicologo = psicologo_service.atualizar_perfil(
+        db, psicologo_id=psicologo_id, campos=dados.model_dump(exclude_none=True)
+    )
     if not psicologo:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="Psicólogo não encontrado.")
-
-    update_data = dados.model_dump(exclude_none=True)
-    for field, value in update_data.items():
-        setattr(psicologo, field, value)
-
-    db.commit()
-    db.refresh(psicologo)
     return PsicologoResponse.model_validate(psicologo)
 
 
@@ -133,19 +127,11 @@ def confirmar_onboarding(
     db: Session = Depends(get_db),
     psicologo_id: int = Depends(get_current_psicologo_id),
 ) -> PsicologoResponse:
-    psicologo: Psicologo | None = db.query(Psicologo).filter(Psicologo.id == psicologo_id).first()
+    # Atualiza as configurações do onboarding e força a flag de conclusão
+    psicologo = psicologo_service.atualizar_perfil(
+        db, psicologo_id=psicologo_id, campos=dados.model_dump(), concluir_onboarding=True
+    )
     if not psicologo:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="Psicólogo não encontrado.")
-
-    # Atualiza as configurações do onboarding
-    update_data = dados.model_dump()
-    for field, value in update_data.items():
-        setattr(psicologo, field, value)
-
-    # Força a flag de conclusão
-    psicologo.onboarding_concluido = True
-
-    db.commit()
-    db.refresh(psicologo)
     return PsicologoResponse.model_validate(psicologo)
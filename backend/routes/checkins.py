@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
-from backend.core.database import get_db
+from backend.core.database import get_db, get_db_leitura
 from backend.core.security import get_current_psicologo_id
 from backend.schemas.checkin import CheckInCreate, CheckInResponse
 from backend.services import checkin_service
@@ -32,7 +32,7 @@ def listar_checkins(
     paciente_id: int,
     mes: int | None = Query(None, ge=1, le=12),
     ano: int | None = Query(None, ge=2020),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_leitura),
     psicologo_id: int = Depends(get_current_psicologo_id),
 ) -> list[CheckInResponse]:
     checkins = checkin_service.listar_checkins(
@@ -1,80 +1,71 @@
-from decimal import Decimal
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import Optional
-from datetime import date, datetime
 
-from backend.core.database import get_db
+from backend.core.database import get_async_db_leitura, get_db, get_db_leitura
 from backend.core.security import get_current_psicologo_id
-from backend.models.fatura import Fatura, EstadoFatura
-from backend.models.paciente import Paciente
-from backend.models.sessao import Sessao
-from backend.schemas.fatura import GerarFaturaRequest, FaturaPagarRequest, FaturaResponse
-from backend.services import fatura_service
+from backend.schemas.fatura import (
+    FaturaPagarRequest, FaturaPendenteResponse, FaturaResponse, GerarFaturaLoteRequest,
+    GerarFaturaLoteResponse, GerarFaturaRequest, ResumoFaturamentoResponse,
+)
+from backend.services import fatura_service, resumo_service
+from backend.services.fatura_service import LIMITE_PENDENTES_MAXIMO
 
 router = APIRouter(prefix="/faturas", tags=["Faturamento"])
 
 
-class PacienteMiniResponse(BaseModel):
-    id: int
-    nome_completo: str
-    foto_perfil_url: Optional[str] = None
-    model_config = {"from_attributes": True}
-
-
-class FaturaPendenteResponse(BaseModel):
-    id: int
-    paciente_id: int
-    paciente: PacienteMiniResponse
-    mes_referencia: int
-    ano_referencia: int
-    valor_total: Decimal
-    estado: EstadoFatura
-    data_vencimento: date
-    data_pagamento: Optional[date] = None
-    data_criacao: datetime
-    model_config = {"from_attributes": True}
-
 @router.get(
     "/pendentes",
     response_model=list[FaturaPendenteResponse],
     summary="Listar todas as faturas pendentes ou atrasadas (todos os pacientes)",
     description=(
         "Agrega todas as faturas com estado `pendente` ou `atrasada` de todos os pacientes "
-        "do psicólogo logado. Inclui dados básicos do paciente para render no dashboard."
+        "do psicólogo logado. Inclui dados básicos do paciente para render no dashboard.\n\n"
+        "Sem `limite`, devolve todas (o dashboard soma o total em aberto).\n\n"
+        "**Paginação por cursor (opcional):** com `limite`, ordenado por `(data_vencimento, id)`. "
+        "Se houver mais faturas, o header `X-Proximo-Cursor` traz o token a reenviar em `cursor`."
     ),
 )
-def listar_faturas_pendentes(
-    db: Session = Depends(get_db),
+async def listar_faturas_pendentes(
+    response: Response,
+    cursor: str | None = Query(None, description="Header `X-Proximo-Cursor` da página anterior"),
+    limite: int | None = Query(
+        None, ge=1, le=LIMITE_PENDENTES_MAXIMO, description="Faturas por página. Omitido = todas"
+    ),
+    db: AsyncSession = Depends(get_async_db_leitura),
     psicologo_id: int = Depends(get_current_psicologo_id),
 ) -> list[FaturaPendenteResponse]:
-    faturas = (
-        db.query(Fatura)
-        .join(Paciente, Fatura.paciente_id == Paciente.id)
-        .filter(
-            Paciente.psicologo_id == psicologo_id,
-            Fatura.estado.in_([EstadoFatura.pendente, EstadoFatura.atrasada])
+    try:
+        faturas, proximo_cursor = await fatura_service.listar_faturas_pendentes(
+            db, psicologo_id=psicologo_id, cursor=cursor, limite=limite
         )
-        .order_by(Fatura.data_vencimento.asc())
-        .all()
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    if proximo_cursor:
+        response.headers["X-Proximo-Cursor"] = proximo_cursor
+    return faturas
+
+
+@router.get(
+    "/resumo",
+    response_model=ResumoFaturamentoResponse,
+    summary="Resumo de faturamento mês a mês (todos os pacientes)",
+    description=(
+        "Faturado, recebido e em aberto de cada mês do ano, com contagem de faturas e "
+        "sessões, mais os totais do ano. Faturas canceladas não entram.\n\n"
+        "Lido de um rollup mensal mantido a cada geração/pagamento de fatura e check-in "
+        "— o custo é de 12 linhas, independente do número de sessões."
+    ),
+)
+def resumo_faturamento(
+    ano: int | None = Query(None, ge=2020, le=2100, description="Padrão: ano corrente (UTC)"),
+    db: Session = Depends(get_db_leitura),
+    psicologo_id: int = Depends(get_current_psicologo_id),
+) -> ResumoFaturamentoResponse:
+    return resumo_service.listar_ano(
+        db, psicologo_id=psicologo_id, ano=ano or datetime.now(timezone.utc).year
     )
-    result = []
-    for f in faturas:
-        pac = db.query(Paciente).filter(Paciente.id == f.paciente_id).first()
-        result.append(FaturaPendenteResponse(
-            id=f.id,
-            paciente_id=f.paciente_id,
-            paciente=PacienteMiniResponse(id=pac.id, nome_completo=pac.nome_completo, foto_perfil_url=pac.foto_perfil_url),
-            mes_referencia=f.mes_referencia,
-            ano_referencia=f.ano_referencia,
-            valor_total=f.valor_total,
-            estado=f.estado,
-            data_vencimento=f.data_vencimento,
-            data_pagamento=f.data_pagamento,
-            data_criacao=f.data_criacao,
-        ))
-    return result
 
 
 @router.post(
@@ -96,15 +87,31 @@ def gerar_fatura(
     psicologo_id: int = Depends(get_current_psicologo_id),
 ) -> FaturaResponse:
     try:
-        fatura, sessoes_incluidas = fatura_service.gerar_fatura(
+        fatura = fatura_service.gerar_fatura(
             db, psicologo_id=psicologo_id, paciente_id=paciente_id, dados=dados
         )
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    return FaturaResponse.model_validate(fatura)
 
-    response = FaturaResponse.model_validate(fatura)
-    response.total_sessoes = len(sessoes_incluidas)
-    return response
+
+@router.post(
+    "/gerar-lote",
+    response_model=GerarFaturaLoteResponse,
+    summary="Fecho de mês em lote (todos os pacientes)",
+    description=(
+        "Gera numa única chamada as faturas do mês/ano de todos os pacientes do psicólogo, "
+        "com as mesmas regras de `POST /faturas/gerar/{paciente_id}`. "
+        "Retorna o resultado por paciente: `gerada`, `ja_existente` (fatura do mês já "
+        "existia, não é alterada) ou `sem_sessoes`."
+    ),
+)
+def gerar_faturas_lote(
+    dados: GerarFaturaLoteRequest,
+    db: Session = Depends(get_db),
+    psicologo_id: int = Depends(get_current_psicologo_id),
+) -> GerarFaturaLoteResponse:
+    return fatura_service.gerar_faturas_lote(db, psicologo_id=psicologo_id, dados=dados)
 
 
 @router.get(
@@ -114,19 +121,13 @@ def gerar_fatura(
 )
 def listar_faturas(
     paciente_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_leitura),
     psicologo_id: int = Depends(get_current_psicologo_id),
 ) -> list[FaturaResponse]:
     faturas = fatura_service.listar_faturas_paciente(
         db, psicologo_id=psicologo_id, paciente_id=paciente_id
     )
-    resultado = []
-    for f in faturas:
-        resp = FaturaResponse.model_validate(f)
-        # Conta sessões vinculadas à fatura
-        resp.total_sessoes = db.query(Sessao).filter(Sessao.fatura_id == f.id).count()
-        resultado.append(resp)
-    return resultado
+    return [FaturaResponse.model_validate(f) for f in faturas]
 
 
 @router.get(
@@ -136,16 +137,14 @@ def listar_faturas(
 )
 def detalhar_fatura(
     fatura_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_leitura),
     psicologo_id: int = Depends(get_current_psicologo_id),
 ) -> FaturaResponse:
     try:
         fatura = fatura_service.buscar_fatura(db, psicologo_id=psicologo_id, fatura_id=fatura_id)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
-    resp = FaturaResponse.model_validate(fatura)
-    resp.total_sessoes = db.query(Sessao).filter(Sessao.fatura_id == fatura.id).count()
-    return resp
+    return FaturaResponse.model_validate(fatura)
 
 
 @router.patch(
@@ -169,6 +168,4 @@ def pagar_fatura(
         )
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
-    resp = FaturaResponse.model_validate(fatura)
-    resp.total_sessoes = db.query(Sessao).filter(Sessao.fatura_id == fatura.id).count()
-    return resp
+    return FaturaResponse.model_validate(fatura)
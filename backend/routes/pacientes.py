@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from backend.core.database import get_db
+from backend.core.database import get_async_db_leitura, get_db, get_db_leitura
 from backend.core.security import get_current_psicologo_id
 from backend.schemas.paciente import PacienteCreate, PacienteResponse, PacienteUpdate
 from backend.services import paciente_service
@@ -34,13 +35,13 @@ def criar_paciente(
     summary="Listar Pacientes",
     description="Retorna todos os pacientes do psicólogo autenticado, com paginação opcional.",
 )
-def listar_pacientes(
+async def listar_pacientes(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db_leitura),
     psicologo_id: int = Depends(get_current_psicologo_id),
 ) -> list[PacienteResponse]:
-    pacientes = paciente_service.listar_pacientes(db, psicologo_id=psicologo_id, skip=skip, limit=limit)
+    pacientes = await paciente_service.listar_pacientes(db, psicologo_id=psicologo_id, skip=skip, limit=limit)
     return [PacienteResponse.model_validate(p) for p in pacientes]
 
 
@@ -51,7 +52,7 @@ def listar_pacientes(
 )
 def detalhar_paciente(
     paciente_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_leitura),
     psicologo_id: int = Depends(get_current_psicologo_id),
 ) -> PacienteResponse:
     paciente = paciente_service.buscar_paciente(db, psicologo_id=psicologo_id, paciente_id=paciente_id)
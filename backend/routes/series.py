@@ -0,0 +1,119 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from backend.core.database import get_db, get_db_leitura
+from backend.core.security import get_current_psicologo_id
+from backend.schemas.serie import (
+    OcorrenciaMaterializar, SerieSessaoCreate, SerieSessaoResponse, SerieSessaoUpdate,
+)
+from backend.schemas.sessao import SessaoResponse
+from backend.services import serie_service
+
+router = APIRouter(prefix="/series", tags=["Séries Recorrentes"])
+
+
+@router.post(
+    "/",
+    response_model=SerieSessaoResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Criar série recorrente (RRULE)",
+    description=(
+        "Cria uma série descrita por uma RRULE (subconjunto RFC 5545: `FREQ=DAILY|WEEKLY`, "
+        "`INTERVAL`, `COUNT` ou `UNTIL`, `BYDAY`). `data_hora_inicio`/`data_hora_fim` "
+        "definem a primeira ocorrência.\n\n"
+        "**Nenhuma sessão é gravada de antemão:** as ocorrências aparecem na agenda e na "
+        "timeline como `sessao_prevista` e viram `Sessao` só quando tocadas."
+    ),
+)
+def criar_serie(
+    dados: SerieSessaoCreate,
+    db: Session = Depends(get_db),
+    psicologo_id: int = Depends(get_current_psicologo_id),
+) -> SerieSessaoResponse:
+    try:
+        serie = serie_service.criar_serie(db, psicologo_id=psicologo_id, dados=dados)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    return SerieSessaoResponse.model_validate(serie)
+
+
+@router.get(
+    "/paciente/{paciente_id}",
+    response_model=list[SerieSessaoResponse],
+    summary="Listar séries de um paciente",
+)
+def listar_series(
+    paciente_id: int,
+    db: Session = Depends(get_db_leitura),
+    psicologo_id: int = Depends(get_current_psicologo_id),
+) -> list[SerieSessaoResponse]:
+    series = serie_service.listar_series_paciente(
+        db, psicologo_id=psicologo_id, paciente_id=paciente_id
+    )
+    return [SerieSessaoResponse.model_validate(s) for s in series]
+
+
+@router.patch(
+    "/{serie_id}",
+    response_model=SerieSessaoResponse,
+    summary="Remarcar série inteira",
+    description=(
+        "Atualiza regra, horário, duração ou valor da série num único UPDATE. "
+        "Ocorrências já tocadas (check-in, cancelamento, fatura) não mudam; "
+        "a regra nova só gera ocorrências a partir de agora (`vigente_desde`)."
+    ),
+)
+def atualizar_serie(
+    serie_id: int,
+    dados: SerieSessaoUpdate,
+    db: Session = Depends(get_db),
+    psicologo_id: int = Depends(get_current_psicologo_id),
+) -> SerieSessaoResponse:
+    serie = serie_service.buscar_serie(db, psicologo_id=psicologo_id, serie_id=serie_id)
+    if not serie:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Série não encontrada.")
+    serie = serie_service.atualizar_serie(db, serie=serie, dados=dados)
+    return SerieSessaoResponse.model_validate(serie)
+
+
+@router.delete(
+    "/{serie_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Encerrar série",
+    description="Encerra a série a partir de agora. Sessões já gravadas são mantidas.",
+)
+def encerrar_serie(
+    serie_id: int,
+    db: Session = Depends(get_db),
+    psicologo_id: int = Depends(get_current_psicologo_id),
+) -> None:
+    serie = serie_service.buscar_serie(db, psicologo_id=psicologo_id, serie_id=serie_id)
+    if not serie:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Série não encontrada.")
+    serie_service.encerrar_serie(db, serie=serie)
+
+
+@router.post(
+    "/{serie_id}/ocorrencias",
+    response_model=SessaoResponse,
+    summary="Materializar ocorrência",
+    description=(
+        "Grava a ocorrência `ocorrencia` (horário original, como veio em `sessao_prevista`) "
+        "como Sessão — idempotente. Use o `id` retornado em `PATCH /sessoes/{id}/estado` "
+        "para check-in ou cancelamento."
+    ),
+)
+def materializar_ocorrencia(
+    serie_id: int,
+    dados: OcorrenciaMaterializar,
+    db: Session = Depends(get_db),
+    psicologo_id: int = Depends(get_current_psicologo_id),
+) -> SessaoResponse:
+    serie = serie_service.buscar_serie(db, psicologo_id=psicologo_id, serie_id=serie_id)
+    if not serie:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Série não encontrada.")
+    try:
+        sessao = serie_service.materializar_ocorrencia(db, serie=serie, ocorrencia=dados.ocorrencia)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    return SessaoResponse.model_validate(sessao)
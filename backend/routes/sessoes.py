@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from backend.core.database import get_db
+from backend.core.database import get_db, get_db_leitura
 from backend.core.security import get_current_psicologo_id
 from backend.schemas.sessao import SessaoCreate, SessaoEstadoUpdate, SessaoResponse
 from backend.services import sessao_service
@@ -45,7 +45,7 @@ def listar_sessoes(
     paciente_id: int,
     skip: int = 0,
     limit: int = 200,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_leitura),
     psicologo_id: int = Depends(get_current_psicologo_id),
 ) -> list[SessaoResponse]:
     sessoes = sessao_service.listar_sessoes_paciente(
@@ -60,8 +60,8 @@ def listar_sessoes(
     summary="Check-in / Atualizar estado da sessão",
     description=(
         "**Endpoint de Check-in.** Transiciona o estado da sessão e aplica a lógica financeira:\n\n"
-        "- `realizada` ou `falta_cobrada`: recalcula `valor_total` da fatura se já vinculada.\n"
-        "- `cancelada_paciente` ou `remarcada`: desvincula da fatura não-paga e recalcula total."
+        "- `realizada` ou `falta_cobrada`: ajusta `valor_total` da fatura se já vinculada.\n"
+        "- `cancelada_paciente` ou `remarcada`: desvincula da fatura não-paga e desconta do total."
     ),
 )
 def atualizar_estado(
@@ -75,7 +75,9 @@ def atualizar_estado(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sessão não encontrada.")
 
     try:
-        sessao, _ = sessao_service.atualizar_estado(db, sessao=sessao, dados=dados)
+        sessao, _ = sessao_service.atualizar_estado(
+            db, psicologo_id=psicologo_id, sessao=sessao, dados=dados
+        )
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
 
@@ -113,7 +115,7 @@ def confirmar_sessao_publica_endpoint(
         "'Confirmar' na push notification.\n\n"
         "1. Muda estado da sessão para `confirmada`.\n"
         "2. Cria imediatamente uma `NotificacaoLembrete` do tipo `aviso_psicologo` "
-        "para que o worker notifique o psicólogo no próximo tick (≤ 60s).\n\n"
+        "para que o worker notifique o psicólogo imediatamente (o worker é acordado pelo commit).\n\n"
         "> **Segurança:** Em produção substituir JWT por token assinado de uso único "
         "embutido no payload da push notification."
     ),
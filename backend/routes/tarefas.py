@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from backend.core.database import get_db
+from backend.core.database import get_db, get_db_leitura
 from backend.core.security import get_current_psicologo_id
 from backend.schemas.tarefa import TarefaCreate, TarefaStatusUpdate, TarefaResponse
 from backend.services import tarefa_service
@@ -27,7 +27,7 @@ def criar_tarefa(
             summary="Listar tarefas de um paciente")
 def listar_tarefas(
     paciente_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_leitura),
     psicologo_id: int = Depends(get_current_psicologo_id),
 ) -> list[TarefaResponse]:
     tarefas = tarefa_service.listar_tarefas(db, psicologo_id=psicologo_id, paciente_id=paciente_id)
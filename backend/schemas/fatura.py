@@ -1,6 +1,6 @@
 from datetime import date, datetime
 from decimal import Decimal
-from typing import Optional
+from typing import Literal, Optional
 from pydantic import BaseModel, Field
 from backend.models.fatura import EstadoFatura
 
@@ -15,6 +15,35 @@ class GerarFaturaRequest(BaseModel):
     data_vencimento: date
 
 
+class PacienteMiniResponse(BaseModel):
+    id: int
+    nome_completo: str
+    foto_perfil_url: Optional[str] = None
+    model_config = {"from_attributes": True}
+
+
+class FaturaPendenteResponse(BaseModel):
+    """GET /faturas/pendentes — fatura + mini-perfil do paciente para o dashboard."""
+    id: int
+    paciente_id: int
+    paciente: PacienteMiniResponse
+    mes_referencia: int
+    ano_referencia: int
+    valor_total: Decimal
+    estado: EstadoFatura
+    data_vencimento: date
+    data_pagamento: Optional[date] = None
+    data_criacao: datetime
+    model_config = {"from_attributes": True}
+
+
+class GerarFaturaLoteRequest(GerarFaturaRequest):
+    """
+    POST /faturas/gerar-lote
+    Fecho de mês de todos os pacientes do psicólogo numa chamada.
+    """
+
+
 class FaturaPagarRequest(BaseModel):
     """PATCH /faturas/{id}/pagar"""
     data_pagamento: date = Field(default_factory=date.today)
@@ -30,7 +59,53 @@ class FaturaResponse(BaseModel):
     data_vencimento: date
     data_pagamento: Optional[date]
     data_criacao: datetime
-    # Campo computado: quantidade de sessões incluídas nesta fatura
+    # Quantidade de sessões incluídas nesta fatura (coluna mantida na fatura)
+    total_sessoes: int = 0
+
+    model_config = {"from_attributes": True}
+
+
+class ResultadoFaturaLote(BaseModel):
+    """Resultado do fecho de mês de um paciente dentro do lote."""
+    paciente_id: int
+    paciente_nome: str
+    # gerada | ja_existente (fatura do mês já existia) | sem_sessoes (nada a faturar)
+    status: Literal["gerada", "ja_existente", "sem_sessoes"]
+    fatura_id: Optional[int] = None
+    valor_total: Decimal = Decimal("0")
     total_sessoes: int = 0
 
+
+class GerarFaturaLoteResponse(BaseModel):
+    mes_referencia: int
+    ano_referencia: int
+    total_geradas: int
+    valor_total: Decimal
+    resultados: list[ResultadoFaturaLote]
+
+
+class ResumoMensal(BaseModel):
+    """Uma linha do rollup — mês sem movimento vem zerado."""
+    ano: int
+    mes: int
+    valor_faturado: Decimal = Decimal("0")
+    valor_recebido: Decimal = Decimal("0")
+    valor_em_aberto: Decimal = Decimal("0")
+    total_faturas: int = 0
+    sessoes_faturadas: int = 0
+    # Sessões realizadas/falta_cobrada que começaram no mês, faturadas ou não
+    sessoes_cobraveis: int = 0
     model_config = {"from_attributes": True}
+
+
+class ResumoFaturamentoResponse(BaseModel):
+    """GET /faturas/resumo — os 12 meses do ano + totais do ano."""
+    psicologo_id: int
+    ano: int
+    meses: list[ResumoMensal]
+    valor_faturado: Decimal
+    valor_recebido: Decimal
+    valor_em_aberto: Decimal
+    total_faturas: int
+    sessoes_faturadas: int
+    sessoes_cobraveis: int
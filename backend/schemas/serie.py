@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Optional
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from backend.core import rrule
+
+
+def _validar_regra(valor: str) -> str:
+    valor = valor.strip().upper().removeprefix("RRULE:")
+    rrule.parse(valor)  # ValueError vira 422 na validação do Pydantic
+    return valor
+
+
+class SerieSessaoCreate(BaseModel):
+    """
+    POST /series/ — cria uma série recorrente sem gravar as ocorrências.
+    data_hora_inicio/data_hora_fim definem a PRIMEIRA ocorrência (DTSTART e duração).
+    """
+    paciente_id: int
+    regra: str = Field(..., max_length=255, examples=["FREQ=WEEKLY;BYDAY=MO"])
+    data_hora_inicio: datetime
+    data_hora_fim: datetime
+    valor_cobrado: Optional[Decimal] = Field(None, ge=0, decimal_places=2)
+
+    @field_validator("regra")
+    @classmethod
+    def regra_valida(cls, valor: str) -> str:
+        return _validar_regra(valor)
+
+    @model_validator(mode="after")
+    def validate_horario(self) -> "SerieSessaoCreate":
+        if self.data_hora_fim <= self.data_hora_inicio:
+            raise ValueError("data_hora_fim deve ser posterior a data_hora_inicio.")
+        if self.data_hora_fim - self.data_hora_inicio > timedelta(hours=24):
+            raise ValueError("Uma sessão não pode durar mais de 24h.")
+        return self
+
+
+class SerieSessaoUpdate(BaseModel):
+    """
+    PATCH /series/{id} — remarca a série inteira (um UPDATE numa linha).
+    Campos omitidos ficam como estão.
+    """
+    regra: Optional[str] = Field(None, max_length=255)
+    data_hora_inicio: Optional[datetime] = None
+    duracao_minutos: Optional[int] = Field(None, ge=1, le=24 * 60)
+    valor_cobrado: Optional[Decimal] = Field(None, ge=0, decimal_places=2)
+
+    @field_validator("regra")
+    @classmethod
+    def regra_valida(cls, valor: Optional[str]) -> Optional[str]:
+        return None if valor is None else _validar_regra(valor)
+
+
+class SerieSessaoResponse(BaseModel):
+    id: int
+    paciente_id: int
+    regra: str
+    data_hora_inicio: datetime
+    duracao_minutos: int
+    valor_cobrado: Optional[Decimal]
+    vigente_desde: Optional[datetime]
+    encerrada_em: Optional[datetime]
+    data_criacao: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class OcorrenciaMaterializar(BaseModel):
+    """POST /series/{id}/ocorrencias — horário ORIGINAL da ocorrência a materializar."""
+    ocorrencia: datetime
+
+
+class SessaoPrevistaResponse(BaseModel):
+    """
+    Ocorrência virtual de uma série (tipo_evento "sessao_prevista"): ainda não
+    existe em `sessoes`. Para check-in/cancelamento, materializar antes via
+    POST /series/{serie_id}/ocorrencias com `ocorrencia`.
+    """
+    serie_id: int
+    paciente_id: int
+    ocorrencia: datetime
+    data_hora_inicio: datetime
+    data_hora_fim: datetime
+    valor_cobrado: Optional[Decimal]
@@ -35,6 +35,8 @@ class SessaoCreate(BaseModel):
     POST /sessoes/ — cria uma ou múltiplas sessões.
     Se recorrencia for informada, gera `recorrencia.total_sessoes` sessões
     a partir de data_hora_inicio com o intervalo definido.
+    Para recorrência sem fim (paciente semanal), usar POST /series/ — as
+    ocorrências não são gravadas de antemão.
     """
     paciente_id: int
     data_hora_inicio: datetime
@@ -66,6 +68,9 @@ class SessaoResponse(BaseModel):
     fatura_id: Optional[int]
     token_confirmacao: str        # UUID — usar para montar link público de confirmação
     data_criacao: datetime
+    # Ocorrência materializada de uma série recorrente (ver /series)
+    serie_id: Optional[int] = None
+    ocorrencia_serie: Optional[datetime] = None
     # Campo computado: indica se esta sessão está bloqueada para edição de estado
     ja_faturada: bool = False
 
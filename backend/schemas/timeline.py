@@ -15,6 +15,8 @@ Tipos possíveis de evento:
     "sessao"    → dados_especificos = SessaoResponse
     "tarefa"    → dados_especificos = TarefaResponse
     "checkin"   → dados_especificos = CheckInResponse
+    "sessao_prevista" → dados_especificos = SessaoPrevistaResponse
+                  (ocorrência de série recorrente ainda não gravada)
 """
 
 from datetime import datetime
@@ -24,6 +26,7 @@ from pydantic import BaseModel, ConfigDict
 from backend.schemas.sessao import SessaoResponse
 from backend.schemas.tarefa import TarefaResponse
 from backend.schemas.checkin import CheckInResponse
+from backend.schemas.serie import SessaoPrevistaResponse
 
 
 # ─── Eventos Específicos (Discriminated Union) ────────────────────────────────
@@ -52,10 +55,20 @@ class TimelineEventCheckin(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class TimelineEventSessaoPrevista(BaseModel):
+    tipo_evento: Literal["sessao_prevista"] = "sessao_prevista"
+    data_hora: datetime
+    dados_especificos: SessaoPrevistaResponse
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 # ─── Tipo Union Polimórfico ───────────────────────────────────────────────────
 # Pydantic usa o campo 'tipo_evento' como discriminador para deserializar
 # corretamente ao validar de um dict.
-TimelineEvent = Union[TimelineEventSessao, TimelineEventTarefa, TimelineEventCheckin]
+TimelineEvent = Union[
+    TimelineEventSessao, TimelineEventTarefa, TimelineEventCheckin, TimelineEventSessaoPrevista,
+]
 
 
 class TimelineResponse(BaseModel):
@@ -18,6 +18,7 @@ from backend.models.tarefa_paciente import TarefaPaciente, StatusTarefa
 from backend.models.checkin_diario import CheckInDiario
 from backend.models.anotacao_clinica import AnotacaoClinica, TipoAnotacao
 from backend.models.fatura import Fatura, EstadoFatura
+from backend.services import resumo_service
 
 NOW = datetime.now(timezone.utc)
 TODAY = NOW.date()
@@ -530,6 +531,9 @@ def seed():
 
     db.commit()
 
+    # Faturas/sessões foram gravadas direto — o rollup do dashboard é refeito
+    resumo_service.reconstruir(db, psicologo_id=999)
+
     # Contar stats
     total_pac = db.query(Paciente).filter(Paciente.psicologo_id == 999).count()
     total_ses = db.query(Sessao).join(Paciente).filter(Paciente.psicologo_id == 999).count()
@@ -5,19 +5,95 @@ Responsabilidade:
     Agrega eventos de TODOS os pacientes do psicólogo numa janela de datas.
     Cada evento inclui um mini-perfil do paciente (id, nome, foto) para
     que o frontend renderize diretamente sem queries adicionais.
+
+Motor (1 round trip):
+    Um único UNION ALL sobre sessoes, tarefas_paciente e checkins_diarios,
+    cada ramo já com JOIN em pacientes (filtro de tenant + mini-perfil) e o
+    conjunto ordenado por data_hora no próprio banco.
+
+    Como os ramos precisam ter as mesmas colunas, cada um projeta os campos
+    das três fontes: os seus com valor real e os das outras como NULL tipado
+    (CAST). Os nomes seguem o padrão "<tipo>__<campo>".
+
+Paginação por cursor (keyset):
+    A ordem total é (data_hora, tipo_evento, id). O cursor opaco carrega a
+    chave do último evento entregue; cada ramo aplica o predicado "depois do
+    cursor" sobre a própria coluna de data e traz no máximo `limite + 1`
+    linhas (range scan nos índices compostos paciente_id + data). O UNION
+    ALL mescla os ramos e corta em `limite`: se sobrou linha, há próxima página.
+
+Sessões previstas (séries recorrentes):
+    Ocorrências de SerieSessao ainda não gravadas viram eventos
+    "sessao_prevista", expandidos em Python a partir das séries ativas na
+    janela (+1 query para as séries, +1 para as ocorrências já materializadas).
+    A chave de paginação é (data_hora, "sessao_prevista", serie_id) e elas
+    entram no mesmo k-way merge que a página do UNION ALL.
+
+Async:
+    gerar_agenda_geral roda sobre AsyncSession (rota `async def`): as 1–3
+    queries são aguardadas no event loop; montagem e merge seguem síncronos
+    (CPU puro, sem I/O).
 """
 
+import base64
+import heapq
+import json
+from collections.abc import Iterator
 from datetime import date, datetime, time, timezone
-from sqlalchemy.orm import Session
+from itertools import islice
+from operator import itemgetter
+from sqlalchemy import and_, cast, literal, null, or_, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.models.sessao import Sessao
 from backend.models.tarefa_paciente import TarefaPaciente
 from backend.models.checkin_diario import CheckInDiario
 from backend.models.paciente import Paciente
+from backend.models.serie_sessao import SerieSessao
 
 from backend.schemas.sessao import SessaoResponse
 from backend.schemas.tarefa import TarefaResponse
 from backend.schemas.checkin import CheckInResponse
+from backend.services import serie_service
+
+# Tamanho de página padrão / máximo aceito em GET /agenda/geral
+LIMITE_PADRAO = 500
+LIMITE_MAXIMO = 1000
+
+# tipo_evento → (Model, coluna âncora da data, campos do payload, schema de saída)
+_FONTES = {
+    "sessao": (
+        Sessao,
+        Sessao.data_hora_inicio,
+        ("id", "paciente_id", "data_hora_inicio", "data_hora_fim", "estado",
+         "valor_cobrado", "fatura_id", "token_confirmacao", "data_criacao",
+         "serie_id", "ocorrencia_serie"),
+        SessaoResponse,
+    ),
+    "tarefa": (
+        TarefaPaciente,
+        TarefaPaciente.data_vencimento,
+        ("id", "paciente_id", "titulo", "descricao", "data_vencimento",
+         "status", "data_criacao"),
+        TarefaResponse,
+    ),
+    "checkin": (
+        CheckInDiario,
+        CheckInDiario.data_registro,
+        ("id", "paciente_id", "data_registro", "nivel_humor", "nivel_ansiedade",
+         "anotacao_paciente"),
+        CheckInResponse,
+    ),
+}
+
+# Ocorrências virtuais de séries recorrentes (fora do UNION ALL)
+TIPO_PREVISTA = "sessao_prevista"
+TIPOS_EVENTO = (*_FONTES, TIPO_PREVISTA)
+
+
+def _utc(dt: datetime) -> datetime:
+    # SQLite devolve naive; a chave de ordenação compara tudo em UTC aware
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt
 
 
 def _data_to_dt(d: date, start: bool = True) -> datetime:
@@ -26,121 +102,218 @@ def _data_to_dt(d: date, start: bool = True) -> datetime:
     return datetime.combine(d, t).replace(tzinfo=timezone.utc)
 
 
-def gerar_agenda_geral(
-    db: Session,
+def _codificar_cursor(data_hora: datetime, tipo: str, evento_id: int) -> str:
+    """Serializa a chave (data_hora, tipo_evento, id) num token URL-safe."""
+    bruto = json.dumps({"d": data_hora.isoformat(), "t": tipo, "i": evento_id})
+    return base64.urlsafe_b64encode(bruto.encode()).decode().rstrip("=")
+
+
+def _decodificar_cursor(cursor: str) -> tuple[datetime, str, int]:
+    """Inverso de _codificar_cursor. Lança ValueError se o token for inválido."""
+    try:
+        preenchido = cursor + "=" * (-len(cursor) % 4)
+        dados = json.loads(base64.urlsafe_b64decode(preenchido.encode()))
+        chave = (_utc(datetime.fromisoformat(dados["d"])), str(dados["t"]), int(dados["i"]))
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Cursor inválido.") from e
+    if chave[1] not in TIPOS_EVENTO:
+        raise ValueError("Cursor inválido.")
+    return chave
+
+
+def _depois_do_cursor(tipo: str, cursor: tuple[datetime, str, int]):
+    """
+    Predicado (data_hora, tipo_evento, id) > cursor, especializado para o ramo.
+    Como tipo_evento é constante no ramo, a comparação de tupla vira uma
+    condição simples sobre a coluna de data — sargável pelo índice.
+    """
+    model, coluna_data, _, _ = _FONTES[tipo]
+    cursor_data, cursor_tipo, cursor_id = cursor
+
+    if tipo > cursor_tipo:
+        return coluna_data >= cursor_data
+    if tipo < cursor_tipo:
+        return coluna_data > cursor_data
+    return or_(
+        coluna_data > cursor_data,
+        and_(coluna_data == cursor_data, model.id > cursor_id),
+    )
+
+
+def _select_fonte(
+    tipo: str,
+    *,
+    psicologo_id: int,
+    dt_inicio: datetime,
+    dt_fim: datetime,
+    cursor: tuple[datetime, str, int] | None,
+    limite: int,
+):
+    """Monta o ramo do UNION ALL de uma fonte, já com JOIN no paciente."""
+    model, coluna_data, _, _ = _FONTES[tipo]
+
+    colunas = [
+        literal(tipo).label("tipo_evento"),
+        coluna_data.label("data_hora"),
+        model.id.label("evento_id"),
+        Paciente.id.label("paciente_id"),
+        Paciente.nome_completo.label("paciente_nome"),
+        Paciente.foto_perfil_url.label("paciente_foto"),
+    ]
+    # Projeção larga: campos próprios reais, campos das outras fontes NULL tipado
+    for outro_tipo, (outro_model, _, campos, _) in _FONTES.items():
+        for campo in campos:
+            coluna = getattr(outro_model, campo)
+            valor = coluna if outro_tipo == tipo else cast(null(), coluna.type)
+            colunas.append(valor.label(f"{outro_tipo}__{campo}"))
+
+    stmt = (
+        select(*colunas)
+        .join(Paciente, model.paciente_id == Paciente.id)
+        .where(
+            Paciente.psicologo_id == psicologo_id,
+            coluna_data.isnot(None),
+            coluna_data >= dt_inicio,
+            coluna_data <= dt_fim,
+        )
+    )
+    if cursor is not None:
+        stmt = stmt.where(_depois_do_cursor(tipo, cursor))
+
+    # ORDER BY + LIMIT por ramo exige subquery (SQLite não aceita no UNION direto)
+    ramo = stmt.order_by(coluna_data, model.id).limit(limite).subquery(f"ramo_{tipo}")
+    return select(ramo)
+
+
+def _montar_evento(linha) -> dict:
+    """Converte uma linha do UNION ALL no envelope de evento da agenda."""
+    tipo = linha.tipo_evento
+    _, _, campos, schema = _FONTES[tipo]
+    dados = {campo: linha._mapping[f"{tipo}__{campo}"] for campo in campos}
+    return {
+        "tipo_evento": tipo,
+        "data_hora": linha.data_hora,
+        "paciente": {
+            "id": linha.paciente_id,
+            "nome_completo": linha.paciente_nome,
+            "foto_perfil_url": linha.paciente_foto,
+        },
+        "dados_especificos": schema.model_validate(dados).model_dump(),
+    }
+
+
+async def _sessoes_previstas(
+    db: AsyncSession,
+    *,
+    psicologo_id: int,
+    dt_inicio: datetime,
+    dt_fim: datetime,
+    cursor: tuple[datetime, str, int] | None,
+) -> Iterator[tuple[tuple, dict]]:
+    """
+    (chave, evento) das ocorrências virtuais depois do cursor, em ordem.
+    As queries rodam aqui; a expansão devolvida é um gerador síncrono.
+    """
+    if cursor is not None:
+        dt_inicio = max(dt_inicio, cursor[0])
+
+    linhas = (await db.execute(
+        select(SerieSessao, Paciente.nome_completo, Paciente.foto_perfil_url)
+        .join(Paciente, SerieSessao.paciente_id == Paciente.id)
+        .where(Paciente.psicologo_id == psicologo_id, *serie_service.filtro_janela(dt_inicio, dt_fim))
+    )).all()
+    if not linhas:
+        return iter(())
+
+    perfis = {serie.id: (nome, foto) for serie, nome, foto in linhas}
+    materializadas = await serie_service.ocorrencias_materializadas_async(
+        db, serie_ids=perfis, inicio=dt_inicio, fim=dt_fim
+    )
+
+    def _expandir() -> Iterator[tuple[tuple, dict]]:
+        for ocorrencia, serie in serie_service.expandir_ocorrencias(
+            (serie for serie, _, _ in linhas),
+            inicio=dt_inicio, fim=dt_fim, materializadas=materializadas,
+        ):
+            chave = (ocorrencia, TIPO_PREVISTA, serie.id)
+            if cursor is not None and chave <= cursor:
+                continue
+            nome, foto = perfis[serie.id]
+            yield chave, {
+                "tipo_evento": TIPO_PREVISTA,
+                "data_hora": ocorrencia,
+                "paciente": {"id": serie.paciente_id, "nome_completo": nome, "foto_perfil_url": foto},
+                "dados_especificos": serie_service.sessao_prevista(serie, ocorrencia).model_dump(),
+            }
+
+    return _expandir()
+
+
+async def gerar_agenda_geral(
+    db: AsyncSession,
     *,
     psicologo_id: int,
     data_inicio: date,
     data_fim: date,
     tipos: list[str] | None = None,
+    cursor: str | None = None,
+    limite: int = LIMITE_PADRAO,
 ) -> dict:
     """
     Varre todos os pacientes do psicólogo e agrega seus eventos no intervalo.
-    Retorna uma lista única ordenada cronologicamente com mini-perfil do paciente.
+    Retorna uma página ordenada cronologicamente com mini-perfil do paciente
+    e `next_cursor` (None quando não há mais eventos na janela).
     """
     if data_fim < data_inicio:
         raise ValueError("data_fim deve ser igual ou posterior a data_inicio.")
+    if not 1 <= limite <= LIMITE_MAXIMO:
+        raise ValueError(f"limite deve estar entre 1 e {LIMITE_MAXIMO}.")
+
+    chave_cursor = _decodificar_cursor(cursor) if cursor else None
 
     dt_inicio = _data_to_dt(data_inicio, start=True)
     dt_fim = _data_to_dt(data_fim, start=False)
 
-    # IDs de todos os pacientes do psicólogo
-    pacientes = (
-        db.query(Paciente)
-        .filter(Paciente.psicologo_id == psicologo_id)
-        .all()
-    )
-    paciente_map = {p.id: p for p in pacientes}
-    paciente_ids = list(paciente_map.keys())
-
-    if not paciente_ids:
-        return {"psicologo_id": psicologo_id, "data_inicio": str(data_inicio),
-                "data_fim": str(data_fim), "total_eventos": 0, "eventos": []}
-
-    eventos: list[dict] = []
-    tipos_ativos = set(tipos) if tipos else {"sessao", "tarefa", "checkin"}
-
-    # ── Sessões ───────────────────────────────────────────────────────────────
-    if "sessao" in tipos_ativos:
-        sessoes = (
-            db.query(Sessao)
-            .filter(
-                Sessao.paciente_id.in_(paciente_ids),
-                Sessao.data_hora_inicio >= dt_inicio,
-                Sessao.data_hora_inicio <= dt_fim,
-            )
-            .order_by(Sessao.data_hora_inicio)
-            .limit(500)
-            .all()
-        )
-        for s in sessoes:
-            pac = paciente_map[s.paciente_id]
-            eventos.append({
-                "tipo_evento": "sessao",
-                "data_hora": s.data_hora_inicio,
-                "paciente": {
-                    "id": pac.id,
-                    "nome_completo": pac.nome_completo,
-                    "foto_perfil_url": pac.foto_perfil_url,
-                },
-                "dados_especificos": SessaoResponse.model_validate(s).model_dump(),
-            })
-
-    # ── Tarefas ───────────────────────────────────────────────────────────────
-    if "tarefa" in tipos_ativos:
-        tarefas = (
-            db.query(TarefaPaciente)
-            .filter(
-                TarefaPaciente.paciente_id.in_(paciente_ids),
-                TarefaPaciente.data_vencimento.isnot(None),
-                TarefaPaciente.data_vencimento >= dt_inicio,
-                TarefaPaciente.data_vencimento <= dt_fim,
+    tipos_ativos = [t for t in _FONTES if not tipos or t in tipos]
+    linhas = []
+
+    if tipos_ativos:
+        # limite + 1: a linha extra só serve para saber se existe próxima página
+        ramos = [
+            _select_fonte(
+                t, psicologo_id=psicologo_id, dt_inicio=dt_inicio, dt_fim=dt_fim,
+                cursor=chave_cursor, limite=limite + 1,
             )
-            .order_by(TarefaPaciente.data_vencimento)
-            .limit(200)
-            .all()
+            for t in tipos_ativos
+        ]
+        uniao = union_all(*ramos).subquery("eventos")
+
+        # Ordenação no banco — o frontend (e o Python) não precisam fazer nada
+        stmt = (
+            select(uniao)
+            .order_by(uniao.c.data_hora, uniao.c.tipo_evento, uniao.c.evento_id)
+            .limit(limite + 1)
         )
-        for t in tarefas:
-            pac = paciente_map[t.paciente_id]
-            eventos.append({
-                "tipo_evento": "tarefa",
-                "data_hora": t.data_vencimento,
-                "paciente": {
-                    "id": pac.id,
-                    "nome_completo": pac.nome_completo,
-                    "foto_perfil_url": pac.foto_perfil_url,
-                },
-                "dados_especificos": TarefaResponse.model_validate(t).model_dump(),
-            })
-
-    # ── Check-ins ─────────────────────────────────────────────────────────────
-    if "checkin" in tipos_ativos:
-        checkins = (
-            db.query(CheckInDiario)
-            .filter(
-                CheckInDiario.paciente_id.in_(paciente_ids),
-                CheckInDiario.data_registro >= dt_inicio,
-                CheckInDiario.data_registro <= dt_fim,
-            )
-            .order_by(CheckInDiario.data_registro)
-            .limit(200)
-            .all()
+        linhas = (await db.execute(stmt)).all()
+
+    pagina = (((_utc(l.data_hora), l.tipo_evento, l.evento_id), l) for l in linhas)
+    if not tipos or TIPO_PREVISTA in tipos:
+        previstas = await _sessoes_previstas(
+            db, psicologo_id=psicologo_id, dt_inicio=dt_inicio, dt_fim=dt_fim,
+            cursor=chave_cursor,
         )
-        for c in checkins:
-            pac = paciente_map[c.paciente_id]
-            eventos.append({
-                "tipo_evento": "checkin",
-                "data_hora": c.data_registro,
-                "paciente": {
-                    "id": pac.id,
-                    "nome_completo": pac.nome_completo,
-                    "foto_perfil_url": pac.foto_perfil_url,
-                },
-                "dados_especificos": CheckInResponse.model_validate(c).model_dump(),
-            })
-
-    # Ordena tudo cronologicamente — o frontend não precisa fazer nada
-    eventos.sort(key=lambda e: e["data_hora"])
+        pagina = heapq.merge(pagina, previstas, key=itemgetter(0))
+    pagina = list(islice(pagina, limite + 1))
+
+    next_cursor = None
+    if len(pagina) > limite:
+        pagina = pagina[:limite]
+        next_cursor = _codificar_cursor(*pagina[-1][0])
+
+    eventos = [
+        item if isinstance(item, dict) else _montar_evento(item)
+        for _, item in pagina
+    ]
 
     return {
         "psicologo_id": psicologo_id,
@@ -148,4 +321,5 @@ def gerar_agenda_geral(
         "data_fim": str(data_fim),
         "total_eventos": len(eventos),
         "eventos": eventos,
+        "next_cursor": next_cursor,
     }
@@ -1,10 +1,43 @@
+import base64
+import json
+import logging
 from datetime import date, datetime, timezone
+from decimal import Decimal
+from sqlalchemy import and_, case, func, insert, literal, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from backend.models.fatura import Fatura, EstadoFatura
 from backend.models.sessao import Sessao, EstadoSessao
-from backend.models.paciente import Paciente
-from backend.schemas.fatura import GerarFaturaRequest, FaturaPagarRequest
+from backend.models.paciente import Paciente, StatusPaciente
+from backend.services import notificacao_service, resumo_service
+from backend.schemas.fatura import (
+    FaturaPagarRequest, FaturaPendenteResponse, GerarFaturaLoteRequest,
+    GerarFaturaLoteResponse, GerarFaturaRequest, PacienteMiniResponse, ResultadoFaturaLote,
+)
+
+logger = logging.getLogger(__name__)
+
+LIMITE_PENDENTES_MAXIMO = 500
+
+_ESTADOS_COBRAVEIS = (EstadoSessao.realizada, EstadoSessao.falta_cobrada)
+
+
+def _filtro_cobraveis_mes(inicio: datetime, fim: datetime) -> tuple:
+    """Sessões cobráveis ainda não faturadas que começam em [inicio, fim)."""
+    return (
+        Sessao.data_hora_inicio >= inicio,
+        Sessao.data_hora_inicio < fim,
+        Sessao.fatura_id.is_(None),
+        Sessao.estado.in_(_ESTADOS_COBRAVEIS),
+    )
+
+
+def _intervalo_mes(mes: int, ano: int) -> tuple[datetime, datetime]:
+    """[início, fim) do mês em UTC — intervalo semiaberto, usa o índice de data."""
+    inicio = datetime(ano, mes, 1, tzinfo=timezone.utc)
+    fim = datetime(ano + mes // 12, mes % 12 + 1, 1, tzinfo=timezone.utc)
+    return inicio, fim
 
 
 def gerar_fatura(
@@ -13,16 +46,21 @@ def gerar_fatura(
     psicologo_id: int,
     paciente_id: int,
     dados: GerarFaturaRequest,
-) -> tuple[Fatura, list[Sessao]]:
+) -> Fatura:
     """
     [MOTOR FINANCEIRO]
 
-    Varre todas as sessões do paciente que:
-      1. Estejam no mês/ano de referência
+    Seleciona no banco as sessões do paciente que:
+      1. Comecem no mês/ano de referência (intervalo semiaberto em UTC,
+         atendido por ix_sessoes_paciente_data_inicio)
       2. Estado seja "realizada" ou "falta_cobrada"
       3. fatura_id seja NULL (ainda não faturadas)
 
-    Cria uma Fatura com o valor_total calculado e vincula as sessões a ela.
+    O valor_total é um SUM no banco (Decimal, sem arredondamento de float) e
+    as sessões são vinculadas com um único UPDATE ... WHERE id IN (...).
+    O custo depende só das sessões do mês, não do histórico do paciente.
+    total_sessoes fica gravado na própria fatura e o rollup mensal
+    (resumo_service) recebe o delta na mesma transação.
 
     Raises:
         ValueError: Se não houver sessões elegíveis, ou se já existir uma fatura
@@ -54,33 +92,27 @@ def gerar_fatura(
             "Use o endpoint de edição ou cancele a fatura existente."
         )
 
-    # Busca sessões elegíveis no mês/ano
-    sessoes_elegiveis: list[Sessao] = (
-        db.query(Sessao)
-        .filter(
-            Sessao.paciente_id == paciente_id,
-            Sessao.fatura_id.is_(None),
-            Sessao.estado.in_([EstadoSessao.realizada, EstadoSessao.falta_cobrada]),
-        )
-        .all()
-    )
+    inicio, fim = _intervalo_mes(dados.mes_referencia, dados.ano_referencia)
 
-    # Filtra pelo mês/ano de referência
-    sessoes_do_mes = [
-        s for s in sessoes_elegiveis
-        if s.data_hora_inicio.month == dados.mes_referencia
-        and s.data_hora_inicio.year == dados.ano_referencia
-    ]
+    # Sessões elegíveis do mês — travadas (Postgres) até o commit para que
+    # um fecho concorrente não as fature duas vezes
+    sessao_ids = list(db.scalars(
+        select(Sessao.id)
+        .where(Sessao.paciente_id == paciente_id, *_filtro_cobraveis_mes(inicio, fim))
+        .with_for_update()
+    ))
 
-    if not sessoes_do_mes:
+    if not sessao_ids:
         raise ValueError(
             f"Nenhuma sessão elegível em {dados.mes_referencia}/{dados.ano_referencia} "
             "para faturar. Verifique se as sessões estão com estado 'realizada' ou "
             "'falta_cobrada' e sem fatura associada."
         )
 
-    # Calcula o total
-    valor_total = sum(float(s.valor_cobrado or 0) for s in sessoes_do_mes)
+    valor_total = db.scalar(
+        select(func.coalesce(func.sum(Sessao.valor_cobrado), 0))
+        .where(Sessao.id.in_(sessao_ids))
+    )
 
     # Cria a Fatura
     fatura = Fatura(
@@ -88,22 +120,178 @@ def gerar_fatura(
         mes_referencia=dados.mes_referencia,
         ano_referencia=dados.ano_referencia,
         valor_total=valor_total,
+        total_sessoes=len(sessao_ids),
         estado=EstadoFatura.pendente,
         data_vencimento=dados.data_vencimento,
     )
     db.add(fatura)
     db.flush()  # Gera o fatura.id sem commitar ainda
 
-    # Vincula sessões à fatura
-    for sessao in sessoes_do_mes:
-        sessao.fatura_id = fatura.id
+    # Vincula as sessões à fatura num único UPDATE
+    db.execute(
+        update(Sessao).where(Sessao.id.in_(sessao_ids)).values(fatura_id=fatura.id),
+        execution_options={"synchronize_session": False},
+    )
 
+    resumo_service.acumular(db, [_delta_fatura_gerada(
+        psicologo_id, dados, valor_total=valor_total, total_sessoes=len(sessao_ids),
+    )])
     db.commit()
     db.refresh(fatura)
-    for s in sessoes_do_mes:
-        db.refresh(s)
+    return fatura
 
-    return fatura, sessoes_do_mes
+
+def _delta_fatura_gerada(
+    psicologo_id: int, dados: GerarFaturaRequest, *, valor_total, total_sessoes: int
+) -> dict:
+    """Delta do rollup mensal para uma fatura nova (entra em aberto)."""
+    return {
+        "psicologo_id": psicologo_id,
+        "ano": dados.ano_referencia,
+        "mes": dados.mes_referencia,
+        "valor_faturado": valor_total,
+        "valor_em_aberto": valor_total,
+        "total_faturas": 1,
+        "sessoes_faturadas": total_sessoes,
+    }
+
+
+def gerar_faturas_lote(
+    db: Session,
+    *,
+    psicologo_id: int,
+    dados: GerarFaturaLoteRequest,
+) -> GerarFaturaLoteResponse:
+    """
+    [MOTOR FINANCEIRO — FECHO DE MÊS EM LOTE]
+
+    Mesmas regras de gerar_fatura, para todos os pacientes do psicólogo, com
+    um número fixo de statements independente do número de pacientes:
+      1. Sessões elegíveis do mês (id, paciente, valor), travadas (Postgres)
+         até o commit como em gerar_fatura → COUNT/SUM por paciente
+      2. Pacientes (ativos + quem tem sessão elegível) e faturas já existentes
+      3. INSERT multi-linha das Faturas ... RETURNING id
+      4. UPDATE sessoes ... FROM faturas vinculando de uma vez exatamente as
+         sessões lidas em 1 (id IN ...) — as mesmas somadas nos totais
+      5. Upsert do delta somado no rollup mensal (resumo_service)
+
+    Pacientes que já têm fatura no mês são reportados como `ja_existente`
+    (com os totais da fatura existente) e ficam de fora; ativos sem sessão
+    elegível como `sem_sessoes`.
+    """
+    inicio, fim = _intervalo_mes(dados.mes_referencia, dados.ano_referencia)
+    filtro_mes = _filtro_cobraveis_mes(inicio, fim)
+
+    # Linhas travadas até o commit: um gerar_fatura concorrente espera (ou faz
+    # esperar) as mesmas sessões. Os ids lidos aqui são os únicos vinculados
+    # depois — sessão que fica elegível no meio do lote fica para o próximo fecho
+    ids_por_paciente: dict[int, list[int]] = {}
+    agregados: dict[int, tuple[int, Decimal]] = {}
+    for sessao_id, paciente_id, valor in db.execute(
+        select(Sessao.id, Sessao.paciente_id, Sessao.valor_cobrado)
+        .join(Paciente, Sessao.paciente_id == Paciente.id)
+        .where(Paciente.psicologo_id == psicologo_id, *filtro_mes)
+        .with_for_update(of=Sessao)
+    ):
+        ids_por_paciente.setdefault(paciente_id, []).append(sessao_id)
+        total_sessoes, valor_total = agregados.get(paciente_id, (0, Decimal("0")))
+        agregados[paciente_id] = (total_sessoes + 1, valor_total + (valor or 0))
+
+    pacientes = db.execute(
+        select(Paciente.id, Paciente.nome_completo)
+        .where(
+            Paciente.psicologo_id == psicologo_id,
+            or_(Paciente.status == StatusPaciente.ativo, Paciente.id.in_(agregados)),
+        )
+        .order_by(Paciente.nome_completo, Paciente.id)
+    ).all()
+
+    existentes = {
+        paciente_id: (fatura_id, total_sessoes, valor_total)
+        for paciente_id, fatura_id, total_sessoes, valor_total in db.execute(
+            select(Fatura.paciente_id, Fatura.id, Fatura.total_sessoes, Fatura.valor_total)
+            .join(Paciente, Fatura.paciente_id == Paciente.id)
+            .where(
+                Paciente.psicologo_id == psicologo_id,
+                Fatura.mes_referencia == dados.mes_referencia,
+                Fatura.ano_referencia == dados.ano_referencia,
+            )
+        )
+    }
+
+    a_faturar = [
+        paciente_id for paciente_id, _ in pacientes
+        if paciente_id in agregados and paciente_id not in existentes
+    ]
+    novas: dict[int, int] = {}
+    if a_faturar:
+        novas = {
+            paciente_id: fatura_id
+            for fatura_id, paciente_id in db.execute(
+                insert(Fatura).returning(Fatura.id, Fatura.paciente_id),
+                [
+                    {
+                        "paciente_id": paciente_id,
+                        "mes_referencia": dados.mes_referencia,
+                        "ano_referencia": dados.ano_referencia,
+                        "valor_total": agregados[paciente_id][1],
+                        "total_sessoes": agregados[paciente_id][0],
+                        "estado": EstadoFatura.pendente,
+                        "data_vencimento": dados.data_vencimento,
+                    }
+                    for paciente_id in a_faturar
+                ],
+            )
+        }
+
+        # Vincula as sessões somadas de todos os pacientes à fatura de cada um
+        db.execute(
+            update(Sessao)
+            .where(
+                Sessao.id.in_([i for paciente_id in novas for i in ids_por_paciente[paciente_id]]),
+                Sessao.paciente_id == Fatura.paciente_id,
+                Fatura.id.in_(novas.values()),
+            )
+            .values(fatura_id=Fatura.id),
+            execution_options={"synchronize_session": False},
+        )
+        resumo_service.acumular(db, [
+            _delta_fatura_gerada(
+                psicologo_id, dados,
+                valor_total=agregados[paciente_id][1], total_sessoes=agregados[paciente_id][0],
+            )
+            for paciente_id in novas
+        ])
+        db.commit()
+
+    resultados = []
+    for paciente_id, nome in pacientes:
+        total_sessoes, valor_total = agregados.get(paciente_id, (0, Decimal("0")))
+        if paciente_id in existentes:
+            fatura_id, total_sessoes, valor_total = existentes[paciente_id]
+            resultado = ResultadoFaturaLote(
+                paciente_id=paciente_id, paciente_nome=nome, status="ja_existente",
+                fatura_id=fatura_id, valor_total=valor_total, total_sessoes=total_sessoes,
+            )
+        elif paciente_id in novas:
+            resultado = ResultadoFaturaLote(
+                paciente_id=paciente_id, paciente_nome=nome, status="gerada",
+                fatura_id=novas[paciente_id], valor_total=valor_total,
+                total_sessoes=total_sessoes,
+            )
+        else:
+            resultado = ResultadoFaturaLote(
+                paciente_id=paciente_id, paciente_nome=nome, status="sem_sessoes",
+            )
+        resultados.append(resultado)
+
+    return GerarFaturaLoteResponse(
+        mes_referencia=dados.mes_referencia,
+        ano_referencia=dados.ano_referencia,
+        total_geradas=len(novas),
+        valor_total=sum((r.valor_total for r in resultados if r.status == "gerada"), Decimal("0")),
+        resultados=resultados,
+    )
 
 
 def pagar_fatura(
@@ -115,9 +303,13 @@ def pagar_fatura(
 ) -> Fatura:
     """
     Marca a fatura como paga. Valida ownership via paciente.psicologo_id.
-    Não permite pagar faturas já canceladas.
+    Não permite pagar faturas já canceladas. O valor passa de em aberto
+    para recebido no rollup mensal.
     """
     fatura = _buscar_fatura_com_ownership(db, psicologo_id=psicologo_id, fatura_id=fatura_id)
+    # Trava a linha (Postgres): o valor movido no rollup é o valor_total atual,
+    # e dois pagamentos simultâneos não contam duas vezes
+    db.refresh(fatura, with_for_update=True)
 
     if fatura.estado == EstadoFatura.cancelada:
         raise ValueError("Não é possível pagar uma fatura cancelada.")
@@ -126,11 +318,162 @@ def pagar_fatura(
 
     fatura.estado = EstadoFatura.paga
     fatura.data_pagamento = dados.data_pagamento
+    resumo_service.acumular(db, [{
+        "psicologo_id": psicologo_id,
+        "ano": fatura.ano_referencia,
+        "mes": fatura.mes_referencia,
+        "valor_recebido": fatura.valor_total,
+        "valor_em_aberto": -fatura.valor_total,
+    }])
     db.commit()
     db.refresh(fatura)
     return fatura
 
 
+# ─── Varredura de Atraso ──────────────────────────────────────────────────────
+
+def marcar_faturas_atrasadas(
+    db: Session, *, hoje: date | None = None, lote: int = 500
+) -> int:
+    """
+    Passa a 'atrasada' toda fatura 'pendente' com data_vencimento < hoje (UTC)
+    e agenda uma notificação de cobrança para cada uma. Chamado pelo worker.
+
+    Em lotes de `lote` linhas, cada um numa transação curta:
+        UPDATE faturas SET estado='atrasada'
+         WHERE id IN (SELECT id ... LIMIT :lote [FOR UPDATE SKIP LOCKED])
+        RETURNING id, paciente_id
+    seguido do INSERT em massa das cobranças e do commit — a tabela nunca
+    fica travada por muito tempo e uma fatura sendo paga agora é pulada.
+
+    Idempotente: só linhas ainda 'pendente' mudam, e a cobrança entra na
+    mesma transação da mudança de estado. Retorna quantas faturas mudaram.
+    """
+    hoje = hoje or datetime.now(timezone.utc).date()
+    postgres = db.get_bind().dialect.name == "postgresql"
+    total = 0
+    while True:
+        candidatos = (
+            select(Fatura.id)
+            .where(Fatura.estado == EstadoFatura.pendente, Fatura.data_vencimento < hoje)
+            .order_by(Fatura.data_vencimento)  # ordem do índice — sem sort
+            .limit(lote)
+        )
+        if postgres:
+            candidatos = candidatos.with_for_update(skip_locked=True)
+
+        atrasadas = db.execute(
+            update(Fatura)
+            .where(Fatura.id.in_(candidatos.scalar_subquery()))
+            .values(estado=EstadoFatura.atrasada)
+            .returning(Fatura.id, Fatura.paciente_id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        if not atrasadas:
+            break
+
+        notificacao_service.agendar_cobrancas(db, faturas=[tuple(f) for f in atrasadas])
+        db.commit()
+        total += len(atrasadas)
+        if len(atrasadas) < lote:
+            break
+    return total
+
+
+# ─── Dashboard de Pendências ──────────────────────────────────────────────────
+
+def _codificar_cursor(data_vencimento: date, fatura_id: int) -> str:
+    """Serializa a chave (data_vencimento, id) num token URL-safe."""
+    bruto = json.dumps({"v": data_vencimento.isoformat(), "i": fatura_id})
+    return base64.urlsafe_b64encode(bruto.encode()).decode().rstrip("=")
+
+
+def _decodificar_cursor(cursor: str) -> tuple[date, int]:
+    """Inverso de _codificar_cursor. Lança ValueError se o token for inválido."""
+    try:
+        preenchido = cursor + "=" * (-len(cursor) % 4)
+        dados = json.loads(base64.urlsafe_b64decode(preenchido.encode()))
+        return date.fromisoformat(dados["v"]), int(dados["i"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Cursor inválido.") from e
+
+
+async def listar_faturas_pendentes(
+    db: AsyncSession,
+    *,
+    psicologo_id: int,
+    cursor: str | None = None,
+    limite: int | None = None,
+) -> tuple[list[FaturaPendenteResponse], str | None]:
+    """
+    Faturas pendentes/atrasadas de todos os pacientes do psicólogo, por
+    (data_vencimento, id). Uma única query com JOIN e só as colunas que o
+    dashboard usa — sem carregar o Paciente inteiro por fatura. AsyncSession:
+    rota `async def`, sem thread presa esperando o banco.
+    Retorna (página, próximo cursor ou None na última página).
+    limite=None → todas (a partir do cursor, se houver), sem próximo cursor.
+    """
+    if limite is not None and not 1 <= limite <= LIMITE_PENDENTES_MAXIMO:
+        raise ValueError(f"limite deve estar entre 1 e {LIMITE_PENDENTES_MAXIMO}.")
+
+    stmt = (
+        select(
+            Fatura.id,
+            Fatura.paciente_id,
+            Fatura.mes_referencia,
+            Fatura.ano_referencia,
+            Fatura.valor_total,
+            Fatura.estado,
+            Fatura.data_vencimento,
+            Fatura.data_pagamento,
+            Fatura.data_criacao,
+            Paciente.nome_completo,
+            Paciente.foto_perfil_url,
+        )
+        .join(Paciente, Fatura.paciente_id == Paciente.id)
+        .where(
+            Paciente.psicologo_id == psicologo_id,
+            Fatura.estado.in_([EstadoFatura.pendente, EstadoFatura.atrasada]),
+        )
+    )
+    if cursor:
+        vencimento, fatura_id = _decodificar_cursor(cursor)
+        stmt = stmt.where(or_(
+            Fatura.data_vencimento > vencimento,
+            and_(Fatura.data_vencimento == vencimento, Fatura.id > fatura_id),
+        ))
+
+    stmt = stmt.order_by(Fatura.data_vencimento, Fatura.id)
+    # limite + 1: a linha extra só serve para saber se existe próxima página
+    if limite is not None:
+        stmt = stmt.limit(limite + 1)
+    linhas = (await db.execute(stmt)).all()
+
+    proximo_cursor = None
+    if limite is not None and len(linhas) > limite:
+        linhas = linhas[:limite]
+        proximo_cursor = _codificar_cursor(linhas[-1].data_vencimento, linhas[-1].id)
+
+    pagina = [
+        FaturaPendenteResponse(
+            id=l.id,
+            paciente_id=l.paciente_id,
+            paciente=PacienteMiniResponse(
+                id=l.paciente_id, nome_completo=l.nome_completo, foto_perfil_url=l.foto_perfil_url
+            ),
+            mes_referencia=l.mes_referencia,
+            ano_referencia=l.ano_referencia,
+            valor_total=l.valor_total,
+            estado=l.estado,
+            data_vencimento=l.data_vencimento,
+            data_pagamento=l.data_pagamento,
+            data_criacao=l.data_criacao,
+        )
+        for l in linhas
+    ]
+    return pagina, proximo_cursor
+
+
 def listar_faturas_paciente(
     db: Session, *, psicologo_id: int, paciente_id: int
 ) -> list[Fatura]:
@@ -168,3 +511,92 @@ def _buscar_fatura_com_ownership(
     if not fatura:
         raise ValueError("Fatura não encontrada ou não pertence ao psicólogo.")
     return fatura
+
+
+# ─── Consistência dos Totais ──────────────────────────────────────────────────
+
+def verificar_consistencia_faturas(db: Session, *, corrigir: bool = True) -> list[dict]:
+    """
+    Confere valor_total/total_sessoes das faturas abertas (pendente/atrasada),
+    mantidos por delta em sessao_service.atualizar_estado, contra SUM/COUNT
+    das sessões vinculadas — uma query agregada com HAVING que só devolve as
+    divergentes. Faturas pagas/canceladas são congeladas e não entram.
+
+    Com corrigir=True regrava os totais calculados. A correção é otimista:
+    só aplica se a fatura ainda tem os valores lidos, para não sobrescrever
+    um delta commitado entre a leitura e a escrita (fica para a próxima).
+    A diferença corrigida também é aplicada ao rollup mensal.
+
+    Retorna as divergências encontradas.
+    """
+    contagem = func.count(Sessao.id)
+    soma = func.coalesce(func.sum(case(
+        (Sessao.estado.in_(_ESTADOS_COBRAVEIS), Sessao.valor_cobrado), else_=0,
+    )), 0)
+
+    linhas = db.execute(
+        select(
+            Fatura.id, Paciente.psicologo_id, Fatura.ano_referencia, Fatura.mes_referencia,
+            Fatura.valor_total, Fatura.total_sessoes,
+            soma.label("valor_calculado"), contagem.label("total_calculado"),
+        )
+        .join(Paciente, Fatura.paciente_id == Paciente.id)
+        .outerjoin(Sessao, Sessao.fatura_id == Fatura.id)
+        .where(Fatura.estado.in_([EstadoFatura.pendente, EstadoFatura.atrasada]))
+        .group_by(
+            Fatura.id, Paciente.psicologo_id, Fatura.ano_referencia, Fatura.mes_referencia,
+            Fatura.valor_total, Fatura.total_sessoes,
+        )
+        .having(or_(
+            func.round(Fatura.valor_total, 2) != func.round(soma, 2),
+            Fatura.total_sessoes != contagem,
+        ))
+    ).all()
+
+    divergencias = [
+        {
+            "fatura_id": l.id,
+            "valor_total": l.valor_total,
+            "valor_calculado": l.valor_calculado,
+            "total_sessoes": l.total_sessoes,
+            "total_calculado": l.total_calculado,
+        }
+        for l in linhas
+    ]
+    for d in divergencias:
+        logger.warning(
+            "Fatura %(fatura_id)s divergente: valor_total=%(valor_total)s (calculado "
+            "%(valor_calculado)s), total_sessoes=%(total_sessoes)s (calculado %(total_calculado)s).",
+            d,
+        )
+
+    if corrigir and divergencias:
+        deltas = []
+        for l in linhas:
+            # Uma fatura por UPDATE: o RETURNING diz se a guarda passou, e só
+            # então a diferença vai para o rollup
+            corrigida = db.execute(
+                update(Fatura)
+                .where(
+                    Fatura.id == l.id,
+                    func.round(Fatura.valor_total, 2)
+                    == literal(round(Decimal(l.valor_total), 2), Fatura.valor_total.type),
+                    Fatura.total_sessoes == l.total_sessoes,
+                )
+                .values(valor_total=l.valor_calculado, total_sessoes=l.total_calculado)
+                .returning(Fatura.id)
+                .execution_options(synchronize_session=False)
+            ).first()
+            if corrigida:
+                delta_valor = Decimal(str(l.valor_calculado)) - Decimal(str(l.valor_total))
+                deltas.append({
+                    "psicologo_id": l.psicologo_id,
+                    "ano": l.ano_referencia,
+                    "mes": l.mes_referencia,
+                    "valor_faturado": delta_valor,
+                    "valor_em_aberto": delta_valor,
+                    "sessoes_faturadas": l.total_calculado - l.total_sessoes,
+                })
+        resumo_service.acumular(db, deltas)
+        db.commit()
+    return divergencias
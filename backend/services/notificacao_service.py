@@ -2,16 +2,34 @@
 services/notificacao_service.py — Gestão de Notificações e Gatilhos Automáticos
 
 Responsabilidades:
-  1. agendar_lembrete_sessao()  ← chamado pelo sessao_service ao criar Sessao
+  1. agendar_lembretes_sessoes() ← chamado pelo sessao_service ao criar Sessões (em massa)
   2. agendar_lembrete_tarefa()  ← chamado pelo tarefa_service ao criar TarefaPaciente
   3. agendar_aviso_psicologo()  ← chamado ao confirmar sessão pelo paciente
-  4. buscar_notificacoes_pendentes() ← chamado pelo worker a cada tick
-  5. marcar_enviada() / marcar_falhou() ← chamado pelo worker após tentativa
+     agendar_cobrancas()       ← chamado pelo fatura_service ao marcar faturas atrasadas
+  4. cancelar_lembretes_sessao() ← chamado pelo sessao_service ao cancelar/remarcar
+     cancelar_lembretes_sessoes() ← serie_service, ao remarcar/encerrar uma série
+  5. listar_agendadas_ate()   ← carga da agenda em memória do worker
+     resumo_vencidas()       ← backlog do worker em /metrics
+  6. reivindicar_por_ids()    ← chamado pelo worker com os vencidos da memória
+  7. reivindicar_pendentes()  ← varredura de segurança do worker (claim atômico)
+  8. atualizar_status_lote()  ← chamado pelo worker após cada lote de pushes
+                               (enviada / falhou, um UPDATE por lote)
+
+Claim multi-instância:
+    Postgres: UPDATE … WHERE id IN (SELECT … FOR UPDATE SKIP LOCKED) RETURNING.
+    Cada worker leva um conjunto disjunto de notificações (status 'processando'
+    + lease). Lease expirado = worker morreu; a notificação é retomada.
+    SQLite: sem SKIP LOCKED — um único claimer por processo (lock local); o
+    UPDATE em si já é atômico pelo lock de escrita do arquivo.
 """
 
+import contextlib
+import threading
 from datetime import datetime, timedelta, timezone
+from sqlalchemy import and_, case, cast, delete, func, insert, or_, select, update
 from sqlalchemy.orm import Session
 
+from backend.core import sinal_notificacoes
 from backend.models.notificacao import NotificacaoLembrete, TipoNotificacao, StatusNotificacao
 from backend.models.sessao import Sessao
 from backend.models.tarefa_paciente import TarefaPaciente
@@ -19,15 +37,22 @@ from backend.models.tarefa_paciente import TarefaPaciente
 
 # ─── Gatilhos de Criação ──────────────────────────────────────────────────────
 
+def _disparo_lembrete_sessao(inicio: datetime) -> datetime | None:
+    """24h antes do início, ou None se isso já passou (sessão a menos de 24h)."""
+    if inicio.tzinfo is None:
+        inicio = inicio.replace(tzinfo=timezone.utc)  # SQLite devolve naive no RETURNING
+    disparo = inicio - timedelta(hours=24)
+    return disparo if disparo > datetime.now(timezone.utc) else None
+
+
 def agendar_lembrete_sessao(db: Session, *, sessao: Sessao) -> NotificacaoLembrete | None:
     """
-    Gatilho automático: chamado imediatamente após criar uma Sessão.
-    Agenda um lembrete 24h antes do início.
+    Gatilho automático: agenda um lembrete 24h antes do início de uma Sessão
+    já persistida (precisa de sessao.id para referencia_id).
     Retorna None se a sessão começa em menos de 24h (já seria no passado).
     """
-    disparo = sessao.data_hora_inicio - timedelta(hours=24)
-
-    if disparo <= datetime.now(timezone.utc):
+    disparo = _disparo_lembrete_sessao(sessao.data_hora_inicio)
+    if disparo is None:
         # Sessão já está a menos de 24h — não faz sentido agendar
         return None
 
@@ -39,10 +64,42 @@ def agendar_lembrete_sessao(db: Session, *, sessao: Sessao) -> NotificacaoLembre
         referencia_id=sessao.id,
     )
     db.add(notif)
-    # Não comita aqui — o caller (sessao_service) faz o commit do bloco todo
+    # Não comita aqui — o caller faz o commit do bloco todo
     return notif
 
 
+def agendar_lembretes_sessoes(db: Session, *, sessoes: list[Sessao]) -> list[int]:
+    """
+    Versão em massa de agendar_lembrete_sessao para sessões já inseridas:
+    um único INSERT multi-linha … RETURNING para todos os lembretes.
+    Não comita — o caller (sessao_service) faz o commit do bloco todo.
+    Retorna os ids dos lembretes criados.
+    """
+    linhas = [
+        {
+            "paciente_id": s.paciente_id,
+            "tipo": TipoNotificacao.lembrete_sessao,
+            "data_programada_disparo": disparo,
+            "status": StatusNotificacao.agendada,
+            "referencia_id": s.id,
+        }
+        for s in sessoes
+        if (disparo := _disparo_lembrete_sessao(s.data_hora_inicio)) is not None
+    ]
+    if not linhas:
+        return []
+
+    criados = db.execute(
+        insert(NotificacaoLembrete).returning(
+            NotificacaoLembrete.id, NotificacaoLembrete.data_programada_disparo
+        ),
+        linhas,
+    ).all()
+    # Insert Core não passa pelo unit of work — avisa o worker explicitamente
+    sinal_notificacoes.registrar_disparos(db, [(i, d) for i, d in criados])
+    return [i for i, _ in criados]
+
+
 def agendar_lembrete_tarefa(db: Session, *, tarefa: TarefaPaciente) -> NotificacaoLembrete | None:
     """
     Gatilho automático: chamado imediatamente após criar uma TarefaPaciente.
@@ -79,7 +136,8 @@ def agendar_aviso_psicologo(
     Cria imediatamente (disparo_agora) uma notificação do tipo aviso_psicologo
     para avisar o psicólogo dono da confirmação.
 
-    Como o disparo é imediato, o worker vai processá-la no próximo tick (60 s).
+    O commit acorda o worker (core/sinal_notificacoes), que despacha em
+    milissegundos — sem esperar o próximo tick.
     """
     notif = NotificacaoLembrete(
         # O destinatário aqui é tecnicamente o psicólogo, mas usamos paciente_id
@@ -87,8 +145,7 @@ def agendar_aviso_psicologo(
         # O worker usa referencia_id para buscar quem enviar no momento do disparo.
         paciente_id=sessao.paciente_id,
         tipo=TipoNotificacao.aviso_psicologo,
-        # Disparo imediato: agora – 1 segundo para garantir que <= now() no worker
-        data_programada_disparo=datetime.now(timezone.utc) - timedelta(seconds=1),
+        data_programada_disparo=datetime.now(timezone.utc),
         status=StatusNotificacao.agendada,
         referencia_id=sessao.id,
     )
@@ -98,32 +155,208 @@ def agendar_aviso_psicologo(
     return notif
 
 
+def agendar_cobrancas(db: Session, *, faturas: list[tuple[int, int]]) -> list[int]:
+    """
+    Cobrança imediata para cada (fatura_id, paciente_id) — um único INSERT
+    multi-linha … RETURNING. Não comita: o caller (fatura_service) comita
+    junto com a mudança de estado das faturas, então cada fatura gera uma
+    cobrança só. Retorna os ids das notificações criadas.
+    """
+    if not faturas:
+        return []
+    agora = datetime.now(timezone.utc)
+    criados = db.execute(
+        insert(NotificacaoLembrete).returning(
+            NotificacaoLembrete.id, NotificacaoLembrete.data_programada_disparo
+        ),
+        [
+            {
+                "paciente_id": paciente_id,
+                "tipo": TipoNotificacao.cobranca,
+                "data_programada_disparo": agora,
+                "status": StatusNotificacao.agendada,
+                "referencia_id": fatura_id,
+            }
+            for fatura_id, paciente_id in faturas
+        ],
+    ).all()
+    sinal_notificacoes.registrar_disparos(db, [(i, d) for i, d in criados])
+    return [i for i, _ in criados]
+
+
+def cancelar_lembretes_sessao(db: Session, *, sessao_id: int) -> list[int]:
+    """
+    Remove os lembretes ainda 'agendada' de uma sessão que não vai mais
+    acontecer naquele horário. Não comita — o caller (sessao_service) comita.
+    O commit tira os ids da agenda em memória do worker (core/sinal_notificacoes).
+    """
+    return cancelar_lembretes_sessoes(db, sessao_ids=[sessao_id])
+
+
+def cancelar_lembretes_sessoes(db: Session, *, sessao_ids: list[int]) -> list[int]:
+    """cancelar_lembretes_sessao() de várias sessões num único DELETE … IN. Não comita."""
+    if not sessao_ids:
+        return []
+    ids = list(db.scalars(
+        delete(NotificacaoLembrete)
+        .where(
+            NotificacaoLembrete.tipo == TipoNotificacao.lembrete_sessao,
+            NotificacaoLembrete.referencia_id.in_(sessao_ids),
+            NotificacaoLembrete.status == StatusNotificacao.agendada,
+        )
+        .returning(NotificacaoLembrete.id)
+        .execution_options(synchronize_session=False)
+    ))
+    sinal_notificacoes.registrar_remocoes(db, ids)
+    return ids
+
+
 # ─── Funções do Worker ────────────────────────────────────────────────────────
 
-def buscar_pendentes(db: Session, limite: int = 50) -> list[NotificacaoLembrete]:
+def listar_agendadas_ate(db: Session, *, ate: datetime) -> list[tuple[int, datetime]]:
     """
-    Retorna até `limite` notificações cujo horário de disparo já passou
-    e ainda estão com status 'agendada'.
-    O limite evita processar um backlog enorme de uma vez.
+    (id, disparo) de todas as notificações 'agendada' com disparo até `ate`.
+    Range scan no índice (status, data_programada_disparo); só duas colunas.
     """
-    agora = datetime.now(timezone.utc)
-    return (
-        db.query(NotificacaoLembrete)
-        .filter(
-            NotificacaoLembrete.data_programada_disparo <= agora,
+    stmt = (
+        select(NotificacaoLembrete.id, NotificacaoLembrete.data_programada_disparo)
+        .where(
             NotificacaoLembrete.status == StatusNotificacao.agendada,
+            NotificacaoLembrete.data_programada_disparo <= ate,
         )
+        .execution_options(yield_per=10_000)
+    )
+    return [(notif_id, disparo) for notif_id, disparo in db.execute(stmt)]
+
+
+def resumo_vencidas(db: Session, *, agora: datetime) -> tuple[int, datetime | None]:
+    """
+    (quantas, disparo mais antigo) das notificações vencidas e ainda não
+    enviadas — 'agendada' ou 'processando' com disparo <= agora. Backlog do
+    worker em /metrics; mesmo índice (status, data_programada_disparo).
+    """
+    quantas, mais_antiga = db.execute(
+        select(func.count(), func.min(NotificacaoLembrete.data_programada_disparo))
+        .where(
+            NotificacaoLembrete.status.in_(
+                [StatusNotificacao.agendada, StatusNotificacao.processando]
+            ),
+            NotificacaoLembrete.data_programada_disparo <= agora,
+        )
+    ).one()
+    if mais_antiga is not None and mais_antiga.tzinfo is None:
+        mais_antiga = mais_antiga.replace(tzinfo=timezone.utc)  # SQLite devolve naive
+    return quantas, mais_antiga
+
+
+# Modo single-claimer do SQLite (um claim por vez neste processo)
+_trava_claim_sqlite = threading.Lock()
+
+
+def reivindicar_pendentes(
+    db: Session, *, limite: int = 50, lease_segundos: int = 300
+) -> list[NotificacaoLembrete]:
+    """
+    Reivindica atomicamente até `limite` notificações vencidas: status 'agendada'
+    com disparo no passado, ou 'processando' com lease expirado.
+    Elas passam a 'processando' com lease de `lease_segundos` e são devolvidas
+    desanexadas da sessão (atributos já carregados, sem refresh após o commit).
+    O limite evita processar um backlog enorme de uma vez.
+    """
+    agora = datetime.now(timezone.utc)
+    candidatos = (
+        select(NotificacaoLembrete.id)
+        .where(or_(
+            and_(
+                NotificacaoLembrete.status == StatusNotificacao.agendada,
+                NotificacaoLembrete.data_programada_disparo <= agora,
+            ),
+            and_(
+                NotificacaoLembrete.status == StatusNotificacao.processando,
+                NotificacaoLembrete.lease_expira_em < agora,
+            ),
+        ))
         .order_by(NotificacaoLembrete.data_programada_disparo)
         .limit(limite)
-        .all()
     )
+    return _reivindicar(db, candidatos, agora=agora, lease_segundos=lease_segundos)
 
 
-def marcar_enviada(db: Session, notif: NotificacaoLembrete) -> None:
-    notif.status = StatusNotificacao.enviada
-    db.commit()
+def reivindicar_por_ids(
+    db: Session, *, ids: list[int], lease_segundos: int = 300
+) -> list[NotificacaoLembrete]:
+    """
+    Claim dos ids que a agenda em memória do worker deu como vencidos.
+    Só leva os que ainda estão 'agendada' (outra instância pode ter levado,
+    ou a sessão foi cancelada) — lookup por PK, sem varrer a tabela.
+    """
+    if not ids:
+        return []
+    ainda_agendada = NotificacaoLembrete.status == StatusNotificacao.agendada
+    if db.get_bind().dialect.name == "sqlite":
+        # Sem ANALYZE o SQLite estima status = X como seletivo e troca o lookup
+        # por PK pelo índice (status, disparo) — quase toda linha é 'agendada'
+        ainda_agendada = func.likely(ainda_agendada)
+    candidatos = select(NotificacaoLembrete.id).where(
+        NotificacaoLembrete.id.in_(ids), ainda_agendada
+    )
+    return _reivindicar(
+        db, candidatos, agora=datetime.now(timezone.utc), lease_segundos=lease_segundos
+    )
+
+
+def _reivindicar(
+    db: Session, candidatos, *, agora: datetime, lease_segundos: int
+) -> list[NotificacaoLembrete]:
+    """UPDATE … WHERE id IN (candidatos) RETURNING — passa a 'processando' com lease."""
+    if db.get_bind().dialect.name == "postgresql":
+        candidatos = candidatos.with_for_update(skip_locked=True)
+        trava = contextlib.nullcontext()
+    else:
+        trava = _trava_claim_sqlite
+
+    stmt = (
+        update(NotificacaoLembrete)
+        .where(NotificacaoLembrete.id.in_(candidatos.scalar_subquery()))
+        .values(
+            status=StatusNotificacao.processando,
+            lease_expira_em=agora + timedelta(seconds=lease_segundos),
+        )
+        .returning(NotificacaoLembrete)
+        .execution_options(synchronize_session=False)
+    )
+
+    with trava:
+        notifs = list(db.scalars(stmt))
+        # Desanexa antes do commit: o expire_on_commit forçaria 1 SELECT por objeto
+        for notif in notifs:
+            db.expunge(notif)
+        db.commit()
 
+    return sorted(notifs, key=lambda n: n.data_programada_disparo)
 
-def marcar_falhou(db: Session, notif: NotificacaoLembrete) -> None:
-    notif.status = StatusNotificacao.falhou
+
+def atualizar_status_lote(
+    db: Session, *, enviadas: list[int], falhas: list[int]
+) -> None:
+    """
+    Grava o resultado de um lote inteiro num único UPDATE (CASE por id)
+    e num único commit — em vez de um commit por notificação.
+    """
+    ids = [*enviadas, *falhas]
+    if not ids:
+        return
+    db.execute(
+        update(NotificacaoLembrete)
+        .where(NotificacaoLembrete.id.in_(ids))
+        .values(status=cast(
+            case(
+                (NotificacaoLembrete.id.in_(falhas), StatusNotificacao.falhou.name),
+                else_=StatusNotificacao.enviada.name,
+            ),
+            NotificacaoLembrete.status.type,  # CASE de literais vira text no Postgres
+        ), lease_expira_em=None)
+        .execution_options(synchronize_session=False)
+    )
     db.commit()
+
@@ -1,8 +1,11 @@
 from typing import Any
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from backend.models.paciente import Paciente
 from backend.schemas.paciente import PacienteCreate, PacienteUpdate
+from backend.services import resumo_service
 
 
 def criar_paciente(
@@ -41,17 +44,17 @@ def criar_paciente(
     return paciente
 
 
-def listar_pacientes(
-    db: Session, *, psicologo_id: int, skip: int = 0, limit: int = 100
+async def listar_pacientes(
+    db: AsyncSession, *, psicologo_id: int, skip: int = 0, limit: int = 100
 ) -> list[Paciente]:
-    """Retorna todos os pacientes do psicólogo com paginação."""
-    return (
-        db.query(Paciente)
-        .filter(Paciente.psicologo_id == psicologo_id)
+    """Retorna todos os pacientes do psicólogo com paginação (AsyncSession)."""
+    resultado = await db.scalars(
+        select(Paciente)
+        .where(Paciente.psicologo_id == psicologo_id)
         .offset(skip)
         .limit(limit)
-        .all()
     )
+    return list(resultado)
 
 
 def buscar_paciente(
@@ -91,6 +94,11 @@ def atualizar_paciente(
 
 
 def deletar_paciente(db: Session, *, paciente: Paciente) -> None:
-    """Remove o paciente. Chamada apenas após verificar que pertence ao psicólogo."""
+    """
+    Remove o paciente. Chamada apenas após verificar que pertence ao psicólogo.
+    Faturas e sessões saem em cascata, então o rollup do psicólogo é refeito.
+    """
+    psicologo_id = paciente.psicologo_id
     db.delete(paciente)
     db.commit()
+    resumo_service.reconstruir(db, psicologo_id=psicologo_id)
@@ -1,7 +1,10 @@
+from typing import Any
 from sqlalchemy.orm import Session
 
 from backend.models.psicologo import Psicologo
+from backend.core.cache_perfis import perfis
 from backend.core.google_auth import GoogleUserInfo
+from backend.schemas.psicologo import PsicologoResponse
 
 
 def upsert_psicologo(db: Session, *, user_info: GoogleUserInfo) -> Psicologo:
@@ -37,9 +40,55 @@ def upsert_psicologo(db: Session, *, user_info: GoogleUserInfo) -> Psicologo:
         db.add(psicologo)
 
     db.commit()
+    perfis.invalidar(psicologo.id)
     db.refresh(psicologo)
     return psicologo
 
 
 def buscar_por_id(db: Session, *, psicologo_id: int) -> Psicologo | None:
     return db.query(Psicologo).filter(Psicologo.id == psicologo_id).first()
+
+
+# ─── Perfil (cache) ───────────────────────────────────────────────────────────
+
+def _carregar_perfis(db: Session, psicologo_ids: set[int]) -> dict[int, dict[str, Any]]:
+    return {
+        p.id: PsicologoResponse.model_validate(p).model_dump(mode="json")
+        for p in db.query(Psicologo).filter(Psicologo.id.in_(psicologo_ids))
+    }
+
+
+def obter_perfis(db: Session, *, psicologo_ids: set[int]) -> dict[int, PsicologoResponse]:
+    """Perfis por id, do cache (core/cache_perfis) — ausentes numa query IN."""
+    encontrados = perfis.obter_muitos(psicologo_ids, lambda ids: _carregar_perfis(db, ids))
+    return {i: PsicologoResponse.model_validate(v) for i, v in encontrados.items()}
+
+
+def obter_perfil(db: Session, *, psicologo_id: int) -> PsicologoResponse | None:
+    return obter_perfis(db, psicologo_ids={psicologo_id}).get(psicologo_id)
+
+
+def atualizar_perfil(
+    db: Session,
+    *,
+    psicologo_id: int,
+    campos: dict[str, Any],
+    concluir_onboarding: bool = False,
+) -> Psicologo | None:
+    """
+    Aplica `campos` ao psicólogo (PATCH /auth/me e /auth/onboarding) e
+    invalida o perfil em cache após o commit. None se não existir.
+    """
+    psicologo = buscar_por_id(db, psicologo_id=psicologo_id)
+    if not psicologo:
+        return None
+
+    for field, value in campos.items():
+        setattr(psicologo, field, value)
+    if concluir_onboarding:
+        psicologo.onboarding_concluido = True
+
+    db.commit()
+    perfis.invalidar(psicologo_id)
+    db.refresh(psicologo)
+    return psicologo
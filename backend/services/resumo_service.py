@@ -0,0 +1,173 @@
+"""
+services/resumo_service.py — Rollup Mensal de Faturamento
+
+Responsabilidades:
+  1. acumular()    ← fatura_service / sessao_service, na mesma transação da mudança
+  2. listar_ano()  ← GET /faturas/resumo (12 linhas, sem tocar em faturas/sessões)
+  3. reconstruir() ← scripts/reconstruir_resumo_faturamento.py e exclusão de paciente
+
+Manutenção por delta:
+    Cada mudança soma a diferença na linha (psicologo_id, ano, mes) com um
+    upsert — INSERT … ON CONFLICT DO UPDATE SET col = col + excluded.col —
+    então leituras e escritas concorrentes nunca fazem read-modify-write.
+
+    | Evento                          | Delta                                        |
+    |---------------------------------|----------------------------------------------|
+    | fatura gerada (avulsa ou lote)  | faturado, em_aberto, faturas, sess. faturadas |
+    | fatura paga                     | recebido += v, em_aberto -= v                |
+    | check-in em sessão faturada     | faturado/em_aberto += delta, sess. faturadas |
+    | sessão entra/sai de cobrável    | sessoes_cobraveis ± 1 (mês da sessão)        |
+    | pendente → atrasada             | nada (as duas contam como em aberto)         |
+"""
+
+from collections.abc import Iterable
+from datetime import datetime, timezone
+from sqlalchemy import case, delete, extract, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from backend.models.fatura import Fatura, EstadoFatura
+from backend.models.paciente import Paciente
+from backend.models.resumo_faturamento import ResumoFaturamentoMensal
+from backend.models.sessao import Sessao, EstadoSessao
+from backend.schemas.fatura import ResumoFaturamentoResponse, ResumoMensal
+
+_CHAVE = ("psicologo_id", "ano", "mes")
+_METRICAS = (
+    "valor_faturado", "valor_recebido", "valor_em_aberto",
+    "total_faturas", "sessoes_faturadas", "sessoes_cobraveis",
+)
+_ESTADOS_COBRAVEIS = tuple(e for e in EstadoSessao if e.gera_cobranca)
+_FATURAS_EM_ABERTO = (EstadoFatura.pendente, EstadoFatura.atrasada)
+
+
+def mes_utc(dt: datetime) -> tuple[int, int]:
+    """(ano, mes) de um datetime em UTC — SQLite devolve naive (já em UTC)."""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc)
+    return dt.year, dt.month
+
+
+# ─── Manutenção Incremental ───────────────────────────────────────────────────
+
+def acumular(db: Session, deltas: Iterable[dict]) -> None:
+    """
+    Soma os deltas no rollup. Cada dict traz psicologo_id, ano, mes e
+    qualquer subconjunto de _METRICAS. Deltas da mesma chave são somados
+    antes (o ON CONFLICT não pode tocar a mesma linha duas vezes num
+    statement). Não comita — o caller comita junto com a mudança.
+    """
+    por_chave: dict[tuple, dict] = {}
+    for delta in deltas:
+        chave = tuple(delta[c] for c in _CHAVE)
+        linha = por_chave.setdefault(chave, {m: 0 for m in _METRICAS})
+        for metrica in _METRICAS:
+            linha[metrica] += delta.get(metrica) or 0
+
+    linhas = [
+        dict(zip(_CHAVE, chave), **valores)
+        for chave, valores in por_chave.items()
+        if any(valores.values())
+    ]
+    if not linhas:
+        return
+
+    dialeto = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    stmt = dialeto.insert(ResumoFaturamentoMensal).values(linhas)
+    tabela = ResumoFaturamentoMensal.__table__
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(_CHAVE),
+        set_={
+            **{m: tabela.c[m] + stmt.excluded[m] for m in _METRICAS},
+            "data_atualizacao": func.now(),
+        },
+    )
+    db.execute(stmt)
+
+
+# ─── Leitura ──────────────────────────────────────────────────────────────────
+
+def listar_ano(db: Session, *, psicologo_id: int, ano: int) -> ResumoFaturamentoResponse:
+    """Os 12 meses do ano (meses sem movimento vêm zerados) + totais."""
+    linhas = {
+        r.mes: r
+        for r in db.scalars(
+            select(ResumoFaturamentoMensal).where(
+                ResumoFaturamentoMensal.psicologo_id == psicologo_id,
+                ResumoFaturamentoMensal.ano == ano,
+            )
+        )
+    }
+    meses = [
+        ResumoMensal.model_validate(linhas[mes]) if mes in linhas
+        else ResumoMensal(ano=ano, mes=mes)
+        for mes in range(1, 13)
+    ]
+    totais = {m: sum((getattr(r, m) for r in meses), 0) for m in _METRICAS}
+    return ResumoFaturamentoResponse(psicologo_id=psicologo_id, ano=ano, meses=meses, **totais)
+
+
+# ─── Reconstrução ─────────────────────────────────────────────────────────────
+
+def _ano_mes_utc(db: Session, coluna):
+    if db.get_bind().dialect.name == "postgresql":
+        coluna = func.timezone("UTC", coluna)
+    return extract("year", coluna), extract("month", coluna)
+
+
+def reconstruir(db: Session, *, psicologo_id: int | None = None) -> int:
+    """
+    Recalcula o rollup do zero a partir de faturas e sessões (de um psicólogo
+    ou de todos): dois GROUP BY no banco e um INSERT em massa. Comita.
+    Retorna quantas linhas (meses) foram gravadas.
+    """
+    filtro_psicologo = [Paciente.psicologo_id == psicologo_id] if psicologo_id is not None else []
+
+    def _soma_se(condicao, valor):
+        return func.coalesce(func.sum(case((condicao, valor), else_=0)), 0)
+
+    faturas = db.execute(
+        select(
+            Paciente.psicologo_id,
+            Fatura.ano_referencia,
+            Fatura.mes_referencia,
+            _soma_se(Fatura.estado != EstadoFatura.cancelada, Fatura.valor_total),
+            _soma_se(Fatura.estado == EstadoFatura.paga, Fatura.valor_total),
+            _soma_se(Fatura.estado.in_(_FATURAS_EM_ABERTO), Fatura.valor_total),
+            _soma_se(Fatura.estado != EstadoFatura.cancelada, 1),
+            _soma_se(Fatura.estado != EstadoFatura.cancelada, Fatura.total_sessoes),
+        )
+        .join(Paciente, Fatura.paciente_id == Paciente.id)
+        .where(*filtro_psicologo)
+        .group_by(Paciente.psicologo_id, Fatura.ano_referencia, Fatura.mes_referencia)
+    ).all()
+
+    ano, mes = _ano_mes_utc(db, Sessao.data_hora_inicio)
+    sessoes = db.execute(
+        select(Paciente.psicologo_id, ano, mes, func.count(Sessao.id))
+        .join(Paciente, Sessao.paciente_id == Paciente.id)
+        .where(Sessao.estado.in_(_ESTADOS_COBRAVEIS), *filtro_psicologo)
+        .group_by(Paciente.psicologo_id, ano, mes)
+    ).all()
+
+    linhas: dict[tuple, dict] = {}
+    for psi, a, m, faturado, recebido, em_aberto, n_faturas, n_sessoes in faturas:
+        linhas[(psi, a, m)] = {
+            "valor_faturado": faturado, "valor_recebido": recebido,
+            "valor_em_aberto": em_aberto, "total_faturas": n_faturas,
+            "sessoes_faturadas": n_sessoes,
+        }
+    for psi, a, m, n in sessoes:
+        linhas.setdefault((psi, int(a), int(m)), {})["sessoes_cobraveis"] = n
+
+    remover = delete(ResumoFaturamentoMensal)
+    if psicologo_id is not None:
+        remover = remover.where(ResumoFaturamentoMensal.psicologo_id == psicologo_id)
+    db.execute(remover)
+    if linhas:
+        db.execute(
+            insert(ResumoFaturamentoMensal),
+            [dict(zip(_CHAVE, chave), **valores) for chave, valores in linhas.items()],
+        )
+    db.commit()
+    return len(linhas)
@@ -0,0 +1,319 @@
+"""
+services/serie_service.py — Séries de Sessões Recorrentes (RRULE)
+
+Responsabilidades:
+  1. criar_serie() / atualizar_serie() / encerrar_serie() ← routes/series
+  2. expandir_ocorrencias()  ← agenda_service e timeline_service (sessões previstas)
+  3. materializar_ocorrencia() ← POST /series/{id}/ocorrencias (antes de check-in/cancelamento)
+  4. materializar_proximas() ← worker, para o lembrete 24h e o link de confirmação
+
+Modelo:
+    Ocorrência = horário calculado pela RRULE da série. Ela só vira linha em
+    `sessoes` quando é tocada; dali em diante a linha é a verdade (pode ser
+    remarcada, faturada...) e a ocorrência some da expansão virtual —
+    ocorrencia_serie guarda o horário ORIGINAL para casar as duas.
+
+    Remarcar a série é um UPDATE na série, que grava vigente_desde = agora:
+    a regra nova só é expandida dali em diante. Ocorrências passadas nunca
+    materializadas não renascem no horário novo — e as da regra antiga somem
+    da expansão (o histórico que importa já virou linha em `sessoes`).
+    As únicas linhas afetadas são as ocorrências futuras que o worker
+    materializou e ninguém tocou ainda (ainda 'agendada', no horário
+    original, sem fatura): elas são descartadas junto com o lembrete
+    (um DELETE para cada tabela) e renascem no novo horário.
+"""
+
+import heapq
+import logging
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from sqlalchemy import delete, insert, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from backend.core import rrule
+from backend.models.paciente import Paciente
+from backend.models.serie_sessao import SerieSessao
+from backend.models.sessao import Sessao, EstadoSessao
+from backend.schemas.serie import SerieSessaoCreate, SerieSessaoUpdate, SessaoPrevistaResponse
+from backend.services import notificacao_service
+
+logger = logging.getLogger(__name__)
+
+
+def _utc(dt: datetime) -> datetime:
+    # SQLite devolve naive; tudo aqui é comparado em UTC aware
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt
+
+
+@lru_cache(maxsize=1024)
+def _regra(texto: str) -> rrule.RegraRecorrencia:
+    return rrule.parse(texto)
+
+
+# ─── CRUD da Série ────────────────────────────────────────────────────────────
+
+def criar_serie(
+    db: Session, *, psicologo_id: int, dados: SerieSessaoCreate
+) -> SerieSessao:
+    """Cria a série (uma linha). Nenhuma ocorrência é gravada aqui."""
+    paciente = (
+        db.query(Paciente)
+        .filter(Paciente.id == dados.paciente_id, Paciente.psicologo_id == psicologo_id)
+        .first()
+    )
+    if not paciente:
+        raise ValueError(f"Paciente {dados.paciente_id} não encontrado ou não pertence ao psicólogo.")
+
+    serie = SerieSessao(
+        paciente_id=dados.paciente_id,
+        regra=dados.regra,
+        data_hora_inicio=dados.data_hora_inicio,
+        duracao_minutos=int((dados.data_hora_fim - dados.data_hora_inicio).total_seconds() // 60),
+        valor_cobrado=float(dados.valor_cobrado) if dados.valor_cobrado is not None else None,
+    )
+    db.add(serie)
+    db.commit()
+    db.refresh(serie)
+    return serie
+
+
+def buscar_serie(db: Session, *, psicologo_id: int, serie_id: int) -> SerieSessao | None:
+    """Busca série garantindo propriedade via JOIN com pacientes."""
+    return (
+        db.query(SerieSessao)
+        .join(Paciente, SerieSessao.paciente_id == Paciente.id)
+        .filter(SerieSessao.id == serie_id, Paciente.psicologo_id == psicologo_id)
+        .first()
+    )
+
+
+def listar_series_paciente(
+    db: Session, *, psicologo_id: int, paciente_id: int
+) -> list[SerieSessao]:
+    return (
+        db.query(SerieSessao)
+        .join(Paciente, SerieSessao.paciente_id == Paciente.id)
+        .filter(SerieSessao.paciente_id == paciente_id, Paciente.psicologo_id == psicologo_id)
+        .order_by(SerieSessao.data_hora_inicio)
+        .all()
+    )
+
+
+def atualizar_serie(
+    db: Session, *, serie: SerieSessao, dados: SerieSessaoUpdate
+) -> SerieSessao:
+    """Remarca a série inteira: um UPDATE na série (ver docstring do módulo)."""
+    agora = datetime.now(timezone.utc)
+    campos = dados.model_dump(exclude_unset=True)
+    if campos.keys() & {"regra", "data_hora_inicio"}:
+        campos["vigente_desde"] = agora
+
+    for campo, valor in campos.items():
+        if campo == "valor_cobrado" and valor is not None:
+            valor = float(valor)
+        setattr(serie, campo, valor)
+
+    _descartar_materializadas_intocadas(db, serie=serie, a_partir_de=agora)
+    db.commit()
+    db.refresh(serie)
+    return serie
+
+
+def encerrar_serie(db: Session, *, serie: SerieSessao) -> None:
+    """Encerra a série a partir de agora. O histórico materializado fica intacto."""
+    agora = datetime.now(timezone.utc)
+    serie.encerrada_em = agora
+    _descartar_materializadas_intocadas(db, serie=serie, a_partir_de=agora)
+    db.commit()
+
+
+def _descartar_materializadas_intocadas(
+    db: Session, *, serie: SerieSessao, a_partir_de: datetime
+) -> None:
+    ids = list(db.scalars(
+        delete(Sessao)
+        .where(
+            Sessao.serie_id == serie.id,
+            Sessao.ocorrencia_serie >= a_partir_de,
+            Sessao.data_hora_inicio == Sessao.ocorrencia_serie,
+            Sessao.estado == EstadoSessao.agendada,
+            Sessao.fatura_id.is_(None),
+        )
+        .returning(Sessao.id)
+        .execution_options(synchronize_session=False)
+    ))
+    notificacao_service.cancelar_lembretes_sessoes(db, sessao_ids=ids)
+
+
+# ─── Expansão Virtual ─────────────────────────────────────────────────────────
+
+def filtro_janela(inicio: datetime, fim: datetime) -> list:
+    """Condições SQL das séries que podem ter ocorrências em [inicio, fim]."""
+    return [
+        SerieSessao.data_hora_inicio <= fim,
+        or_(SerieSessao.vigente_desde.is_(None), SerieSessao.vigente_desde <= fim),
+        or_(SerieSessao.encerrada_em.is_(None), SerieSessao.encerrada_em > inicio),
+    ]
+
+
+def _select_materializadas(serie_ids: list[int], inicio: datetime, fim: datetime):
+    return select(Sessao.serie_id, Sessao.ocorrencia_serie).where(
+        Sessao.serie_id.in_(serie_ids),
+        Sessao.ocorrencia_serie >= inicio,
+        Sessao.ocorrencia_serie <= fim,
+    )
+
+
+def ocorrencias_materializadas(
+    db: Session, *, serie_ids: Iterable[int], inicio: datetime, fim: datetime
+) -> set[tuple[int, datetime]]:
+    """(serie_id, ocorrencia) já gravadas em `sessoes` na janela."""
+    serie_ids = list(serie_ids)
+    if not serie_ids:
+        return set()
+    linhas = db.execute(_select_materializadas(serie_ids, inicio, fim))
+    return {(serie_id, _utc(ocorrencia)) for serie_id, ocorrencia in linhas}
+
+
+async def ocorrencias_materializadas_async(
+    db: AsyncSession, *, serie_ids: Iterable[int], inicio: datetime, fim: datetime
+) -> set[tuple[int, datetime]]:
+    """Versão AsyncSession de ocorrencias_materializadas (agenda/timeline)."""
+    serie_ids = list(serie_ids)
+    if not serie_ids:
+        return set()
+    linhas = await db.execute(_select_materializadas(serie_ids, inicio, fim))
+    return {(serie_id, _utc(ocorrencia)) for serie_id, ocorrencia in linhas}
+
+
+def _ocorrencias_serie(
+    serie: SerieSessao, inicio: datetime, fim: datetime
+) -> Iterator[datetime]:
+    if serie.vigente_desde is not None:
+        inicio = max(inicio, _utc(serie.vigente_desde))
+    encerrada_em = _utc(serie.encerrada_em) if serie.encerrada_em else None
+    for ocorrencia in rrule.ocorrencias(_regra(serie.regra), serie.data_hora_inicio, inicio, fim):
+        if encerrada_em is not None and ocorrencia >= encerrada_em:
+            return
+        yield ocorrencia
+
+
+def expandir_ocorrencias(
+    series: Iterable[SerieSessao],
+    *,
+    inicio: datetime,
+    fim: datetime,
+    materializadas: set[tuple[int, datetime]],
+) -> Iterator[tuple[datetime, SerieSessao]]:
+    """
+    Ocorrências virtuais (ainda não gravadas) de todas as séries em [inicio, fim],
+    em ordem (horário, serie_id). Preguiçoso: k-way merge das expansões.
+    """
+    def _rotuladas(serie: SerieSessao) -> Iterator[tuple[datetime, int, SerieSessao]]:
+        for ocorrencia in _ocorrencias_serie(serie, inicio, fim):
+            yield ocorrencia, serie.id, serie
+
+    por_serie = [_rotuladas(serie) for serie in series]
+    for ocorrencia, serie_id, serie in heapq.merge(*por_serie, key=lambda t: (t[0], t[1])):
+        if (serie_id, ocorrencia) not in materializadas:
+            yield ocorrencia, serie
+
+
+def sessao_prevista(serie: SerieSessao, ocorrencia: datetime) -> SessaoPrevistaResponse:
+    return SessaoPrevistaResponse(
+        serie_id=serie.id,
+        paciente_id=serie.paciente_id,
+        ocorrencia=ocorrencia,
+        data_hora_inicio=ocorrencia,
+        data_hora_fim=ocorrencia + timedelta(minutes=serie.duracao_minutos),
+        valor_cobrado=serie.valor_cobrado,
+    )
+
+
+# ─── Materialização ───────────────────────────────────────────────────────────
+
+def _linha_sessao(serie: SerieSessao, ocorrencia: datetime, valor_paciente) -> dict:
+    valor = serie.valor_cobrado if serie.valor_cobrado is not None else valor_paciente
+    return {
+        "paciente_id": serie.paciente_id,
+        "serie_id": serie.id,
+        "ocorrencia_serie": ocorrencia,
+        "data_hora_inicio": ocorrencia,
+        "data_hora_fim": ocorrencia + timedelta(minutes=serie.duracao_minutos),
+        "estado": EstadoSessao.agendada,
+        "valor_cobrado": float(valor) if valor is not None else None,
+    }
+
+
+def materializar_ocorrencia(
+    db: Session, *, serie: SerieSessao, ocorrencia: datetime
+) -> Sessao:
+    """
+    Grava a ocorrência como Sessao (idempotente: devolve a existente) para que
+    possa receber check-in, cancelamento ou entrar numa fatura.
+    Lança ValueError se o horário não é uma ocorrência da série.
+    """
+    ocorrencia = _utc(ocorrencia)
+    if next(_ocorrencias_serie(serie, ocorrencia, ocorrencia), None) != ocorrencia:
+        raise ValueError("Horário informado não é uma ocorrência desta série.")
+
+    filtro = (Sessao.serie_id == serie.id, Sessao.ocorrencia_serie == ocorrencia)
+    existente = db.scalars(select(Sessao).where(*filtro)).first()
+    if existente:
+        return existente
+
+    valor_paciente = db.scalar(select(Paciente.valor_sessao).where(Paciente.id == serie.paciente_id))
+    sessao = Sessao(**_linha_sessao(serie, ocorrencia, valor_paciente))
+    db.add(sessao)
+    try:
+        db.flush()
+        notificacao_service.agendar_lembrete_sessao(db, sessao=sessao)
+        db.commit()
+    except IntegrityError:
+        # Materializada em paralelo (outro request ou o worker) — usa a existente
+        db.rollback()
+        return db.scalars(select(Sessao).where(*filtro)).one()
+    db.refresh(sessao)
+    return sessao
+
+
+def materializar_proximas(db: Session, *, ate: datetime) -> int:
+    """
+    Materializa em massa as ocorrências de agora até `ate`, para que ganhem
+    o lembrete 24h e o token do link de confirmação. Dois INSERT em massa
+    (sessões + lembretes), como em sessao_service.criar_sessoes.
+    Retorna quantas sessões foram criadas.
+    """
+    agora = datetime.now(timezone.utc)
+    series = list(db.scalars(select(SerieSessao).where(*filtro_janela(agora, ate))))
+    if not series:
+        return 0
+
+    materializadas = ocorrencias_materializadas(
+        db, serie_ids=[s.id for s in series], inicio=agora, fim=ate
+    )
+    pendentes = list(expandir_ocorrencias(series, inicio=agora, fim=ate, materializadas=materializadas))
+    if not pendentes:
+        return 0
+
+    valores = dict(db.execute(
+        select(Paciente.id, Paciente.valor_sessao)
+        .where(Paciente.id.in_({s.paciente_id for _, s in pendentes}))
+    ).all())
+    linhas = [_linha_sessao(s, ocorrencia, valores.get(s.paciente_id)) for ocorrencia, s in pendentes]
+
+    try:
+        sessoes = list(db.scalars(insert(Sessao).returning(Sessao), linhas))
+        notificacao_service.agendar_lembretes_sessoes(db, sessoes=sessoes)
+        for s in sessoes:
+            db.expunge(s)
+        db.commit()
+    except IntegrityError:
+        # Outra instância materializou a mesma janela — a próxima execução completa
+        db.rollback()
+        logger.info("Séries: materialização concorrente detectada; tentando de novo no próximo ciclo.")
+        return 0
+    return len(sessoes)
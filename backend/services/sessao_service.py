@@ -1,12 +1,16 @@
 from datetime import timedelta
 from decimal import Decimal
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session
 
 from backend.models.sessao import Sessao, EstadoSessao
 from backend.models.paciente import Paciente
-from backend.models.fatura import Fatura
+from backend.models.fatura import Fatura, EstadoFatura
 from backend.schemas.sessao import SessaoCreate, SessaoEstadoUpdate
-from backend.services import notificacao_service
+from backend.services import notificacao_service, resumo_service
+
+# Estados em que a sessão não acontece mais no horário marcado → sem lembrete
+_ESTADOS_SEM_LEMBRETE = (EstadoSessao.cancelada_paciente, EstadoSessao.remarcada)
 
 
 def criar_sessoes(
@@ -21,6 +25,11 @@ def criar_sessoes(
     intervalo_dias definido a partir de data_hora_inicio.
 
     O valor_cobrado herda paciente.valor_sessao se não for informado.
+
+    Caminho em massa: as sessões entram num único INSERT multi-linha …
+    RETURNING (ids, token_confirmacao e data_criacao voltam na mesma ida ao
+    banco) e os lembretes 24h num segundo INSERT, já com o sessao.id real.
+    Nenhum refresh por linha depois do commit.
     """
     # Verifica propriedade: paciente deve pertencer ao psicólogo logado
     paciente: Paciente | None = (
@@ -45,25 +54,28 @@ def criar_sessoes(
         for i in range(1, dados.recorrencia.total_sessoes):
             datas_inicio.append(dados.data_hora_inicio + intervalo * i)
 
-    sessoes = []
-    for dt_inicio in datas_inicio:
-        sessao = Sessao(
-            paciente_id=dados.paciente_id,
-            data_hora_inicio=dt_inicio,
-            data_hora_fim=dt_inicio + duracao,
-            estado=EstadoSessao.agendada,
-            valor_cobrado=float(valor) if valor is not None else None,
-        )
-        db.add(sessao)
-        sessoes.append(sessao)
+    linhas = [
+        {
+            "paciente_id": dados.paciente_id,
+            "data_hora_inicio": dt_inicio,
+            "data_hora_fim": dt_inicio + duracao,
+            "estado": EstadoSessao.agendada,
+            "valor_cobrado": float(valor) if valor is not None else None,
+        }
+        for dt_inicio in datas_inicio
+    ]
+    sessoes = sorted(
+        db.scalars(insert(Sessao).returning(Sessao), linhas),
+        key=lambda s: s.data_hora_inicio,
+    )
 
     # ─── Gatilho automático: agenda lembrete 24h antes de cada sessão ────────
-    for s in sessoes:
-        notificacao_service.agendar_lembrete_sessao(db, sessao=s)
+    notificacao_service.agendar_lembretes_sessoes(db, sessoes=sessoes)
 
-    db.commit()
+    # Desanexa antes do commit: o expire_on_commit forçaria 1 refresh por sessão
     for s in sessoes:
-        db.refresh(s)
+        db.expunge(s)
+    db.commit()
     return sessoes
 
 
@@ -85,6 +97,7 @@ def buscar_sessao(
 def atualizar_estado(
     db: Session,
     *,
+    psicologo_id: int,
     sessao: Sessao,
     dados: SessaoEstadoUpdate,
 ) -> tuple[Sessao, bool]:
@@ -93,19 +106,33 @@ def atualizar_estado(
 
     Transiciona o estado da sessão e aplica a lógica financeira:
 
-    1. Sessão JÁ FATURADA:
-       - Se o novo estado ainda gera cobrança → recalcula o valor na fatura.
+    1. Sessão JÁ FATURADA (fatura ainda aberta):
+       - Se o novo estado ainda gera cobrança → ajusta o valor na fatura.
        - Se o novo estado NÃO gera cobrança (ex: cancelada) → remove da fatura,
-         recalcula o valor_total da Fatura e libera a sessão (fatura_id = None).
+         desconta o valor do valor_total e libera a sessão (fatura_id = None).
+       O ajuste é um delta atômico (valor_total = valor_total + :delta), sem
+       recarregar as outras sessões nem read-modify-write na fatura — dois
+       check-ins simultâneos na mesma fatura não se sobrescrevem.
+       fatura_service.verificar_consistencia_faturas confere os totais.
 
     2. Sessão NÃO FATURADA:
        - Apenas atualiza o estado. Nenhum impacto financeiro imediato.
        - O impacto financeiro ocorre no POST /faturas/gerar.
 
+    Cancelada/remarcada: o lembrete 24h ainda agendado é removido.
+
+    O rollup mensal (resumo_service) recebe na mesma transação o delta da
+    fatura e a entrada/saída da sessão entre as cobráveis do mês.
+
     Returns:
         (sessao_atualizada, fatura_foi_impactada: bool)
     """
+    # Trava a linha (Postgres): os deltas (fatura e rollup) partem do
+    # estado/valor atual da sessão
+    db.refresh(sessao, with_for_update=True)
+
     estado_anterior = sessao.estado
+    cobranca_anterior = _cobranca(estado_anterior, sessao.valor_cobrado)
     novo_estado = dados.estado
     fatura_impactada = False
 
@@ -115,21 +142,52 @@ def atualizar_estado(
 
     sessao.estado = novo_estado
 
+    if novo_estado in _ESTADOS_SEM_LEMBRETE and estado_anterior not in _ESTADOS_SEM_LEMBRETE:
+        notificacao_service.cancelar_lembretes_sessao(db, sessao_id=sessao.id)
+
+    deltas_resumo = []
+    if novo_estado.gera_cobranca != estado_anterior.gera_cobranca:
+        ano, mes = resumo_service.mes_utc(sessao.data_hora_inicio)
+        deltas_resumo.append({
+            "psicologo_id": psicologo_id, "ano": ano, "mes": mes,
+            "sessoes_cobraveis": 1 if novo_estado.gera_cobranca else -1,
+        })
+
     # ─── Lógica de impacto na Fatura ────────────────────────────────────────
     if sessao.fatura_id is not None:
-        fatura: Fatura | None = db.query(Fatura).filter(Fatura.id == sessao.fatura_id).first()
-
-        if fatura and fatura.estado not in ("paga", "cancelada"):
-            if novo_estado.gera_cobranca:
-                # Sessão continua na fatura → recalcula total
-                _recalcular_fatura(db, fatura)
-                fatura_impactada = True
-            else:
+        sai_da_fatura = not novo_estado.gera_cobranca
+        delta_valor = _cobranca(novo_estado, sessao.valor_cobrado) - cobranca_anterior
+        delta_sessoes = -1 if sai_da_fatura else 0
+
+        # Faturas pagas/canceladas ficam congeladas (nenhuma linha → nada muda)
+        referencia = db.execute(
+            update(Fatura)
+            .where(
+                Fatura.id == sessao.fatura_id,
+                Fatura.estado.notin_([EstadoFatura.paga, EstadoFatura.cancelada]),
+            )
+            .values(
+                valor_total=Fatura.valor_total + delta_valor,
+                total_sessoes=Fatura.total_sessoes + delta_sessoes,
+            )
+            .returning(Fatura.ano_referencia, Fatura.mes_referencia),
+            execution_options={"synchronize_session": False},
+        ).first()
+        if referencia:
+            fatura_impactada = True
+            deltas_resumo.append({
+                "psicologo_id": psicologo_id,
+                "ano": referencia.ano_referencia,
+                "mes": referencia.mes_referencia,
+                "valor_faturado": delta_valor,
+                "valor_em_aberto": delta_valor,
+                "sessoes_faturadas": delta_sessoes,
+            })
+            if sai_da_fatura:
                 # Sessão sai da fatura (ex: cancelada_paciente)
                 sessao.fatura_id = None
-                _recalcular_fatura(db, fatura)
-                fatura_impactada = True
 
+    resumo_service.acumular(db, deltas_resumo)
     db.commit()
     db.refresh(sessao)
     return sessao, fatura_impactada
@@ -154,16 +212,11 @@ def confirmar_sessao_publica(db: Session, token_confirmacao: str) -> Sessao:
     return sessao
 
 
-def _recalcular_fatura(db: Session, fatura: Fatura) -> None:
-    """Recalcula valor_total somando as sessões cobráveis ainda vinculadas à fatura."""
-    sessoes = db.query(Sessao).filter(Sessao.fatura_id == fatura.id).all()
-    total = sum(
-        float(s.valor_cobrado or 0)
-        for s in sessoes
-        if s.estado.gera_cobranca
-    )
-    fatura.valor_total = total
-    db.add(fatura)
+def _cobranca(estado: EstadoSessao, valor) -> Decimal:
+    """Quanto a sessão soma no valor_total da fatura neste estado."""
+    if not estado.gera_cobranca or valor is None:
+        return Decimal("0")
+    return Decimal(str(valor))
 
 
 def listar_sessoes_paciente(
@@ -3,29 +3,52 @@ services/timeline_service.py — Motor de Agregação (Data-Range)
 
 Responsabilidade:
     Consulta Sessao, TarefaPaciente e CheckInDiario num intervalo data_inicio/data_fim,
-    mapeia para TimelineEvent tipado e devolve lista única ordenada por data_hora ASC.
+    mais as ocorrências ainda não gravadas das séries recorrentes do paciente
+    ("sessao_prevista"), mapeia para TimelineEvent tipado e devolve lista única
+    ordenada por data_hora ASC.
 
     Migração de mes/ano → data_inicio/data_fim permite scroll infinito no mobile
     e suporta transições entre meses sem lógica no cliente.
+
+Merge em streaming (k-way):
+    Cada fonte é lida já ordenada pelo banco, em lotes (stream + yield_per →
+    cursor server-side no Postgres); as séries são expandidas já em ordem.
+    _mesclar intercala as quatro sequências de forma preguiçosa (um evento
+    por fonte no heap): nenhuma ordenação em Python e, no modo NDJSON,
+    memória constante independentemente da largura da janela.
+
+Async:
+    Roda sobre AsyncSession (rota `async def`) — cada lote é aguardado no
+    event loop em vez de prender uma thread do threadpool.
 """
 
+import heapq
+from collections.abc import AsyncIterator, Callable
 from datetime import date, datetime, time, timezone
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.models.sessao import Sessao
 from backend.models.tarefa_paciente import TarefaPaciente
 from backend.models.checkin_diario import CheckInDiario
 from backend.models.paciente import Paciente
+from backend.models.serie_sessao import SerieSessao
 
 from backend.schemas.sessao import SessaoResponse
 from backend.schemas.tarefa import TarefaResponse
 from backend.schemas.checkin import CheckInResponse
 from backend.schemas.timeline import (
+    TimelineEvent,
     TimelineEventSessao,
     TimelineEventTarefa,
     TimelineEventCheckin,
+    TimelineEventSessaoPrevista,
     TimelineResponse,
 )
+from backend.services import serie_service
+
+# Linhas buscadas por ida ao cursor server-side de cada fonte
+_TAMANHO_LOTE = 500
 
 
 def _data_to_dt(d: date, start: bool = True) -> datetime:
@@ -34,94 +57,166 @@ def _data_to_dt(d: date, start: bool = True) -> datetime:
     return datetime.combine(d, t).replace(tzinfo=timezone.utc)
 
 
-def gerar_timeline(
-    db: Session,
-    *,
-    psicologo_id: int,
-    paciente_id: int,
-    data_inicio: date,
-    data_fim: date,
-) -> TimelineResponse:
-    """
-    Agrega eventos de 3 fontes no intervalo [data_inicio, data_fim] (inclusive).
-    Retorna TimelineResponse com lista única ordenada cronologicamente.
-    Suporta janelas que cruzam meses (ex: 28/10 a 03/11).
-    """
+def _chave_cronologica(evento: TimelineEvent) -> datetime:
+    # SQLite devolve naive e as séries expandem em UTC aware — compara em UTC
+    dt = evento.data_hora
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt
+
+
+async def _validar_janela(
+    db: AsyncSession, *, psicologo_id: int, paciente_id: int, data_inicio: date, data_fim: date
+) -> None:
+    """Valida o intervalo e o ownership do paciente. Lança ValueError."""
     if data_fim < data_inicio:
         raise ValueError("data_fim deve ser igual ou posterior a data_inicio.")
 
-    # Guard de ownership
-    paciente = (
-        db.query(Paciente)
-        .filter(Paciente.id == paciente_id, Paciente.psicologo_id == psicologo_id)
-        .first()
+    paciente_id_encontrado = await db.scalar(
+        select(Paciente.id).where(Paciente.id == paciente_id, Paciente.psicologo_id == psicologo_id)
     )
-    if not paciente:
+    if paciente_id_encontrado is None:
         raise ValueError("Paciente não encontrado ou não pertence ao psicólogo.")
 
+
+async def _iterar_fonte(db: AsyncSession, stmt, montar: Callable) -> AsyncIterator[TimelineEvent]:
+    """Lê uma fonte ordenada em lotes e converte cada linha em TimelineEvent."""
+    resultado = await db.stream_scalars(stmt.execution_options(yield_per=_TAMANHO_LOTE))
+    async for item in resultado:
+        yield montar(item)
+
+
+async def _mesclar(*fontes: AsyncIterator[TimelineEvent]) -> AsyncIterator[TimelineEvent]:
+    """heapq.merge para iteradores assíncronos — empate fica com a fonte anterior."""
+    heap = []
+    for i, fonte in enumerate(fontes):
+        evento = await anext(fonte, None)
+        if evento is not None:
+            heap.append((_chave_cronologica(evento), i, evento))
+    heapq.heapify(heap)
+
+    while heap:
+        _, i, evento = heap[0]
+        yield evento
+        proximo = await anext(fontes[i], None)
+        if proximo is None:
+            heapq.heappop(heap)
+        else:
+            heapq.heapreplace(heap, (_chave_cronologica(proximo), i, proximo))
+
+
+def _mesclar_fontes(
+    db: AsyncSession, *, paciente_id: int, data_inicio: date, data_fim: date
+) -> AsyncIterator[TimelineEvent]:
+    """Merge preguiçoso das 4 fontes, cada uma já ordenada."""
     dt_inicio = _data_to_dt(data_inicio, start=True)
     dt_fim = _data_to_dt(data_fim, start=False)
-    eventos: list = []
 
     # ── Fonte 1: Sessões ──────────────────────────────────────────────────────
-    sessoes = (
-        db.query(Sessao)
-        .filter(
+    sessoes = _iterar_fonte(
+        db,
+        select(Sessao)
+        .where(
             Sessao.paciente_id == paciente_id,
             Sessao.data_hora_inicio >= dt_inicio,
             Sessao.data_hora_inicio <= dt_fim,
         )
-        .all()
+        .order_by(Sessao.data_hora_inicio, Sessao.id),
+        lambda s: TimelineEventSessao(
+            tipo_evento="sessao",
+            data_hora=s.data_hora_inicio,
+            dados_especificos=SessaoResponse.model_validate(s),
+        ),
     )
-    for s in sessoes:
-        eventos.append(
-            TimelineEventSessao(
-                tipo_evento="sessao",
-                data_hora=s.data_hora_inicio,
-                dados_especificos=SessaoResponse.model_validate(s),
-            )
-        )
 
     # ── Fonte 2: Tarefas (âncora = data_vencimento) ───────────────────────────
-    tarefas = (
-        db.query(TarefaPaciente)
-        .filter(
+    tarefas = _iterar_fonte(
+        db,
+        select(TarefaPaciente)
+        .where(
             TarefaPaciente.paciente_id == paciente_id,
             TarefaPaciente.data_vencimento.isnot(None),
             TarefaPaciente.data_vencimento >= dt_inicio,
             TarefaPaciente.data_vencimento <= dt_fim,
         )
-        .all()
+        .order_by(TarefaPaciente.data_vencimento, TarefaPaciente.id),
+        lambda t: TimelineEventTarefa(
+            tipo_evento="tarefa",
+            data_hora=t.data_vencimento,
+            dados_especificos=TarefaResponse.model_validate(t),
+        ),
     )
-    for t in tarefas:
-        eventos.append(
-            TimelineEventTarefa(
-                tipo_evento="tarefa",
-                data_hora=t.data_vencimento,
-                dados_especificos=TarefaResponse.model_validate(t),
-            )
-        )
 
     # ── Fonte 3: Check-ins ────────────────────────────────────────────────────
-    checkins = (
-        db.query(CheckInDiario)
-        .filter(
+    checkins = _iterar_fonte(
+        db,
+        select(CheckInDiario)
+        .where(
             CheckInDiario.paciente_id == paciente_id,
             CheckInDiario.data_registro >= dt_inicio,
             CheckInDiario.data_registro <= dt_fim,
         )
-        .all()
+        .order_by(CheckInDiario.data_registro, CheckInDiario.id),
+        lambda c: TimelineEventCheckin(
+            tipo_evento="checkin",
+            data_hora=c.data_registro,
+            dados_especificos=CheckInResponse.model_validate(c),
+        ),
+    )
+
+    # ── Fonte 4: Ocorrências previstas de séries recorrentes ──────────────────
+    previstas = _iterar_previstas(
+        db, paciente_id=paciente_id, dt_inicio=dt_inicio, dt_fim=dt_fim
+    )
+
+    return _mesclar(sessoes, tarefas, checkins, previstas)
+
+
+async def _iterar_previstas(
+    db: AsyncSession, *, paciente_id: int, dt_inicio: datetime, dt_fim: datetime
+) -> AsyncIterator[TimelineEvent]:
+    """Expande as séries do paciente na janela, sem as ocorrências já gravadas."""
+    series = list(await db.scalars(
+        select(SerieSessao).where(
+            SerieSessao.paciente_id == paciente_id,
+            *serie_service.filtro_janela(dt_inicio, dt_fim),
+        )
+    ))
+    if not series:
+        return
+    materializadas = await serie_service.ocorrencias_materializadas_async(
+        db, serie_ids=[s.id for s in series], inicio=dt_inicio, fim=dt_fim
     )
-    for c in checkins:
-        eventos.append(
-            TimelineEventCheckin(
-                tipo_evento="checkin",
-                data_hora=c.data_registro,
-                dados_especificos=CheckInResponse.model_validate(c),
-            )
+    for ocorrencia, serie in serie_service.expandir_ocorrencias(
+        series, inicio=dt_inicio, fim=dt_fim, materializadas=materializadas
+    ):
+        yield TimelineEventSessaoPrevista(
+            tipo_evento="sessao_prevista",
+            data_hora=ocorrencia,
+            dados_especificos=serie_service.sessao_prevista(serie, ocorrencia),
         )
 
-    eventos.sort(key=lambda e: e.data_hora)
+
+async def gerar_timeline(
+    db: AsyncSession,
+    *,
+    psicologo_id: int,
+    paciente_id: int,
+    data_inicio: date,
+    data_fim: date,
+) -> TimelineResponse:
+    """
+    Agrega eventos de 4 fontes no intervalo [data_inicio, data_fim] (inclusive).
+    Retorna TimelineResponse com lista única ordenada cronologicamente.
+    Suporta janelas que cruzam meses (ex: 28/10 a 03/11).
+    """
+    await _validar_janela(
+        db, psicologo_id=psicologo_id, paciente_id=paciente_id,
+        data_inicio=data_inicio, data_fim=data_fim,
+    )
+    eventos = [
+        evento async for evento in _mesclar_fontes(
+            db, paciente_id=paciente_id, data_inicio=data_inicio, data_fim=data_fim
+        )
+    ]
 
     return TimelineResponse(
         paciente_id=paciente_id,
@@ -130,3 +225,35 @@ def gerar_timeline(
         total_eventos=len(eventos),
         eventos=eventos,
     )
+
+
+async def gerar_timeline_ndjson(
+    db: AsyncSession,
+    *,
+    fabrica_sessao: Callable[[], AsyncSession],
+    psicologo_id: int,
+    paciente_id: int,
+    data_inicio: date,
+    data_fim: date,
+) -> AsyncIterator[str]:
+    """
+    Variante streaming: valida com a sessão do request (erros viram 404 antes
+    do primeiro byte) e devolve um gerador de linhas NDJSON, um evento por linha.
+
+    O gerador abre a própria sessão via `fabrica_sessao` — ele é consumido
+    enquanto a resposta é enviada, fora do ciclo de vida do request.
+    """
+    await _validar_janela(
+        db, psicologo_id=psicologo_id, paciente_id=paciente_id,
+        data_inicio=data_inicio, data_fim=data_fim,
+    )
+
+    async def _linhas() -> AsyncIterator[str]:
+        async with fabrica_sessao() as sessao_stream:
+            async for evento in _mesclar_fontes(
+                sessao_stream, paciente_id=paciente_id,
+                data_inicio=data_inicio, data_fim=data_fim,
+            ):
+                yield evento.model_dump_json() + "\n"
+
+    return _linhas()
@@ -0,0 +1 @@
+# __init__.py — Testes da API (pytest)
@@ -0,0 +1,93 @@
+"""
+Fixtures dos testes da API.
+
+    python -m pytest backend/tests -q
+
+- Banco SQLite temporário (perfil "producao": escritor único + leitores,
+  como no self-hosted), tabelas criadas uma vez e esvaziadas a cada teste.
+- TestClient SEM lifespan: o worker de notificações não sobe — testes do
+  worker chamam as funções dele diretamente.
+- Escritor único: `db` é uma SessionLocal — dê commit antes de chamar o
+  client, senão o request espera a conexão do escritor (DB_POOL_TIMEOUT).
+"""
+
+import os
+import tempfile
+
+# Antes de qualquer import do backend: settings e engine são montados no import
+_BANCO = os.path.join(tempfile.mkdtemp(prefix="cori-testes-"), "cori.db")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{_BANCO}",
+    "DATABASE_REPLICA_URLS": "[]",
+    "DEBUG": "false",
+    "GOOGLE_CLIENT_ID": "",
+    "DB_POOL_TIMEOUT": "5",  # conexão do escritor esquecida num teste falha rápido
+})
+
+import pytest
+from fastapi.testclient import TestClient
+
+import backend.models  # noqa: F401 — registra todas as tabelas
+from backend.core.cache_perfis import BackendMemoria, perfis
+from backend.core.config import settings
+from backend.core.database import Base, SessionLocal, engine
+from backend.core.instrumentacao_sql import orcamento_sql
+from backend.core.security import create_access_token
+from backend.main import app
+from backend.models.psicologo import Psicologo
+
+PSICOLOGO_ID = 1
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _schema():
+    Base.metadata.create_all(engine)
+    yield
+    engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def _banco_limpo():
+    """Esvazia as tabelas e o cache de perfis depois de cada teste."""
+    yield
+    db = SessionLocal()
+    try:
+        for tabela in reversed(Base.metadata.sorted_tables):
+            db.execute(tabela.delete())
+        db.commit()
+    finally:
+        db.close()
+    perfis.usar_backend(BackendMemoria(settings.PERFIL_CACHE_MAXIMO))
+
+
+@pytest.fixture
+def db():
+    sessao = SessionLocal(expire_on_commit=False)
+    try:
+        yield sessao
+    finally:
+        sessao.close()
+
+
+@pytest.fixture
+def client() -> TestClient:
+    return TestClient(app)
+
+
+@pytest.fixture
+def psicologo_id(db) -> int:
+    db.add(Psicologo(id=PSICOLOGO_ID, google_id="teste", email="teste@cori.app"))
+    db.commit()
+    return PSICOLOGO_ID
+
+
+@pytest.fixture
+def auth(psicologo_id) -> dict[str, str]:
+    """Header Authorization com o JWT do psicólogo de teste."""
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(psicologo_id)})}"}
+
+
+@pytest.fixture
+def orcamento():
+    """orcamento_sql: `with orcamento(2): client.get(...)` — AssertionError se passar."""
+    return orcamento_sql
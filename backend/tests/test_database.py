@@ -0,0 +1,22 @@
+"""SQLite (perfil produção): só o escritor único pega a trava de escrita."""
+
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from backend.core.database import AsyncSessionLocal, fechar_async_engine
+
+
+def test_engine_async_e_somente_leitura():
+    async def _tentar_escrever():
+        try:
+            async with AsyncSessionLocal() as db:
+                assert (await db.execute(text("PRAGMA query_only"))).scalar_one() == 1
+                with pytest.raises(OperationalError, match="readonly"):
+                    await db.execute(text("DELETE FROM pacientes"))
+        finally:
+            await fechar_async_engine()
+
+    asyncio.run(_tentar_escrever())
@@ -0,0 +1,105 @@
+"""POST /faturas/gerar-lote — fecho de mês de todos os pacientes."""
+
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql
+
+from backend.models.fatura import EstadoFatura, Fatura
+from backend.models.paciente import Paciente
+from backend.models.sessao import EstadoSessao, Sessao
+from backend.schemas.fatura import GerarFaturaLoteRequest
+from backend.services import fatura_service
+
+DADOS = {"mes_referencia": 10, "ano_referencia": 2026, "data_vencimento": "2026-11-10"}
+
+
+def _sessao(paciente: Paciente, dia: int, valor: int) -> Sessao:
+    inicio = datetime(2026, 10, dia, 14, tzinfo=timezone.utc)
+    return Sessao(
+        paciente_id=paciente.id, data_hora_inicio=inicio,
+        data_hora_fim=inicio + timedelta(minutes=50),
+        estado=EstadoSessao.realizada, valor_cobrado=valor,
+    )
+
+
+def test_lote_gera_e_reporta_a_fatura_existente_com_os_totais_dela(client, auth, db, psicologo_id):
+    carlos, beatriz, diego = (
+        Paciente(psicologo_id=psicologo_id, nome_completo=nome)
+        for nome in ("Carlos", "Beatriz", "Diego")
+    )
+    db.add_all([carlos, beatriz, diego])
+    db.flush()
+    db.add_all([_sessao(carlos, 5, 150), _sessao(carlos, 12, 150), _sessao(beatriz, 7, 200)])
+    db.add(Fatura(
+        paciente_id=beatriz.id, mes_referencia=10, ano_referencia=2026, valor_total=450,
+        total_sessoes=3, estado=EstadoFatura.pendente, data_vencimento=date(2026, 11, 5),
+    ))
+    db.commit()
+
+    resposta = client.post("/faturas/gerar-lote", headers=auth, json=DADOS)
+
+    assert resposta.status_code == 200
+    resultados = {r["paciente_nome"]: r for r in resposta.json()["resultados"]}
+    assert resultados["Carlos"]["status"] == "gerada"
+    assert (Decimal(resultados["Carlos"]["valor_total"]), resultados["Carlos"]["total_sessoes"]) == (Decimal(300), 2)
+    assert resultados["Beatriz"]["status"] == "ja_existente"
+    assert (Decimal(resultados["Beatriz"]["valor_total"]), resultados["Beatriz"]["total_sessoes"]) == (Decimal(450), 3)
+    assert resultados["Diego"]["status"] == "sem_sessoes"
+
+    # A sessão da Beatriz continua fora de qualquer fatura
+    faturadas = db.scalar(select(func.count()).where(Sessao.fatura_id.is_not(None)))
+    db.rollback()
+    assert faturadas == 2
+
+
+def test_agregado_trava_as_sessoes_no_postgres(db, psicologo_id, monkeypatch):
+    compilados: list[str] = []
+    execute = db.execute
+
+    def _execute(statement, *args, **kwargs):
+        compilados.append(str(statement.compile(dialect=postgresql.dialect())))
+        return execute(statement, *args, **kwargs)
+
+    monkeypatch.setattr(db, "execute", _execute)
+    fatura_service.gerar_faturas_lote(
+        db, psicologo_id=psicologo_id, dados=GerarFaturaLoteRequest(**DADOS),
+    )
+
+    assert "FOR UPDATE OF sessoes" in compilados[0]
+
+
+def test_sessao_elegivel_depois_da_leitura_fica_fora_da_fatura(db, psicologo_id, monkeypatch):
+    """Simula a transação concorrente: uma sessão entra entre a leitura travada e o UPDATE."""
+    carlos = Paciente(psicologo_id=psicologo_id, nome_completo="Carlos")
+    db.add(carlos)
+    db.flush()
+    db.add_all([_sessao(carlos, 5, 150), _sessao(carlos, 12, 150)])
+    db.commit()
+
+    execute = db.execute
+    tardia: list[Sessao] = []
+
+    def _execute(statement, *args, **kwargs):
+        resultado = execute(statement, *args, **kwargs)
+        if not tardia:
+            resultado = resultado.all()  # consome a leitura antes de escrever na mesma conexão
+            tardia.append(_sessao(carlos, 20, 200))
+            db.add(tardia[0])
+            db.flush()
+        return resultado
+
+    monkeypatch.setattr(db, "execute", _execute)
+    resposta = fatura_service.gerar_faturas_lote(
+        db, psicologo_id=psicologo_id, dados=GerarFaturaLoteRequest(**DADOS),
+    )
+    monkeypatch.undo()
+
+    (resultado,) = resposta.resultados
+    assert (resultado.total_sessoes, resultado.valor_total) == (2, Decimal(300))
+    fatura = db.get(Fatura, resultado.fatura_id)
+    vinculadas = db.scalars(select(Sessao.id).where(Sessao.fatura_id == fatura.id)).all()
+    assert (fatura.total_sessoes, fatura.valor_total) == (2, Decimal(300))
+    assert len(vinculadas) == 2 and tardia[0].id not in vinculadas
+    db.rollback()
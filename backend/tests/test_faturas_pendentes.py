@@ -0,0 +1,64 @@
+"""GET /faturas/pendentes — uma única query, qualquer que seja o volume."""
+
+from datetime import date
+
+import pytest
+
+from backend.models.fatura import EstadoFatura, Fatura
+from backend.models.paciente import Paciente
+
+
+def _criar_faturas(db, psicologo_id: int, quantidade: int) -> None:
+    pacientes = [
+        Paciente(psicologo_id=psicologo_id, nome_completo=f"Paciente {i}") for i in range(5)
+    ]
+    db.add_all(pacientes)
+    db.flush()
+    db.add_all(
+        Fatura(
+            paciente_id=pacientes[i % len(pacientes)].id,
+            mes_referencia=i % 12 + 1,
+            ano_referencia=2026,
+            valor_total=150,
+            estado=EstadoFatura.atrasada if i % 3 == 0 else EstadoFatura.pendente,
+            data_vencimento=date(2026, 1, 1 + i % 28),
+        )
+        for i in range(quantidade)
+    )
+    # Fora da listagem: paga, e de outro psicólogo não aparece (mesma query)
+    db.add(Fatura(
+        paciente_id=pacientes[0].id, mes_referencia=1, ano_referencia=2025,
+        valor_total=150, estado=EstadoFatura.paga, data_vencimento=date(2025, 2, 5),
+    ))
+    db.commit()
+
+
+@pytest.mark.parametrize("quantidade", [1, 40, 250])
+def test_uma_query_independente_do_numero_de_faturas(client, auth, db, psicologo_id, orcamento, quantidade):
+    _criar_faturas(db, psicologo_id, quantidade)
+
+    with orcamento(1) as estatisticas:
+        resposta = client.get("/faturas/pendentes", headers=auth)
+
+    assert resposta.status_code == 200
+    assert estatisticas.consultas == 1
+    # Sem `limite`: todas, sem cursor (o dashboard não pagina)
+    assert len(resposta.json()) == quantidade
+    assert "X-Proximo-Cursor" not in resposta.headers
+
+
+def test_paginacao_por_cursor_cobre_todas(client, auth, db, psicologo_id, orcamento):
+    _criar_faturas(db, psicologo_id, 25)
+
+    ids, cursor = [], None
+    while True:
+        params = {"limite": 10, **({"cursor": cursor} if cursor else {})}
+        with orcamento(1):
+            resposta = client.get("/faturas/pendentes", params=params, headers=auth)
+        assert resposta.status_code == 200
+        ids += [f["id"] for f in resposta.json()]
+        cursor = resposta.headers.get("X-Proximo-Cursor")
+        if not cursor:
+            break
+
+    assert len(ids) == len(set(ids)) == 25
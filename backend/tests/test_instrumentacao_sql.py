@@ -0,0 +1,68 @@
+"""Instrumentação de SQL: alerta de N+1, orçamento de statements e Server-Timing."""
+
+import logging
+
+import pytest
+from sqlalchemy import select
+
+from backend.core.config import settings
+from backend.core.instrumentacao_sql import fingerprint, medir_sql, registrar_sql
+from backend.models.paciente import Paciente
+
+
+@pytest.fixture(autouse=True)
+def _so_alerta_de_repeticao(monkeypatch):
+    """Isola o alerta de N+1 dos limites de volume e de tempo."""
+    monkeypatch.setattr(settings, "SQL_ALERTA_CONSULTAS", 1000)
+    monkeypatch.setattr(settings, "SQL_ALERTA_MS", 1e9)
+
+
+def _n_mais_um(db, vezes: int):
+    """Um SELECT por paciente — o padrão que o alerta deve pegar."""
+    with medir_sql() as estatisticas:
+        for paciente_id in range(1, vezes + 1):
+            db.scalars(select(Paciente).where(Paciente.id == paciente_id)).first()
+    db.rollback()
+    return estatisticas
+
+
+def test_statement_repetido_no_limite_gera_warning(db, caplog):
+    estatisticas = _n_mais_um(db, settings.SQL_ALERTA_REPETICOES)
+
+    with caplog.at_level(logging.INFO, logger="backend.core.instrumentacao_sql"):
+        registrar_sql("GET /teste", estatisticas)
+
+    avisos = [r for r in caplog.records if r.levelno == logging.WARNING]
+    assert len(avisos) == 1
+    assert f"repetido {settings.SQL_ALERTA_REPETICOES}x (N+1?)" in avisos[0].getMessage()
+    assert avisos[0].sql["mais_repetida"]["vezes"] == settings.SQL_ALERTA_REPETICOES
+
+
+def test_abaixo_do_limite_so_loga_info(db, caplog):
+    estatisticas = _n_mais_um(db, settings.SQL_ALERTA_REPETICOES - 1)
+
+    with caplog.at_level(logging.INFO, logger="backend.core.instrumentacao_sql"):
+        registrar_sql("GET /teste", estatisticas)
+
+    assert estatisticas.alertas() == []
+    assert [r.levelno for r in caplog.records] == [logging.INFO]
+
+
+def test_listas_in_de_tamanhos_diferentes_contam_como_o_mesmo_statement():
+    assert fingerprint("SELECT * FROM t WHERE id IN (?, ?)") == fingerprint(
+        "SELECT *\n  FROM t WHERE id IN (?, ?, ?, ?)"
+    )
+
+
+def test_orcamento_estourado_lanca_com_o_statement_mais_repetido(db, orcamento):
+    with pytest.raises(AssertionError, match=r"statements \(máximo 2\)\. Mais repetido \(3x\)"):
+        with orcamento(2):
+            _n_mais_um(db, 3)
+
+
+def test_request_expoe_server_timing(client, auth):
+    resposta = client.get("/faturas/pendentes", headers=auth)
+
+    assert resposta.status_code == 200
+    assert resposta.headers["Server-Timing"].startswith("db;dur=")
+    assert 'desc="1 SQL"' in resposta.headers["Server-Timing"]
@@ -0,0 +1,149 @@
+"""Réplicas de leitura: rodízio, saída por atraso e leitura após escrita."""
+
+import asyncio
+
+import pytest
+from sqlalchemy.exc import OperationalError
+from starlette.requests import Request
+from starlette.responses import Response
+
+from backend import main
+from backend.core import database
+from backend.core.database import PoolReplicas, forcar_primario
+from backend.core.security import create_access_token
+
+ATRASO_MAXIMO = 5.0
+
+
+@pytest.fixture
+def atrasos() -> dict[str, float | None]:
+    """Atraso medido por URL de réplica; None = réplica não responde."""
+    return {}
+
+
+@pytest.fixture
+def pool(tmp_path, atrasos):
+    urls = [f"sqlite:///{tmp_path / nome}.db" for nome in ("r1", "r2", "r3")]
+    atrasos.update(dict.fromkeys(urls, 0.0))
+
+    def _medir(conexao):
+        atraso = atrasos[str(conexao.engine.url)]
+        if atraso is None:
+            raise OperationalError("SELECT 1", {}, Exception("conexão recusada"))
+        return atraso
+
+    pool = PoolReplicas(
+        urls,
+        atraso_maximo_segundos=ATRASO_MAXIMO,
+        janela_escrita_segundos=60.0,
+        medir_atraso=_medir,
+    )
+    yield pool
+    for replica in pool.replicas:
+        if replica._engine is not None:
+            replica._engine.dispose()
+
+
+def _escolhidas(pool: PoolReplicas, vezes: int) -> list[str | None]:
+    return [r.url if (r := pool.escolher()) else None for _ in range(vezes)]
+
+
+# ─── Rodízio ──────────────────────────────────────────────────────────────────
+
+def test_replica_so_entra_no_rodizio_depois_da_primeira_medicao(pool):
+    assert pool.escolher() is None
+
+
+def test_rodizio_entre_as_replicas_ativas(pool):
+    pool.verificar()
+
+    urls = [r.url for r in pool.replicas]
+    assert _escolhidas(pool, 6) == urls + urls
+
+
+def test_replica_atrasada_ou_fora_do_ar_sai_do_rodizio(pool, atrasos):
+    r1, r2, r3 = (r.url for r in pool.replicas)
+    atrasos[r2] = ATRASO_MAXIMO + 1
+    atrasos[r3] = None
+    pool.verificar()
+
+    assert _escolhidas(pool, 3) == [r1, r1, r1]
+
+    atrasos[r2] = 0.5  # alcançou o primário
+    pool.verificar()
+    assert set(_escolhidas(pool, 4)) == {r1, r2}
+
+
+def test_sem_replica_saudavel_le_do_primario(pool, atrasos, monkeypatch):
+    atrasos.update(dict.fromkeys(atrasos, ATRASO_MAXIMO + 1))
+    pool.verificar()
+    monkeypatch.setattr(database, "replicas", pool)
+
+    assert pool.escolher() is None
+    with database.SessionLeitura() as db:
+        assert str(db.get_bind().url) == str(database.engine.url)
+
+
+def test_session_leitura_usa_a_replica_escolhida(pool, monkeypatch):
+    pool.verificar()
+    monkeypatch.setattr(database, "replicas", pool)
+
+    with database.SessionLeitura() as db:
+        assert db.get_bind() is pool.replicas[0].engine
+
+
+# ─── Leitura Após Escrita ─────────────────────────────────────────────────────
+
+def test_forcar_primario_ignora_as_replicas(pool):
+    pool.verificar()
+    marca = forcar_primario.set(True)
+    try:
+        assert pool.escolher() is None
+    finally:
+        forcar_primario.reset(marca)
+    assert pool.escolher() is not None
+
+
+def test_janela_de_escrita_por_psicologo(pool):
+    pool.registrar_escrita(1)
+
+    assert pool.escreveu_recentemente(1)
+    assert not pool.escreveu_recentemente(2)
+
+    pool._janela_escrita = 0.0
+    assert not pool.escreveu_recentemente(1)
+
+
+def _requisicao(metodo: str, psicologo_id: int) -> Request:
+    token = create_access_token({"sub": str(psicologo_id)})
+    return Request({
+        "type": "http",
+        "method": metodo,
+        "path": "/",
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+    })
+
+
+def test_leitura_depois_de_escrita_vai_ao_primario(pool, monkeypatch):
+    pool.verificar()
+    monkeypatch.setattr(main, "replicas", pool)
+    vistos: list[bool] = []
+
+    def _rota(status: int):
+        async def call_next(request):
+            vistos.append(forcar_primario.get())
+            return Response(status_code=status)
+        return call_next
+
+    async def _fluxo():
+        await main.consistencia_leitura(_requisicao("GET", 1), _rota(200))
+        await main.consistencia_leitura(_requisicao("POST", 1), _rota(422))  # falhou: não conta
+        await main.consistencia_leitura(_requisicao("GET", 1), _rota(200))
+        await main.consistencia_leitura(_requisicao("PATCH", 1), _rota(200))
+        await main.consistencia_leitura(_requisicao("GET", 1), _rota(200))
+        await main.consistencia_leitura(_requisicao("GET", 2), _rota(200))
+
+    asyncio.run(_fluxo())
+
+    assert vistos == [False, False, False, False, True, False]
+    assert forcar_primario.get() is False
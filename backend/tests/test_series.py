@@ -0,0 +1,78 @@
+"""Séries recorrentes: remarcação a partir de agora e descarte em lote."""
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+
+from backend.models.notificacao import NotificacaoLembrete
+from backend.models.paciente import Paciente
+from backend.models.sessao import Sessao
+from backend.services import serie_service
+
+
+def _criar_serie(client, auth, db, psicologo_id, *, inicio: datetime, regra: str) -> dict:
+    paciente = Paciente(psicologo_id=psicologo_id, nome_completo="Paciente Teste")
+    db.add(paciente)
+    db.commit()
+    resposta = client.post("/series/", headers=auth, json={
+        "paciente_id": paciente.id,
+        "regra": regra,
+        "data_hora_inicio": inicio.isoformat(),
+        "data_hora_fim": (inicio + timedelta(minutes=50)).isoformat(),
+    })
+    assert resposta.status_code == 201
+    return resposta.json()
+
+
+def _previstas(client, auth, inicio: datetime, fim: datetime) -> list[datetime]:
+    resposta = client.get("/agenda/geral", headers=auth, params={
+        "data_inicio": inicio.date().isoformat(),
+        "data_fim": fim.date().isoformat(),
+        "tipos": "sessao_prevista",
+    })
+    assert resposta.status_code == 200
+    return [datetime.fromisoformat(e["data_hora"]) for e in resposta.json()["eventos"]]
+
+
+def test_remarcar_nao_gera_previstas_no_passado(client, auth, db, psicologo_id):
+    agora = datetime.now(timezone.utc).replace(microsecond=0)
+    inicio = agora - timedelta(weeks=4)
+    serie = _criar_serie(client, auth, db, psicologo_id, inicio=inicio, regra="FREQ=WEEKLY")
+    janela = (inicio, agora + timedelta(weeks=3))
+    assert len([d for d in _previstas(client, auth, *janela) if d < agora]) == 4
+
+    resposta = client.patch(f"/series/{serie['id']}", headers=auth, json={
+        "data_hora_inicio": (inicio + timedelta(hours=3)).isoformat(),
+    })
+    assert resposta.status_code == 200
+    assert resposta.json()["vigente_desde"] is not None
+
+    previstas = _previstas(client, auth, *janela)
+    assert previstas
+    assert all(d >= agora for d in previstas)
+
+
+def test_mudar_so_o_valor_nao_corta_o_historico(client, auth, db, psicologo_id):
+    inicio = datetime.now(timezone.utc).replace(microsecond=0) - timedelta(weeks=4)
+    serie = _criar_serie(client, auth, db, psicologo_id, inicio=inicio, regra="FREQ=WEEKLY")
+
+    resposta = client.patch(f"/series/{serie['id']}", headers=auth, json={"valor_cobrado": "180.00"})
+
+    assert resposta.json()["vigente_desde"] is None
+
+
+def test_remarcar_descarta_materializadas_num_statement_por_tabela(
+    client, auth, db, psicologo_id, orcamento
+):
+    amanha = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(days=1)
+    serie = _criar_serie(client, auth, db, psicologo_id, inicio=amanha, regra="FREQ=DAILY")
+    assert serie_service.materializar_proximas(db, ate=amanha + timedelta(days=9)) == 10
+
+    # BEGIN, SELECT da série, UPDATE, DELETE sessões, DELETE lembretes; BEGIN + refresh
+    with orcamento(7):
+        resposta = client.patch(f"/series/{serie['id']}", headers=auth, json={"regra": "FREQ=DAILY;INTERVAL=2"})
+
+    assert resposta.status_code == 200
+    assert db.scalars(select(Sessao.id)).all() == []
+    assert db.scalars(select(NotificacaoLembrete.id)).all() == []
+    db.rollback()
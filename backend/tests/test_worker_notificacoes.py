@@ -0,0 +1,151 @@
+"""Worker de notificações: claim dos vencidos, contexto em lote e envio em lotes do provider."""
+
+import json
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from sqlalchemy import select
+
+from backend.core import push_sender, worker_notificacoes as worker
+from backend.core.agendador_memoria import AgendaEmMemoria
+from backend.core.config import settings
+from backend.core.push_sender import PushSendError
+from backend.models.notificacao import NotificacaoLembrete, StatusNotificacao, TipoNotificacao
+from backend.models.paciente import Paciente
+from backend.models.psicologo import Psicologo
+from backend.models.sessao import Sessao
+
+
+@pytest.fixture(autouse=True)
+def _worker_zerado(monkeypatch):
+    """Agenda em memória vazia e varredura de segurança já no 1º tick."""
+    monkeypatch.setattr(worker, "_agenda", AgendaEmMemoria())
+    monkeypatch.setattr(worker, "_proxima_varredura", None)
+
+
+@pytest.fixture
+def enviados(monkeypatch) -> list[int]:
+    """Troca o provider de push: registra o tamanho de cada lote."""
+    lotes: list[int] = []
+
+    def _provider(mensagens):
+        lotes.append(len(mensagens))
+        return [True] * len(mensagens)
+
+    monkeypatch.setattr(worker, "send_push_batch", _provider)
+    return lotes
+
+
+def _criar_avisos(db, psicologo_id: int, quantidade: int) -> None:
+    """`quantidade` avisos ao psicólogo já vencidos, cada um da sua sessão."""
+    db.get(Psicologo, psicologo_id).dispositivo_push_token = "ExponentPushToken[teste]"
+    paciente = Paciente(psicologo_id=psicologo_id, nome_completo="Paciente Teste")
+    db.add(paciente)
+    db.flush()
+    agora = datetime.now(timezone.utc)
+    for i in range(quantidade):
+        sessao = Sessao(
+            paciente_id=paciente.id,
+            data_hora_inicio=agora + timedelta(days=1, hours=i),
+            data_hora_fim=agora + timedelta(days=1, hours=i, minutes=50),
+        )
+        db.add(sessao)
+        db.flush()
+        db.add(NotificacaoLembrete(
+            paciente_id=paciente.id,
+            tipo=TipoNotificacao.aviso_psicologo,
+            referencia_id=sessao.id,
+            data_programada_disparo=agora - timedelta(minutes=1),
+        ))
+    db.commit()
+
+
+def _status(db) -> Counter:
+    contagem = Counter(db.scalars(select(NotificacaoLembrete.status)))
+    db.rollback()  # devolve a conexão do escritor antes do próximo tick
+    return contagem
+
+
+def test_envia_em_lotes_do_tamanho_do_provider(db, psicologo_id, enviados, monkeypatch):
+    monkeypatch.setattr(settings, "PUSH_LOTE_TAMANHO", 3)
+    _criar_avisos(db, psicologo_id, 7)
+
+    worker._processar_notificacoes()
+
+    assert sorted(enviados) == [1, 3, 3]
+    assert _status(db) == {StatusNotificacao.enviada: 7}
+
+
+def test_falha_de_um_lote_marca_so_as_notificacoes_dele(db, psicologo_id, monkeypatch):
+    monkeypatch.setattr(settings, "PUSH_LOTE_TAMANHO", 3)
+
+    def _provider(mensagens):
+        if len(mensagens) == 3:
+            raise PushSendError("provider fora do ar")
+        return [True] * len(mensagens)
+
+    monkeypatch.setattr(worker, "send_push_batch", _provider)
+    _criar_avisos(db, psicologo_id, 7)
+
+    worker._processar_notificacoes()
+
+    assert _status(db) == {StatusNotificacao.falhou: 6, StatusNotificacao.enviada: 1}
+
+
+def test_notificacao_reivindicada_nao_e_enviada_de_novo(db, psicologo_id, enviados):
+    _criar_avisos(db, psicologo_id, 4)
+
+    worker._processar_notificacoes()
+    worker._proxima_varredura = None  # força outra varredura no banco
+    worker._processar_notificacoes()
+
+    assert sum(enviados) == 4
+    assert _status(db) == {StatusNotificacao.enviada: 4}
+
+
+@pytest.mark.parametrize("quantidade", [1, 30])
+def test_contexto_do_despacho_nao_cresce_com_o_lote(db, psicologo_id, orcamento, quantidade):
+    _criar_avisos(db, psicologo_id, quantidade)
+    pendentes = db.scalars(select(NotificacaoLembrete)).all()
+
+    with orcamento(3):  # pacientes, sessões e perfis — uma query IN cada
+        contexto = worker._carregar_contexto(db, pendentes)
+    db.rollback()
+
+    assert all(worker._montar_mensagem(contexto, n) for n in pendentes)
+
+
+def test_tickets_de_erro_do_provider_viram_falhou(db, psicologo_id, monkeypatch):
+    """Caminho HTTP real de send_push_batch contra um provider local (MockTransport)."""
+    url = "https://push.teste/--/api/v2/push/send"
+    posts: list[list[dict]] = []
+
+    def _provider(request: httpx.Request) -> httpx.Response:
+        assert (request.method, str(request.url)) == ("POST", url)
+        mensagens = json.loads(request.content)
+        posts.append(mensagens)
+        # Expo: um ticket por mensagem, na ordem; sessão ímpar = token recusado
+        return httpx.Response(200, json={"data": [
+            {"status": "ok", "id": f"ticket-{m['data']['sessao_id']}"}
+            if m["data"]["sessao_id"] % 2 == 0
+            else {"status": "error", "message": "DeviceNotRegistered"}
+            for m in mensagens
+        ]})
+
+    monkeypatch.setattr(settings, "PUSH_PROVIDER_URL", url)
+    monkeypatch.setattr(settings, "PUSH_LOTE_TAMANHO", 3)
+    monkeypatch.setattr(push_sender, "_http_client", httpx.Client(transport=httpx.MockTransport(_provider)))
+    _criar_avisos(db, psicologo_id, 7)
+
+    worker._processar_notificacoes()
+
+    assert sorted(len(p) for p in posts) == [1, 3, 3]
+    status = dict(db.execute(select(NotificacaoLembrete.referencia_id, NotificacaoLembrete.status)).all())
+    db.rollback()
+    assert status == {
+        sessao_id: StatusNotificacao.enviada if sessao_id % 2 == 0 else StatusNotificacao.falhou
+        for sessao_id in status
+    }
+    assert StatusNotificacao.falhou in status.values() and StatusNotificacao.enviada in status.values()
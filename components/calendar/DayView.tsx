@@ -8,12 +8,14 @@ import {
     View,
 } from 'react-native';
 import { AgendaEvento, CheckInResponse, SessaoResponse, TarefaResponse } from '../../types/api';
+import { isNearEnd } from '../../utils/scroll';
 
 interface Props {
     date: Date;
     events: AgendaEvento[];
     onSlotPress: (date: Date, hour: number) => void;
     onEventPress: (event: AgendaEvento) => void;
+    onEndReached?: () => void; // próxima página da agenda, se houver
 }
 
 const HOURS = Array.from({ length: 16 }, (_, i) => i + 7); // 7h–22h
@@ -39,7 +41,7 @@ const ESTADO_LABELS: Record<string, string> = {
 
 const EMOJI_HUMOR: Record<number, string> = { 1: '😢', 2: '😟', 3: '😐', 4: '🙂', 5: '😊' };
 
-export default function DayView({ date, events, onSlotPress, onEventPress }: Props) {
+export default function DayView({ date, events, onSlotPress, onEventPress, onEndReached }: Props) {
     const scrollRef = useRef<ScrollView>(null);
 
     useEffect(() => {
@@ -73,7 +75,13 @@ export default function DayView({ date, events, onSlotPress, onEventPress }: Pro
     const totalHours = HOURS.length * HOUR_HEIGHT;
 
     return (
-        <ScrollView ref={scrollRef} style={styles.container} showsVerticalScrollIndicator={false}>
+        <ScrollView
+            ref={scrollRef}
+            style={styles.container}
+            showsVerticalScrollIndicator={false}
+            scrollEventThrottle={200}
+            onScroll={(e) => { if (onEndReached && isNearEnd(e)) onEndReached(); }}
+        >
             <View style={styles.grid}>
                 {/* Time column */}
                 <View style={styles.timeColumn}>
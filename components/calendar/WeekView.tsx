@@ -9,12 +9,14 @@ import { ptBR } from 'date-fns/locale';
 import React from 'react';
 import { ScrollView, StyleSheet, Text, TouchableOpacity, View } from 'react-native';
 import { AgendaEvento, SessaoResponse } from '../../types/api';
+import { isNearEnd } from '../../utils/scroll';
 
 interface Props {
     date: Date;
     events: AgendaEvento[];
     onSlotPress: (date: Date, hour: number) => void;
     onEventPress: (event: AgendaEvento) => void;
+    onEndReached?: () => void; // próxima página da agenda, se houver
     onDayPress: (day: Date) => void;
 }
 
@@ -31,7 +33,7 @@ const ESTADO_COLORS: Record<string, string> = {
     remarcada: '#F39C12',
 };
 
-export default function WeekView({ date, events, onSlotPress, onEventPress, onDayPress }: Props) {
+export default function WeekView({ date, events, onSlotPress, onEventPress, onDayPress, onEndReached }: Props) {
     const weekStart = startOfWeek(date, { weekStartsOn: 0 });
     const weekDays = Array.from({ length: DAY_COLUMNS }, (_, i) => addDays(weekStart, i));
 
@@ -87,7 +89,12 @@ export default function WeekView({ date, events, onSlotPress, onEventPress, onDa
             </View>
 
             {/* Scrollable body */}
-            <ScrollView style={styles.body} showsVerticalScrollIndicator={false}>
+            <ScrollView
+                style={styles.body}
+                showsVerticalScrollIndicator={false}
+                scrollEventThrottle={200}
+                onScroll={(e) => { if (onEndReached && isNearEnd(e)) onEndReached(); }}
+            >
                 <View style={styles.grid}>
                     {/* Time labels column */}
                     <View style={styles.timeLabels}>
@@ -0,0 +1,166 @@
+"""
+Benchmark da agenda em memória do worker (core/agendador_memoria)
+com 1M de lembretes agendados.
+
+Mede:
+  1. Carga do heap (o que o worker faz no startup / recarga do horizonte)
+     e a memória ocupada.
+  2. Manutenção por sinal: inserts e remoções avulsos.
+  3. Caminho quente: um tick por segundo retirando os vencidos.
+  4. (--banco) O mesmo volume numa tabela SQLite temporária: custo da
+     consulta que o worker fazia a cada tick vs a carga do horizonte.
+
+Uso:
+    python scripts/benchmark_agendador.py [--total 1000000] [--banco]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+HORIZONTE = timedelta(hours=6)
+
+
+def _cronometro(rotulo: str, inicio: float, n: int | None = None) -> None:
+    decorrido = time.perf_counter() - inicio
+    por_op = f"  ({decorrido / n * 1e6:.2f} µs/op)" if n else ""
+    print(f"   {rotulo:<42} {decorrido * 1000:>10.1f} ms{por_op}")
+
+
+def _gerar_disparos(total: int, agora: datetime) -> list[tuple[int, datetime]]:
+    random.seed(42)
+    janela = HORIZONTE.total_seconds()
+    return [
+        (i, agora + timedelta(seconds=random.uniform(0, janela)))
+        for i in range(1, total + 1)
+    ]
+
+
+def benchmark_memoria(total: int) -> None:
+    from backend.core.agendador_memoria import AgendaEmMemoria
+
+    agora = datetime.now(timezone.utc)
+    linhas = _gerar_disparos(total, agora)
+    print(f"\n── Agenda em memória ({total:,} lembretes em {HORIZONTE}) ──")
+
+    # Memória medida numa carga separada — tracemalloc distorce o tempo
+    tracemalloc.start()
+    medida = AgendaEmMemoria()
+    medida.concluir_recarga(linhas, agora + HORIZONTE)
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del medida
+
+    agenda = AgendaEmMemoria()
+    inicio = time.perf_counter()
+    agenda.iniciar_recarga()
+    agenda.concluir_recarga(linhas, agora + HORIZONTE)
+    _cronometro("carga (heapify)", inicio, total)
+    print(f"   {'memória do heap + índice':<42} {memoria / 2**20:>10.1f} MB")
+
+    novos = _gerar_disparos(10_000, agora)
+    novos = [(total + i, d) for i, d in novos]
+    inicio = time.perf_counter()
+    for item in novos:
+        agenda.adicionar([item])
+    _cronometro("10k inserts avulsos (sinal)", inicio, len(novos))
+
+    removidos = random.sample(range(1, total + 1), 10_000)
+    inicio = time.perf_counter()
+    for notif_id in removidos:
+        agenda.remover([notif_id])
+    _cronometro("10k remoções avulsas (cancelamento)", inicio, len(removidos))
+
+    inicio = time.perf_counter()
+    for _ in range(10_000):
+        agenda.proximo()
+    _cronometro("10k proximo() (decidir quanto dormir)", inicio, 10_000)
+
+    # 1 tick por segundo durante 1h do horizonte
+    ticks = 3600
+    retirados = 0
+    pior = 0.0
+    inicio = time.perf_counter()
+    for segundo in range(1, ticks + 1):
+        t0 = time.perf_counter()
+        retirados += len(agenda.retirar_vencidos(agora + timedelta(seconds=segundo), 500))
+        pior = max(pior, time.perf_counter() - t0)
+    _cronometro(f"{ticks} ticks (1/s) — {retirados:,} vencidos", inicio, ticks)
+    print(f"   {'pior tick':<42} {pior * 1000:>10.3f} ms")
+
+
+def benchmark_banco(total: int) -> None:
+    caminho = tempfile.mktemp(suffix=".db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{caminho}"
+
+    from sqlalchemy import insert
+
+    from backend.core.database import Base, SessionLocal, engine
+    import backend.models  # noqa: F401 — registra todas as tabelas
+    from backend.models.notificacao import NotificacaoLembrete, StatusNotificacao, TipoNotificacao
+    from backend.models.paciente import Paciente
+    from backend.models.psicologo import Psicologo
+    from backend.services import notificacao_service
+
+    print(f"\n── Banco (SQLite temporário, {total:,} linhas) ──")
+    Base.metadata.create_all(engine)
+    agora = datetime.now(timezone.utc)
+
+    db = SessionLocal()
+    try:
+        db.add(Psicologo(id=1, google_id="bench", email="bench@cori.app"))
+        db.add(Paciente(id=1, psicologo_id=1, nome_completo="Bench"))
+        db.flush()
+        inicio = time.perf_counter()
+        lote = 50_000
+        linhas = _gerar_disparos(total, agora)
+        for k in range(0, total, lote):
+            db.execute(insert(NotificacaoLembrete), [
+                {
+                    "id": notif_id,
+                    "paciente_id": 1,
+                    "tipo": TipoNotificacao.lembrete_tarefa,
+                    "data_programada_disparo": disparo,
+                    "status": StatusNotificacao.agendada,
+                }
+                for notif_id, disparo in linhas[k:k + lote]
+            ])
+        db.commit()
+        _cronometro("insert em massa", inicio, total)
+
+        # O que o worker fazia a cada tick (antes da agenda em memória)
+        inicio = time.perf_counter()
+        for _ in range(100):
+            notificacao_service.reivindicar_pendentes(db, limite=500)
+        _cronometro("100 ticks via varredura da tabela", inicio, 100)
+
+        inicio = time.perf_counter()
+        carregadas = notificacao_service.listar_agendadas_ate(db, ate=agora + HORIZONTE)
+        _cronometro(f"carga do horizonte ({len(carregadas):,} linhas)", inicio)
+
+        ids = [notif_id for notif_id, _ in carregadas[:500]]
+        inicio = time.perf_counter()
+        for k in range(0, len(ids), 5):
+            notificacao_service.reivindicar_por_ids(db, ids=ids[k:k + 5])
+        _cronometro("100 ticks via claim por id", inicio, 100)
+    finally:
+        db.close()
+        engine.dispose()
+        os.remove(caminho)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--total", type=int, default=1_000_000)
+    parser.add_argument("--banco", action="store_true", help="inclui a comparação com SQLite")
+    args = parser.parse_args()
+
+    benchmark_memoria(args.total)
+    if args.banco:
+        benchmark_banco(args.total)
@@ -0,0 +1,206 @@
+"""
+Benchmark do SQLite sob concorrência: perfil "basico" (antes) vs "producao"
+(WAL + PRAGMAs + escritor único + pool de leitores — ver core/database).
+
+Cada perfil roda num subprocesso próprio (o engine é montado no import),
+sobre um banco temporário com sessões já cadastradas:
+  - escritores: threads simulando API + worker — lê uma sessão, muda o
+    estado e grava um check-in, na mesma transação.
+  - leitores: threads simulando a agenda — sessões de um paciente numa
+    janela de 30 dias, via SessionLeitura.
+
+Uso:
+    python scripts/benchmark_sqlite.py [--segundos 5] [--escritores 4] [--leitores 8]
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PACIENTES = 50
+SESSOES_POR_PACIENTE = 400
+INICIO = datetime(2026, 1, 1, 9, tzinfo=timezone.utc)
+
+
+def _percentil(valores: list[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+def _popular() -> None:
+    from sqlalchemy import insert
+
+    from backend.core.database import Base, SessionLocal, engine
+    import backend.models  # noqa: F401 — registra todas as tabelas
+    from backend.models.paciente import Paciente
+    from backend.models.psicologo import Psicologo
+    from backend.models.sessao import EstadoSessao, Sessao
+
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    try:
+        db.add(Psicologo(id=1, google_id="bench", email="bench@cori.app"))
+        db.add_all(
+            Paciente(id=i, psicologo_id=1, nome_completo=f"Bench {i}")
+            for i in range(1, PACIENTES + 1)
+        )
+        db.flush()
+        db.execute(insert(Sessao), [
+            {
+                "paciente_id": paciente_id,
+                "data_hora_inicio": INICIO + timedelta(days=dia),
+                "data_hora_fim": INICIO + timedelta(days=dia, minutes=50),
+                "estado": EstadoSessao.agendada,
+                "valor_cobrado": 150,
+            }
+            for paciente_id in range(1, PACIENTES + 1)
+            for dia in range(SESSOES_POR_PACIENTE)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+def _executar(segundos: float, escritores: int, leitores: int) -> dict:
+    """Roda a carga no perfil do processo atual e devolve as métricas."""
+    from sqlalchemy import select
+    from sqlalchemy.exc import OperationalError
+
+    from backend.core.database import SessionLeitura, SessionLocal
+    from backend.models.checkin_diario import CheckInDiario
+    from backend.models.sessao import EstadoSessao, Sessao
+
+    _popular()
+    total_sessoes = PACIENTES * SESSOES_POR_PACIENTE
+    fim = time.perf_counter() + segundos
+    trava = threading.Lock()
+    resultado = {"escritas": 0, "leituras": 0, "erros_lock": 0, "lat_escrita": [], "lat_leitura": []}
+
+    def _escritor(semente: int) -> None:
+        aleatorio = random.Random(semente)
+        while time.perf_counter() < fim:
+            t0 = time.perf_counter()
+            db = SessionLocal()
+            try:
+                sessao = db.get(Sessao, aleatorio.randint(1, total_sessoes))
+                sessao.estado = aleatorio.choice([EstadoSessao.confirmada, EstadoSessao.realizada])
+                db.add(CheckInDiario(
+                    paciente_id=sessao.paciente_id,
+                    data_registro=datetime.now(timezone.utc),
+                    nivel_humor=aleatorio.randint(1, 5),
+                    nivel_ansiedade=aleatorio.randint(1, 5),
+                ))
+                db.commit()
+                chave, latencia = "escritas", "lat_escrita"
+            except OperationalError as e:
+                db.rollback()
+                if "locked" not in str(e):
+                    raise
+                chave, latencia = "erros_lock", None
+            finally:
+                db.close()
+            with trava:
+                resultado[chave] += 1
+                if latencia:
+                    resultado[latencia].append(time.perf_counter() - t0)
+
+    def _leitor(semente: int) -> None:
+        aleatorio = random.Random(semente)
+        while time.perf_counter() < fim:
+            t0 = time.perf_counter()
+            inicio = INICIO + timedelta(days=aleatorio.randint(0, SESSOES_POR_PACIENTE - 30))
+            db = SessionLeitura()
+            try:
+                db.execute(
+                    select(Sessao).where(
+                        Sessao.paciente_id == aleatorio.randint(1, PACIENTES),
+                        Sessao.data_hora_inicio >= inicio,
+                        Sessao.data_hora_inicio < inicio + timedelta(days=30),
+                    )
+                ).all()
+            except OperationalError as e:
+                if "locked" not in str(e):
+                    raise
+                with trava:
+                    resultado["erros_lock"] += 1
+                continue
+            finally:
+                db.close()
+            with trava:
+                resultado["leituras"] += 1
+                resultado["lat_leitura"].append(time.perf_counter() - t0)
+
+    threads = [threading.Thread(target=_escritor, args=(i,)) for i in range(escritores)]
+    threads += [threading.Thread(target=_leitor, args=(100 + i,)) for i in range(leitores)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    return {
+        "escritas_s": resultado["escritas"] / segundos,
+        "leituras_s": resultado["leituras"] / segundos,
+        "erros_lock": resultado["erros_lock"],
+        "p99_escrita_ms": _percentil(resultado["lat_escrita"], 0.99) * 1000,
+        "p99_leitura_ms": _percentil(resultado["lat_leitura"], 0.99) * 1000,
+    }
+
+
+def _rodar_perfil(perfil: str, args: argparse.Namespace) -> dict:
+    caminho = tempfile.mktemp(suffix=".db")
+    ambiente = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{caminho}",
+        "DATABASE_REPLICA_URLS": "[]",
+        "SQLITE_PERFIL": perfil,
+        "DEBUG": "false",
+    }
+    try:
+        saida = subprocess.run(
+            [sys.executable, __file__, "--interno",
+             "--segundos", str(args.segundos),
+             "--escritores", str(args.escritores),
+             "--leitores", str(args.leitores)],
+            env=ambiente, capture_output=True, text=True, check=True,
+        )
+    finally:
+        for sufixo in ("", "-wal", "-shm"):
+            if os.path.exists(caminho + sufixo):
+                os.remove(caminho + sufixo)
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--segundos", type=float, default=5.0)
+    parser.add_argument("--escritores", type=int, default=4)
+    parser.add_argument("--leitores", type=int, default=8)
+    parser.add_argument("--interno", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.interno:
+        print(json.dumps(_executar(args.segundos, args.escritores, args.leitores)))
+        sys.exit(0)
+
+    print(
+        f"\n── SQLite: {args.escritores} escritores + {args.leitores} leitores, "
+        f"{args.segundos:.0f}s por perfil ──"
+    )
+    print(f"   {'perfil':<10} {'escritas/s':>11} {'leituras/s':>12} {'erros lock':>11} "
+          f"{'p99 escrita':>12} {'p99 leitura':>12}")
+    for perfil in ("basico", "producao"):
+        r = _rodar_perfil(perfil, args)
+        print(
+            f"   {perfil:<10} {r['escritas_s']:>11.0f} {r['leituras_s']:>12.0f} {r['erros_lock']:>11} "
+            f"{r['p99_escrita_ms']:>10.1f}ms {r['p99_leitura_ms']:>10.1f}ms"
+        )
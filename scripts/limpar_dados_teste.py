@@ -21,7 +21,8 @@ def limpar_banco():
             "sessoes",
             "tarefas_paciente",
             "checkins_diarios",
-            "pacientes"
+            "pacientes",
+            "resumo_faturamento_mensal",
         ]
         
         for tabela in tabelas:
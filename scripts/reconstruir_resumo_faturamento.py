@@ -0,0 +1,35 @@
+"""
+Reconstrói o rollup mensal de faturamento (resumo_faturamento_mensal) a
+partir de faturas e sessões — depois de cargas/correções feitas direto no
+banco, ou se o resumo do dashboard divergir das faturas.
+
+Uso:
+    python scripts/reconstruir_resumo_faturamento.py [--psicologo ID]
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.core.database import SessionLocal
+from backend.services import resumo_service
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--psicologo", type=int, help="Só este psicólogo (padrão: todos)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        linhas = resumo_service.reconstruir(db, psicologo_id=args.psicologo)
+    finally:
+        db.close()
+
+    alvo = f"psicólogo {args.psicologo}" if args.psicologo is not None else "todos os psicólogos"
+    print(f"✅ Resumo de faturamento reconstruído ({alvo}): {linhas} meses gravados.")
+
+
+if __name__ == "__main__":
+    main()
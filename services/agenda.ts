@@ -0,0 +1,49 @@
+import { AgendaEvento, AgendaGeralResponse } from '../types/api';
+import { api } from './api';
+
+// Eventos por página na rolagem — a próxima vem sob demanda (onEndReached / scroll)
+export const LIMITE_PAGINA = 100;
+// Máximo aceito pelo backend por página (LIMITE_MAXIMO em agenda_service)
+const LIMITE_MAXIMO = 1000;
+
+interface OpcoesPagina {
+    cursor?: string | null;
+    tipos?: string; // CSV: 'sessao,sessao_prevista,tarefa,checkin'
+    limite?: number;
+}
+
+/**
+ * Uma página de /agenda/geral. `next_cursor` preenchido = há mais eventos na
+ * janela; passe-o de volta em `cursor` quando a lista chegar ao fim.
+ */
+export async function fetchAgendaPagina(
+    dataInicio: string,
+    dataFim: string,
+    { cursor, tipos, limite = LIMITE_PAGINA }: OpcoesPagina = {},
+): Promise<AgendaGeralResponse> {
+    const params: Record<string, string | number> = {
+        data_inicio: dataInicio,
+        data_fim: dataFim,
+        limite,
+    };
+    if (cursor) params.cursor = cursor;
+    if (tipos) params.tipos = tipos;
+    const res = await api.get<AgendaGeralResponse>('/agenda/geral', { params });
+    return res.data;
+}
+
+/**
+ * Todos os eventos da janela, seguindo `next_cursor` até o fim. Só para o
+ * resumo do mês (bolinhas do MonthView), que precisa de todos os dias —
+ * listas usam fetchAgendaPagina e carregam o resto sob demanda.
+ */
+export async function fetchAgendaCompleta(dataInicio: string, dataFim: string): Promise<AgendaEvento[]> {
+    const eventos: AgendaEvento[] = [];
+    let cursor: string | null = null;
+    do {
+        const pagina: AgendaGeralResponse = await fetchAgendaPagina(dataInicio, dataFim, { cursor, limite: LIMITE_MAXIMO });
+        eventos.push(...(pagina.eventos || []));
+        cursor = pagina.next_cursor;
+    } while (cursor);
+    return eventos;
+}
@@ -51,10 +51,33 @@ export interface SessaoResponse {
     fatura_id?: number | null;
     ja_faturada?: boolean;
     token_confirmacao?: string;
+    serie_id?: number | null; // Série recorrente de origem
+    ocorrencia_serie?: string | null; // Horário original da ocorrência na série
     data_criacao?: string;
     paciente?: PacienteResponse; // Anexado pelo backend no endpoint geral
 }
 
+export interface SerieSessaoResponse {
+    id: number;
+    paciente_id: number;
+    regra: string; // RRULE, ex: 'FREQ=WEEKLY;BYDAY=MO,TH'
+    data_hora_inicio: string;
+    duracao_minutos: number;
+    valor_cobrado?: number | null;
+    encerrada_em?: string | null;
+    data_criacao: string;
+}
+
+// Ocorrência virtual de série: materializar via POST /series/{serie_id}/ocorrencias
+export interface SessaoPrevistaResponse {
+    serie_id: number;
+    paciente_id: number;
+    ocorrencia: string;
+    data_hora_inicio: string;
+    data_hora_fim: string;
+    valor_cobrado?: number | null;
+}
+
 export interface AnotacaoResponse {
     id: number;
     sessao_id?: number;
@@ -87,6 +110,46 @@ export interface FaturaResponse {
     total_sessoes: number;
 }
 
+export interface ResultadoFaturaLote {
+    paciente_id: number;
+    paciente_nome: string;
+    status: 'gerada' | 'ja_existente' | 'sem_sessoes';
+    fatura_id: number | null;
+    valor_total: number;
+    total_sessoes: number;
+}
+
+export interface GerarFaturaLoteResponse {
+    mes_referencia: number;
+    ano_referencia: number;
+    total_geradas: number;
+    valor_total: number;
+    resultados: ResultadoFaturaLote[];
+}
+
+export interface ResumoMensal {
+    ano: number;
+    mes: number; // 1-12 — meses sem movimento vêm zerados
+    valor_faturado: number;
+    valor_recebido: number;
+    valor_em_aberto: number;
+    total_faturas: number;
+    sessoes_faturadas: number;
+    sessoes_cobraveis: number; // realizadas/falta_cobrada no mês, faturadas ou não
+}
+
+export interface ResumoFaturamentoResponse {
+    psicologo_id: number;
+    ano: number;
+    meses: ResumoMensal[]; // sempre 12
+    valor_faturado: number;
+    valor_recebido: number;
+    valor_em_aberto: number;
+    total_faturas: number;
+    sessoes_faturadas: number;
+    sessoes_cobraveis: number;
+}
+
 export interface CheckInResponse {
     id: number;
     paciente_id: number;
@@ -98,7 +161,7 @@ export interface CheckInResponse {
 }
 
 // União Polimórfica para a Timeline/Agenda Geral
-export type TipoEventoAgenda = 'sessao' | 'tarefa' | 'checkin';
+export type TipoEventoAgenda = 'sessao' | 'sessao_prevista' | 'tarefa' | 'checkin';
 
 export interface AgendaEvento {
     tipo_evento: TipoEventoAgenda;
@@ -111,4 +174,5 @@ export interface AgendaGeralResponse {
     data_fim: string;
     total_eventos: number;
     eventos: AgendaEvento[];
+    next_cursor: string | null; // null = última página da janela
 }
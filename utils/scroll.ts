@@ -0,0 +1,10 @@
+import { NativeScrollEvent, NativeSyntheticEvent } from 'react-native';
+
+/** onScroll de ScrollView: true quando faltam menos de `margem` px para o fim do conteúdo. */
+export const isNearEnd = (
+    { nativeEvent }: NativeSyntheticEvent<NativeScrollEvent>,
+    margem = 200,
+): boolean => {
+    const { layoutMeasurement, contentOffset, contentSize } = nativeEvent;
+    return layoutMeasurement.height + contentOffset.y >= contentSize.height - margem;
+};